@@ -0,0 +1,344 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import secrets
+import time
+
+from aiohttp import web
+
+IDENTITY = {
+    "HardwareVersion": "2.0",
+    "FirmwareName": "CGA4233-MOCK",
+    "CMMACAddress": "02:00:00:00:00:01",
+    "MACAddressRT": "02:00:00:00:00:02",
+    "ModelName": "CGA4233TCH3",
+    "Manufacturer": "Technicolor",
+    "SerialNumber": "MOCK00000001",
+    "SoftwareVersion": "CGA4233TCH3-mock",
+    "BootloaderVersion": "S1TC-3.63.20.104",
+    "CoreVersion": "1.0",
+    "FirmwareBuildTime": "2024-01-01",
+    "ProcessorSpeed": "1.5 GHz",
+    "Hardware": "BCM3390",
+    "MemTotal": "524288",
+}
+
+DHCP = {
+    "IPAddressRT": "10.0.0.2",
+    "SubnetMaskRT": "255.255.255.0",
+    "IPAddressGW": "192.168.0.1",
+    "DNSTblRT": [{"__id": "1", "IPv4": "10.0.0.1"}],
+    "PoolEnable": "true",
+    "WanAddressMode": "DHCP",
+}
+
+HOST_EXTRA = {"LanMode": "router", "MixedMode": "false", "LanPortMode": "auto"}
+
+LOGIN_PAGE = "<!DOCTYPE html><html><head><title>Login</title></head><body></body></html>"
+
+
+def challenge(password: str, salt: str) -> str:
+    """Same key derivation as the gateway's web UI."""
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), 1000).hex()[:32]
+
+
+def synthetic_host(index: int, rng: random.Random) -> dict:
+    # Über 250 Hosts hinaus in weitere /24-Netze ausweichen
+    net, host = divmod(index, 250)
+    return {
+        "physaddress": "02:%02X:%02X:%02X:%02X:%02X" % (
+            (index >> 32) & 0xFF, (index >> 24) & 0xFF, (index >> 16) & 0xFF,
+            (index >> 8) & 0xFF, index & 0xFF,
+        ),
+        "ipaddress": f"192.168.{net}.{host + 2}",
+        "hostname": f"host-{index:05d}",
+        "active": "true" if rng.random() < 0.8 else "false",
+        "interface": "Ethernet" if index % 3 == 0 else "WiFi",
+        "leasetime": "86400",
+    }
+
+
+class MockGateway:
+    """Local stand-in for a Technicolor CGA web API.
+
+    Implements the salt/PBKDF2 login handshake, ``session/menu``, ``system``,
+    ``modem``, ``dhcp/v4/1``, ``host`` and ``reset``. ``latency``/``jitter``
+    delay every response, ``error_rate`` answers that share of requests with
+    HTTP 500, and sessions expire after ``session_ttl`` seconds or
+    ``session_requests`` requests; ``expiry_mode`` selects how the expiry
+    looks to the client (``"401"``, ``"html"`` login page or ``"nodata"``).
+    With ``etag`` the data endpoints send an ETag and answer 304 to a
+    matching ``If-None-Match`` (the real firmware sends none).
+
+    State only moves when ``advance()`` is called, so a benchmark run is
+    reproducible for a given ``seed``.
+    """
+
+    def __init__(
+        self,
+        *,
+        username: str = "admin",
+        password: str = "password",
+        hosts: int = 50,
+        ds_channels: int = 24,
+        us_channels: int = 4,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        session_ttl: float | None = None,
+        session_requests: int | None = None,
+        expiry_mode: str = "401",
+        churn: float = 0.02,
+        etag: bool = False,
+        seed: int = 1,
+    ) -> None:
+        self.username = username
+        self.password = password
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.session_ttl = session_ttl
+        self.session_requests = session_requests
+        self.expiry_mode = expiry_mode
+        self.churn = churn
+        self.etag = etag
+        self._rng = random.Random(seed)
+        # Eigener Zufallsgenerator für Latenz/Fehler, damit die Daten unabhängig von der Request-Reihenfolge sind
+        self._net_rng = random.Random(seed + 1)
+
+        self.rotate_salts()
+        # Session-ID -> [Login-Zeitpunkt, Requests, CSRF-Token]
+        self._sessions: dict[str, list] = {}
+
+        self.requests = 0
+        self.requests_by_target: dict[str, int] = {}
+        self.logins = 0
+        self.reboots = 0
+
+        self.uptime = 86400
+        self.host_tbl = [synthetic_host(i, self._rng) for i in range(hosts)]
+        self.channels = {
+            "DSTbl": [self._channel(i, 3.0, 38.0) for i in range(1, ds_channels + 1)],
+            "USTbl": [self._channel(i, 45.0, None) for i in range(1, us_channels + 1)],
+            "exDSTbl": [self._channel(33, 1.0, 40.0)],
+            "exUSTbl": [self._channel(5, 42.0, None)],
+        }
+        self.errors = [
+            {"__id": str(i), "ChannelID": str(i), "Correctable": 0, "Uncorrectable": 0}
+            for i in range(1, ds_channels + 1)
+        ]
+
+    def _channel(self, channel_id: int, power: float, snr: float | None) -> dict:
+        entry = {
+            "__id": str(channel_id),
+            "ChannelID": str(channel_id),
+            "PowerLevel": f"{power + self._rng.uniform(-0.5, 0.5):.1f} dBmV",
+            "Frequency": str(114 + channel_id * 8),
+            "Modulation": "256QAM",
+            "LockStatus": "Locked",
+        }
+        if snr is not None:
+            entry["SNRLevel"] = f"{snr + self._rng.uniform(-0.5, 0.5):.1f} dB"
+        return entry
+
+    def advance(self, seconds: float = 300.0) -> None:
+        """Move the gateway state forward: uptime, host churn and codeword counters."""
+        self.uptime += int(seconds)
+        rng = self._rng
+        for _ in range(int(len(self.host_tbl) * self.churn)):
+            host = rng.choice(self.host_tbl)
+            host["active"] = "false" if host["active"] == "true" else "true"
+        for entry in self.errors:
+            entry["Correctable"] += rng.randint(0, 50)
+            if rng.random() < 0.05:
+                entry["Uncorrectable"] += rng.randint(1, 3)
+
+    def rotate_salts(self) -> None:
+        """Draw new login salts (the firmware does this on every restart)."""
+        self.salt = secrets.token_hex(8)
+        self.saltwebui = secrets.token_hex(8)
+        self._expected = challenge(challenge(self.password, self.salt), self.saltwebui)
+
+    # --- HTTP --------------------------------------------------------------
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post("/api/v1/session/login", self._login)
+        app.router.add_get("/api/v1/session/menu", self._menu)
+        app.router.add_get("/api/v1/system/{fields}", self._system)
+        app.router.add_get("/api/v1/modem/{fields}", self._modem)
+        app.router.add_get("/api/v1/dhcp/v4/1/{fields}", self._dhcp)
+        app.router.add_get("/api/v1/host/{fields}", self._host)
+        app.router.add_post("/api/v1/reset", self._reset)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> tuple[web.AppRunner, str]:
+        """Serve the app; returns the runner and the ``host:port`` to pass to the client."""
+        runner = web.AppRunner(self.app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        bound = runner.addresses[0]
+        return runner, f"{bound[0]}:{bound[1]}"
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        self.requests += 1
+        resource = request.match_info.route.resource
+        target = (
+            resource.canonical.removeprefix("/api/v1/").removesuffix("/{fields}")
+            if resource is not None
+            else request.path
+        )
+        self.requests_by_target[target] = self.requests_by_target.get(target, 0) + 1
+
+        delay = self.latency + (self._net_rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self._net_rng.random() < self.error_rate:
+            return web.Response(status=500, text="Internal Server Error")
+        return await handler(request)
+
+    def _session_valid(self, request) -> bool:
+        session = self._sessions.get(request.cookies.get("PHPSESSID", ""))
+        if session is None:
+            return False
+        session[1] += 1
+        if self.session_ttl is not None and time.monotonic() - session[0] > self.session_ttl:
+            return False
+        if self.session_requests is not None and session[1] > self.session_requests:
+            return False
+        return request.headers.get("X-CSRF-TOKEN") == session[2]
+
+    def _expired(self) -> web.Response:
+        if self.expiry_mode == "html":
+            return web.Response(text=LOGIN_PAGE, content_type="text/html")
+        if self.expiry_mode == "nodata":
+            return web.json_response({"error": "error", "message": "not authorized"})
+        return web.Response(status=401)
+
+    def _ok(self, data: dict, request=None) -> web.Response:
+        body = json.dumps({"error": "ok", "message": "all values", "data": data})
+        if not self.etag or request is None:
+            return web.Response(text=body, content_type="application/json")
+        etag = '"%s"' % hashlib.blake2b(body.encode(), digest_size=8).hexdigest()
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=body, content_type="application/json", headers={"ETag": etag})
+
+    @staticmethod
+    def _fields(request) -> list[str]:
+        return request.match_info["fields"].split(",")
+
+    async def _login(self, request):
+        form = await request.post()
+        if form.get("password") == "seeksalthash":
+            if form.get("username") != self.username:
+                return web.json_response({"error": "error", "message": "unknown user"})
+            return web.json_response(
+                {"error": "ok", "salt": self.salt, "saltwebui": self.saltwebui}
+            )
+        if form.get("password") != self._expected:
+            return web.json_response({"error": "error", "message": "invalid password"})
+
+        session_id = secrets.token_hex(16)
+        token = secrets.token_hex(16)
+        self._sessions[session_id] = [time.monotonic(), 0, token]
+        self.logins += 1
+        response = web.json_response({"error": "ok", "message": "login success"})
+        response.set_cookie("PHPSESSID", session_id)
+        response.set_cookie("auth", token)
+        return response
+
+    async def _menu(self, request):
+        if request.cookies.get("PHPSESSID") not in self._sessions:
+            return self._expired()
+        return self._ok({"menu": []})
+
+    async def _system(self, request):
+        if not self._session_valid(request):
+            return self._expired()
+        values = {
+            **IDENTITY,
+            "UpTime": str(self.uptime),
+            "LocalTime": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "CMStatus": "OPERATIONAL",
+            "MemFree": str(200000 + self.uptime % 1000),
+            "LanMode": "router",
+        }
+        return self._ok({k: values[k] for k in self._fields(request) if k in values}, request)
+
+    async def _modem(self, request):
+        if not self._session_valid(request):
+            return self._expired()
+        tables = {**self.channels, "ErrTbl": self.errors}
+        return self._ok({k: tables[k] for k in self._fields(request) if k in tables}, request)
+
+    async def _dhcp(self, request):
+        if not self._session_valid(request):
+            return self._expired()
+        return self._ok({k: DHCP[k] for k in self._fields(request) if k in DHCP}, request)
+
+    async def _host(self, request):
+        if not self._session_valid(request):
+            return self._expired()
+        values = {**HOST_EXTRA, "hostTbl": self.host_tbl}
+        return self._ok({k: values[k] for k in self._fields(request) if k in values}, request)
+
+    async def _reset(self, request):
+        if not self._session_valid(request):
+            return self._expired()
+        # Reboot: Sessions ungültig, neue Salts, UpTime beginnt von vorn
+        self.reboots += 1
+        self._sessions.clear()
+        self.rotate_salts()
+        self.uptime = 0
+        return web.json_response({"error": "ok", "message": "rebooting"})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a mock Technicolor CGA gateway")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--hosts", type=int, default=50, help="synthetic hostTbl size")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--session-ttl", type=float, default=None)
+    parser.add_argument("--expiry-mode", choices=("401", "html", "nodata"), default="401")
+    parser.add_argument("--etag", action="store_true", help="send ETags and answer 304")
+    parser.add_argument("--advance-every", type=float, default=0.0,
+                        help="advance the gateway state every N seconds (0 = never)")
+    args = parser.parse_args()
+
+    gateway = MockGateway(
+        hosts=args.hosts,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        session_ttl=args.session_ttl,
+        expiry_mode=args.expiry_mode,
+        etag=args.etag,
+    )
+
+    async def _serve():
+        runner, address = await gateway.start(args.host, args.port)
+        print(f"Mock gateway on http://{address} (user {gateway.username!r}, password {gateway.password!r})")
+        try:
+            while True:
+                await asyncio.sleep(args.advance_every or 3600)
+                if args.advance_every:
+                    gateway.advance(args.advance_every)
+        finally:
+            await runner.cleanup()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+import argparse
+import asyncio
+import importlib
+import importlib.util
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from pathlib import Path
+
+import aiohttp
+
+BENCH_DIR = Path(__file__).resolve().parent
+COMPONENT_DIR = BENCH_DIR.parent / "custom_components" / "technicolor_cga"
+PACKAGE = "technicolor_cga"
+
+sys.path.insert(0, str(BENCH_DIR))
+from mock_gateway import MockGateway  # noqa: E402
+
+# Kennzahlen, bei denen ein höherer Wert eine Verschlechterung ist
+REGRESSION_METRICS = (
+    "cycle_ms_p50",
+    "cycle_ms_p95",
+    "requests_per_cycle",
+    "bytes_per_cycle",
+    "memory_per_host_bytes",
+    "state_writes_per_cycle",
+)
+
+
+def load_component_module(name: str) -> types.ModuleType:
+    """Import a module of the integration without running its package ``__init__``.
+
+    The package is registered without executing it, so the plain modules
+    (``docsis`` -> ``history``) load without Home Assistant and relative
+    imports keep working; the coordinator and the platforms need it installed.
+    """
+    if PACKAGE not in sys.modules:
+        spec = importlib.util.spec_from_loader(PACKAGE, loader=None, is_package=True)
+        package = importlib.util.module_from_spec(spec)
+        package.__path__ = [str(COMPONENT_DIR)]
+        sys.modules[PACKAGE] = package
+    return importlib.import_module(f"{PACKAGE}.{name}")
+
+
+client_module = load_component_module("technicolor_cga")
+hosts_module = load_component_module("hosts")
+const_module = load_component_module("const")
+
+
+class BenchEntry:
+    """Config entry stand-in with the attributes the coordinator and platforms read.
+
+    Polling is disabled (``pref_disable_polling``): the harness triggers
+    every refresh itself and moves the schedules forward in simulated time.
+    """
+
+    domain = const_module.DOMAIN
+    title = "benchmark"
+    pref_disable_polling = True
+
+    def __init__(self, data: dict, options: dict) -> None:
+        self.entry_id = "benchmark"
+        self.data = data
+        self.options = options
+        self._on_unload: list = []
+
+    def async_on_unload(self, func) -> None:
+        self._on_unload.append(func)
+
+    def async_create_background_task(self, hass, target, name, eager_start=True):
+        return hass.async_create_background_task(target, name, eager_start)
+
+    async def async_unload(self) -> None:
+        while self._on_unload:
+            result = self._on_unload.pop()()
+            # async_shutdown des Coordinators ist eine Coroutine
+            if asyncio.iscoroutine(result):
+                await result
+
+
+class BenchConfigEntries:
+    """The part of ``hass.config_entries`` the coordinator uses (identity/DHCP key cache)."""
+
+    def async_update_entry(self, entry, *, data=None, options=None, **kwargs) -> bool:
+        if data is not None:
+            entry.data = data
+        if options is not None:
+            entry.options = options
+        return True
+
+
+async def setup_integration(hass, entry) -> tuple:
+    """Set up manager, stores, coordinator and both platforms like ``async_setup_entry``.
+
+    Entities are not added to a state machine; each ``async_write_ha_state``
+    is counted instead, so the count is exactly what the platforms write.
+    """
+    from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+    coordinator_module = load_component_module("coordinator")
+    manager_module = load_component_module("manager")
+    store_module = load_component_module("store")
+    schedule_module = load_component_module("schedule")
+    sensor_module = load_component_module("sensor")
+    tracker_module = load_component_module("device_tracker")
+    const = const_module
+
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    hass.config_entries = BenchConfigEntries()
+
+    manager = manager_module.async_get_manager(hass)
+    # HAs geteilte Session braucht die network/zeroconf-Integrationen -> eigene, gleich konfiguriert
+    manager.session = aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True))
+    api = manager.client(
+        entry.data["username"], entry.data["password"], entry.data["host"]
+    )
+    known_devices = store_module.KnownDeviceStore(
+        hass, entry.entry_id, const.DEFAULT_KNOWN_DEVICE_MAX_AGE
+    )
+    await known_devices.async_load()
+    intervals = coordinator_module.endpoint_intervals(entry)
+    presence = store_module.PresenceStore(
+        hass,
+        entry.entry_id,
+        intervals[const.ENDPOINT_HOST] * schedule_module.HOST_MAX_BACKOFF_FACTOR,
+    )
+    await presence.async_load()
+    coordinator = coordinator_module.TechnicolorCGACoordinator(
+        hass,
+        entry,
+        api,
+        intervals,
+        max_parallel=entry.options.get(
+            const.CONF_MAX_PARALLEL_REQUESTS, const.DEFAULT_MAX_PARALLEL_REQUESTS
+        ),
+        adaptive=entry.options.get(const.CONF_ADAPTIVE_POLLING, const.DEFAULT_ADAPTIVE_POLLING),
+        known_devices=known_devices,
+        manager=manager,
+        presence=presence,
+    )
+    manager.async_add_gateway(entry.entry_id, coordinator)
+    hass.data.setdefault(const.DOMAIN, {})[entry.entry_id] = {
+        "api": api,
+        "coordinator": coordinator,
+    }
+
+    writes = {"count": 0}
+    pending: list = []
+
+    def _count_write() -> None:
+        writes["count"] += 1
+
+    def _add_entities(entities, update_before_add=False) -> None:
+        for entity in entities:
+            entity.hass = hass
+            entity.async_write_ha_state = _count_write
+            pending.append(entity)
+
+    async def _add_pending() -> int:
+        added = 0
+        while pending:
+            entity = pending.pop(0)
+            await entity.async_added_to_hass()
+            # Die Entity-Plattform schreibt den Anfangszustand direkt nach dem Hinzufügen
+            entity.async_write_ha_state()
+            added += 1
+        return added
+
+    await sensor_module.async_setup_entry(hass, entry, _add_entities)
+    await tracker_module.async_setup_entry(hass, entry, _add_entities)
+    return coordinator, manager, writes, _add_pending
+
+
+async def teardown_integration(hass, entry, coordinator, manager) -> None:
+    await entry.async_unload()
+    await coordinator.known_devices.async_flush()
+    await coordinator.presence.async_flush()
+    await manager.async_remove_gateway(entry.entry_id)
+    await hass.async_stop(force=True)
+
+
+def advance_schedules(coordinator, seconds: float) -> None:
+    """Move the coordinator's schedules ``seconds`` forward in simulated time."""
+    for schedule in coordinator.schedules.values():
+        schedule.next_due -= seconds
+    coordinator.breaker.retry_at -= seconds
+
+
+def memory_per_host(host_tbl: list[dict]) -> float:
+    """Bytes allocated by a HostTable for the given hostTbl, per host."""
+    if not host_tbl:
+        return 0.0
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    table = hosts_module.HostTable()
+    table.update(host_tbl)
+    table.sorted()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del table
+    return allocated / len(host_tbl)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def run_scenario(hosts: int, args) -> dict:
+    from homeassistant.core import HomeAssistant
+
+    gateway = MockGateway(
+        hosts=hosts,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        session_requests=args.session_requests,
+        expiry_mode=args.expiry_mode,
+        churn=args.churn,
+        etag=args.etag,
+        seed=args.seed,
+    )
+    runner, address = await gateway.start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        entry = BenchEntry(
+            {"username": gateway.username, "password": gateway.password, "host": address},
+            {
+                const_module.CONF_MAX_PARALLEL_REQUESTS: args.max_parallel,
+                const_module.CONF_ADAPTIVE_POLLING: not args.no_adaptive,
+            },
+        )
+        coordinator, manager, writes, add_pending = await setup_integration(hass, entry)
+        api = coordinator.api
+        interval = args.interval or coordinator.update_interval.total_seconds()
+
+        cycle_seconds = []
+        requests_per_cycle = []
+        bytes_per_cycle = []
+        writes_per_cycle = []
+        failed_cycles = 0
+        entities = await add_pending()
+
+        try:
+            for cycle in range(args.cycles):
+                gateway.advance(interval)
+                advance_schedules(coordinator, interval)
+                requests_before = gateway.requests
+                bytes_before = sum(s.bytes for s in api.stats.endpoints.values())
+                writes["count"] = 0
+                started = time.perf_counter()
+
+                # Echter Refresh: Breaker, Planer, Zeitpläne, Host-Diff, Listener der Plattformen
+                await coordinator.async_refresh()
+
+                cycle_seconds.append(time.perf_counter() - started)
+                if not coordinator.last_update_success:
+                    failed_cycles += 1
+                # Während des Zyklus entdeckte Entities (DHCP-Keys, Kanäle, neue Hosts)
+                entities += await add_pending()
+                requests_per_cycle.append(gateway.requests - requests_before)
+                bytes_per_cycle.append(
+                    sum(s.bytes for s in api.stats.endpoints.values()) - bytes_before
+                )
+                # Der erste Zyklus schreibt alle Entities -> nicht in den Durchschnitt
+                if cycle:
+                    writes_per_cycle.append(writes["count"])
+        finally:
+            await teardown_integration(hass, entry, coordinator, manager)
+            await runner.cleanup()
+
+    cycle_ms = [s * 1000 for s in cycle_seconds]
+    return {
+        "hosts": hosts,
+        "cycles": args.cycles,
+        "cycle_ms_p50": round(statistics.median(cycle_ms), 2),
+        "cycle_ms_p95": round(percentile(cycle_ms, 0.95), 2),
+        "cycle_ms_max": round(max(cycle_ms), 2),
+        "requests_per_cycle": round(statistics.mean(requests_per_cycle), 2),
+        "bytes_per_cycle": round(statistics.mean(bytes_per_cycle)),
+        "memory_per_host_bytes": round(memory_per_host(gateway.host_tbl), 1),
+        "state_writes_per_cycle": round(statistics.mean(writes_per_cycle), 2)
+        if writes_per_cycle
+        else None,
+        "entities": entities,
+        "failed_cycles": failed_cycles,
+        "endpoint_errors": dict(coordinator.endpoint_errors),
+        "logins": api.stats.logins,
+        "relogins": api.stats.relogins,
+        "host_unchanged": sum(s.unchanged for s in api.stats.endpoints.values()),
+        "errors_by_type": dict(api.stats.errors_by_type),
+        "coordinator_stats": dict(coordinator.stats),
+    }
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Return one message per metric that got worse than the baseline allows."""
+    by_hosts = {entry["hosts"]: entry for entry in baseline}
+    regressions = []
+    for result in results:
+        reference = by_hosts.get(result["hosts"])
+        if reference is None:
+            continue
+        for metric in REGRESSION_METRICS:
+            old, new = reference.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > 1e-9:
+                regressions.append(
+                    f"{result['hosts']} hosts: {metric} {old} -> {new} (+{(new / old - 1) * 100:.0f}%)"
+                    if old
+                    else f"{result['hosts']} hosts: {metric} {old} -> {new}"
+                )
+    return regressions
+
+
+def print_table(results: list[dict]) -> None:
+    columns = ("hosts",) + REGRESSION_METRICS + ("relogins", "failed_cycles")
+    print("  ".join(f"{column:>22}" for column in columns))
+    for result in results:
+        print("  ".join(f"{str(result.get(column)):>22}" for column in columns))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the integration's coordinator and platforms against a mock gateway"
+    )
+    parser.add_argument("--hosts", default="10,100,1000,5000",
+                        help="comma-separated hostTbl sizes")
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=None,
+                        help="simulated seconds between cycles (default: the coordinator tick)")
+    parser.add_argument("--max-parallel", type=int, default=2)
+    parser.add_argument("--no-adaptive", action="store_true",
+                        help="disable the adaptive back-off of unchanged endpoints")
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--session-requests", type=int, default=None,
+                        help="expire the session after N requests")
+    parser.add_argument("--expiry-mode", choices=("401", "html", "nodata"), default="401")
+    parser.add_argument("--churn", type=float, default=0.02,
+                        help="share of hosts toggling active per cycle")
+    parser.add_argument("--etag", action="store_true",
+                        help="mock sends ETags (default: raw-body hash only)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative increase before a metric counts as regression")
+    args = parser.parse_args()
+
+    async def _run_all():
+        return [
+            await run_scenario(int(hosts), args) for hosts in args.hosts.split(",") if hosts
+        ]
+
+    results = asyncio.run(_run_all())
+    print_table(results)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
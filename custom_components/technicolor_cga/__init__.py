@@ -1,15 +1,106 @@
 import logging
 
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.const import CONF_USERNAME, CONF_PASSWORD, CONF_HOST
+import voluptuous as vol
 
-from .const import DOMAIN
-from .technicolor_cga import TechnicolorCGA
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import Event, HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import ConfigEntryNotReady, ServiceValidationError
+from homeassistant.const import CONF_USERNAME, CONF_PASSWORD, CONF_HOST, EVENT_HOMEASSISTANT_STOP
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    DATA_MANAGER,
+    DATA_IDENTITY,
+    DATA_DHCP_KEYS,
+    CONF_MAX_PARALLEL_REQUESTS,
+    DEFAULT_MAX_PARALLEL_REQUESTS,
+    CONF_ADAPTIVE_POLLING,
+    DEFAULT_ADAPTIVE_POLLING,
+    CONF_KNOWN_DEVICE_MAX_AGE,
+    DEFAULT_KNOWN_DEVICE_MAX_AGE,
+    ENDPOINT_HOST,
+    SERVICE_PRESENCE_STATISTICS,
+    SERVICE_REBOOT,
+    SERVICE_PROFILE,
+    ATTR_CYCLES,
+    DEFAULT_PROFILE_CYCLES,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_RESOLUTION,
+    ATTR_DAYS,
+    ATTR_MAC,
+)
+from .coordinator import TechnicolorCGACoordinator, endpoint_intervals
+from .manager import async_get_manager
+from .presence import DAILY, HOURLY
+from .schedule import HOST_MAX_BACKOFF_FACTOR
+from .store import KnownDeviceStore, PresenceStore
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = ["sensor"]
+PLATFORMS = ["sensor", "device_tracker"]
+
+PRESENCE_STATISTICS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_RESOLUTION, default=DAILY): vol.In([DAILY, HOURLY]),
+        vol.Optional(ATTR_DAYS, default=7): vol.All(vol.Coerce(int), vol.Range(min=1, max=3650)),
+        vol.Optional(ATTR_MAC): cv.string,
+    }
+)
+
+REBOOT_SCHEMA = vol.Schema({vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string})
+
+
+async def _async_reboot(call: ServiceCall) -> None:
+    """Restart one gateway; its coordinator reconnects as soon as it is back."""
+    entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+    entry_store = call.hass.data.get(DOMAIN, {}).get(entry_id)
+    if entry_store is None:
+        raise ServiceValidationError(f"Unknown or not loaded config entry: {entry_id}")
+    await entry_store["coordinator"].async_reboot()
+
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_CYCLES, default=DEFAULT_PROFILE_CYCLES): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=50)
+        ),
+    }
+)
+
+
+async def _async_profile(call: ServiceCall) -> None:
+    """Profile the next poll cycles of one gateway; files go to the config directory."""
+    entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+    entry_store = call.hass.data.get(DOMAIN, {}).get(entry_id)
+    if entry_store is None:
+        raise ServiceValidationError(f"Unknown or not loaded config entry: {entry_id}")
+    await entry_store["coordinator"].async_start_profile(call.data[ATTR_CYCLES])
+
+
+async def _async_presence_statistics(call: ServiceCall) -> dict:
+    """Return hourly or daily presence rollups of one or all gateways."""
+    hass = call.hass
+    entries = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    if entry_id is not None and entry_id not in entries:
+        raise ServiceValidationError(f"Unknown or not loaded config entry: {entry_id}")
+
+    since = int(dt_util.utcnow().timestamp()) - call.data[ATTR_DAYS] * 86400
+    mac = call.data.get(ATTR_MAC)
+    gateways = {}
+    for current_id, entry_store in entries.items():
+        if entry_id is not None and current_id != entry_id:
+            continue
+        coordinator = entry_store["coordinator"]
+        rows = await coordinator.presence.async_query(call.data[ATTR_RESOLUTION], since, mac)
+        for row in rows:
+            row["start"] = dt_util.as_local(dt_util.utc_from_timestamp(row["start"])).isoformat()
+        gateways[current_id] = {"gateway": coordinator.api.server, "rows": rows}
+    return {"gateways": gateways}
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -24,31 +115,108 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     _LOGGER.debug("Setting up Technicolor CGA with router %s", router)
 
-    try:
-        api = TechnicolorCGA(username, password, router)
-        await hass.async_add_executor_job(api.login)
-    except Exception as err:
-        _LOGGER.error("Failed to log in to Technicolor CGA: %s", err)
-        return False
-
-    # ✅ Platz für api + später unsub (Interval-Listener)
-    hass.data[DOMAIN][entry.entry_id] = {"api": api, "unsub": None}
+    # ✅ Client auf der gemeinsamen Session aller Gateways
+    manager = async_get_manager(hass)
+    api = manager.client(username, password, router)
+
+    # ✅ Bekannte Geräte überleben HA-Neustarts
+    known_devices = KnownDeviceStore(
+        hass,
+        entry.entry_id,
+        entry.options.get(CONF_KNOWN_DEVICE_MAX_AGE, DEFAULT_KNOWN_DEVICE_MAX_AGE),
+    )
+    await known_devices.async_load()
+
+    # ✅ Kompaktes Anwesenheits-Log (Bitmap pro Host-Abruf) mit Stunden-/Tagessummen
+    intervals = endpoint_intervals(entry)
+    presence = PresenceStore(
+        hass, entry.entry_id, intervals[ENDPOINT_HOST] * HOST_MAX_BACKOFF_FACTOR
+    )
+    await presence.async_load()
+
+    async def _async_flush_presence(_event: Event) -> None:
+        # Beim Beenden von HA wird der Entry nicht entladen -> gepufferte Samples jetzt schreiben
+        await presence.async_flush()
+
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_flush_presence)
+    )
+
+    # ✅ Ein Coordinator pro Gateway: jeder Endpunkt nur einmal pro (eigenem) Intervall
+    coordinator = TechnicolorCGACoordinator(
+        hass,
+        entry,
+        api,
+        intervals,
+        max_parallel=entry.options.get(
+            CONF_MAX_PARALLEL_REQUESTS, DEFAULT_MAX_PARALLEL_REQUESTS
+        ),
+        adaptive=entry.options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
+        known_devices=known_devices,
+        manager=manager,
+        presence=presence,
+    )
+    manager.async_add_gateway(entry.entry_id, coordinator)
+
+    cached = bool(entry.data.get(DATA_IDENTITY) and entry.data.get(DATA_DHCP_KEYS))
+    if not cached:
+        # Erstes Setup ohne Cache: auf die Daten warten, bei Fehler später erneut versuchen
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except ConfigEntryNotReady:
+            await manager.async_remove_gateway(entry.entry_id)
+            raise
+
+    hass.data[DOMAIN][entry.entry_id] = {
+        "api": api,
+        "coordinator": coordinator,
+    }
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    if not hass.services.has_service(DOMAIN, SERVICE_REBOOT):
+        hass.services.async_register(DOMAIN, SERVICE_REBOOT, _async_reboot, schema=REBOOT_SCHEMA)
+    if not hass.services.has_service(DOMAIN, SERVICE_PROFILE):
+        hass.services.async_register(DOMAIN, SERVICE_PROFILE, _async_profile, schema=PROFILE_SCHEMA)
+    if not hass.services.has_service(DOMAIN, SERVICE_PRESENCE_STATISTICS):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_PRESENCE_STATISTICS,
+            _async_presence_statistics,
+            schema=PRESENCE_STATISTICS_SCHEMA,
+            supports_response=SupportsResponse.ONLY,
+        )
+
+    if cached:
+        # ✅ Entities stehen schon (aus dem Cache); Login + erster Abruf im Hintergrund
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.entry_id}"
+        )
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    # ✅ erst Timer abmelden (falls gesetzt)
-    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
-    if entry_data and entry_data.get("unsub"):
-        entry_data["unsub"]()
-        entry_data["unsub"] = None
-
-    unload_ok = await hass.config_entries.async_forward_entry_unload(entry, "sensor")
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if entry_data:
+            await entry_data["coordinator"].known_devices.async_flush()
+            await entry_data["coordinator"].presence.async_flush()
+            await entry_data["coordinator"].manager.async_remove_gateway(entry.entry_id)
+        if not hass.data[DOMAIN]:
+            hass.services.async_remove(DOMAIN, SERVICE_PRESENCE_STATISTICS)
+            hass.services.async_remove(DOMAIN, SERVICE_REBOOT)
+            hass.services.async_remove(DOMAIN, SERVICE_PROFILE)
 
     return unload_ok
 
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove persisted data of a deleted config entry."""
+    await KnownDeviceStore(hass, entry.entry_id, DEFAULT_KNOWN_DEVICE_MAX_AGE).async_remove()
+    await PresenceStore(hass, entry.entry_id, 0).async_remove()
+
+    manager = hass.data.get(DATA_MANAGER)
+    if manager is not None:
+        manager.async_reassign_fleet_sensors()
@@ -0,0 +1,87 @@
+import random
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Nach so vielen fehlgeschlagenen Zyklen in Folge wird nicht mehr gepollt
+FAILURE_THRESHOLD = 3
+# Erste Pause nach dem Öffnen, verdoppelt sich mit jeder fehlgeschlagenen Probe
+BASE_DELAY = 30.0
+MAX_DELAY = 1800.0
+# ±20 %, damit mehrere Gateways/Instanzen nicht im Gleichschritt proben
+JITTER = 0.2
+
+
+class CircuitBreaker:
+    """Stop polling a gateway that keeps failing and probe it with back-off.
+
+    After ``failure_threshold`` failed cycles in a row the circuit opens: no
+    requests until ``retry_at``. Then ``allow`` moves it to half-open for a
+    single probe; a failed probe reopens it with twice the delay (up to
+    ``max_delay``, with jitter), a successful one closes it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        base_delay: float = BASE_DELAY,
+        max_delay: float = MAX_DELAY,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.state = CLOSED
+        self.failures = 0
+        self.times_opened = 0
+        self.retry_at = 0.0
+        self._delay = base_delay
+        self._rng = rng or random.Random()
+
+    @property
+    def probing(self) -> bool:
+        return self.state == HALF_OPEN
+
+    def allow(self, now: float) -> bool:
+        """Return True if a request may be sent now (closed, or time for a probe)."""
+        if self.state == CLOSED:
+            return True
+        if now >= self.retry_at:
+            self.state = HALF_OPEN
+            return True
+        return False
+
+    def seconds_until_retry(self, now: float) -> float:
+        return max(0.0, self.retry_at - now)
+
+    def record_success(self) -> bool:
+        """Close the circuit; returns True if it was open or half-open before."""
+        recovered = self.state != CLOSED
+        self.state = CLOSED
+        self.failures = 0
+        self._delay = self.base_delay
+        return recovered
+
+    def record_failure(self, now: float) -> bool:
+        """Count a failed cycle or probe; returns True if the circuit just opened."""
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self._delay = min(self._delay * 2, self.max_delay)
+        elif self.failures < self.failure_threshold:
+            return False
+        else:
+            self.times_opened += 1
+
+        opened = self.state == CLOSED
+        self.state = OPEN
+        self.retry_at = now + self._delay * self._rng.uniform(1 - JITTER, 1 + JITTER)
+        return opened
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "next_delay_seconds": round(self._delay),
+        }
@@ -1,9 +1,34 @@
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_USERNAME, CONF_PASSWORD, CONF_HOST, CONF_SCAN_INTERVAL
-from .const import DOMAIN
-
-DEFAULT_SCAN_SECONDS = 300
+import homeassistant.helpers.config_validation as cv
+from .const import (
+    DOMAIN,
+    DEFAULT_SCAN_SECONDS,
+    CONF_MAX_PARALLEL_REQUESTS,
+    DEFAULT_MAX_PARALLEL_REQUESTS,
+    CONF_ENDPOINT_INTERVALS,
+    DEFAULT_ENDPOINT_INTERVALS,
+    CONF_ADAPTIVE_POLLING,
+    DEFAULT_ADAPTIVE_POLLING,
+    CONF_KNOWN_DEVICE_MAX_AGE,
+    DEFAULT_KNOWN_DEVICE_MAX_AGE,
+    CONF_HOST_EVENT_CONFIRM_POLLS,
+    DEFAULT_HOST_EVENT_CONFIRM_POLLS,
+    DATA_DHCP_KEYS,
+    CONF_DHCP_EXCLUDED,
+    CONF_SYSTEM_FIELDS,
+    CONF_DOCSIS_TABLES,
+    CONF_HOST_TABLE_ATTRIBUTE,
+    DEFAULT_HOST_TABLE_ATTRIBUTE,
+    CONF_PROFILING,
+    DEFAULT_PROFILING,
+)
+from .coordinator import endpoint_intervals
+from .technicolor_cga import DHCP_FIELDS, MODEM_FIELDS, SYSTEM_FIELDS
+
+# Formularfeld mit den gewünschten DHCP-Keys (gespeichert wird CONF_DHCP_EXCLUDED)
+DHCP_SENSORS = "dhcp_sensors"
 
 
 class TechnicolorCGAConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -53,6 +78,9 @@ class TechnicolorCGAOptionsFlow(config_entries.OptionsFlow):
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
         # NICHT self.config_entry setzen (read-only property) -> eigener Name
         self._config_entry = config_entry
+        # Zwischenstand aus Schritt "init", gespeichert wird erst nach "entities"
+        self._new_data: dict = {}
+        self._new_options: dict = {}
 
     async def async_step_init(self, user_input=None):
         if user_input is None:
@@ -65,6 +93,28 @@ class TechnicolorCGAOptionsFlow(config_entries.OptionsFlow):
             current_scan = self._config_entry.options.get(
                 CONF_SCAN_INTERVAL, DEFAULT_SCAN_SECONDS
             )
+            current_parallel = self._config_entry.options.get(
+                CONF_MAX_PARALLEL_REQUESTS, DEFAULT_MAX_PARALLEL_REQUESTS
+            )
+            current_intervals = endpoint_intervals(self._config_entry)
+            current_adaptive = self._config_entry.options.get(
+                CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING
+            )
+            current_max_age = self._config_entry.options.get(
+                CONF_KNOWN_DEVICE_MAX_AGE, DEFAULT_KNOWN_DEVICE_MAX_AGE
+            )
+            current_confirm_polls = self._config_entry.options.get(
+                CONF_HOST_EVENT_CONFIRM_POLLS, DEFAULT_HOST_EVENT_CONFIRM_POLLS
+            )
+            current_profiling = self._config_entry.options.get(CONF_PROFILING, DEFAULT_PROFILING)
+
+            # Ein Intervall pro Endpunkt (z.B. DHCP selten, Hosts häufig)
+            interval_fields = {
+                vol.Required(option, default=current_intervals[endpoint]): vol.All(
+                    vol.Coerce(int), vol.Range(min=10, max=86400)
+                )
+                for endpoint, option in CONF_ENDPOINT_INTERVALS.items()
+            }
 
             return self.async_show_form(
                 step_id="init",
@@ -75,6 +125,20 @@ class TechnicolorCGAOptionsFlow(config_entries.OptionsFlow):
                         vol.Required(
                             CONF_SCAN_INTERVAL, default=current_scan
                         ): vol.All(vol.Coerce(int), vol.Range(min=10, max=86400)),
+                        vol.Required(
+                            CONF_MAX_PARALLEL_REQUESTS, default=current_parallel
+                        ): vol.All(vol.Coerce(int), vol.Range(min=1, max=4)),
+                        **interval_fields,
+                        vol.Required(
+                            CONF_ADAPTIVE_POLLING, default=current_adaptive
+                        ): bool,
+                        vol.Required(
+                            CONF_KNOWN_DEVICE_MAX_AGE, default=current_max_age
+                        ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3650)),
+                        vol.Required(
+                            CONF_HOST_EVENT_CONFIRM_POLLS, default=current_confirm_polls
+                        ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+                        vol.Required(CONF_PROFILING, default=current_profiling): bool,
                     }
                 ),
             )
@@ -87,12 +151,88 @@ class TechnicolorCGAOptionsFlow(config_entries.OptionsFlow):
         # options updaten (Scan + Host + Password)
         new_options = dict(self._config_entry.options)
         new_options[CONF_SCAN_INTERVAL] = user_input[CONF_SCAN_INTERVAL]
+        new_options[CONF_MAX_PARALLEL_REQUESTS] = user_input[CONF_MAX_PARALLEL_REQUESTS]
+        new_options[CONF_ADAPTIVE_POLLING] = user_input[CONF_ADAPTIVE_POLLING]
+        new_options[CONF_KNOWN_DEVICE_MAX_AGE] = user_input[CONF_KNOWN_DEVICE_MAX_AGE]
+        new_options[CONF_HOST_EVENT_CONFIRM_POLLS] = user_input[CONF_HOST_EVENT_CONFIRM_POLLS]
+        new_options[CONF_PROFILING] = user_input[CONF_PROFILING]
+        # Endpunkt-Intervall, das dem (alten oder neuen) Scan-Intervall entspricht, nicht speichern:
+        # sonst greift eine spätere Änderung des Scan-Intervalls nie mehr
+        old_scan = int(
+            self._config_entry.options.get(
+                CONF_SCAN_INTERVAL,
+                self._config_entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_SECONDS),
+            )
+        )
+        for endpoint, option in CONF_ENDPOINT_INTERVALS.items():
+            inherited = {
+                DEFAULT_ENDPOINT_INTERVALS.get(endpoint, scan)
+                for scan in (old_scan, user_input[CONF_SCAN_INTERVAL])
+            }
+            if user_input[option] in inherited:
+                new_options.pop(option, None)
+            else:
+                new_options[option] = user_input[option]
         new_options[CONF_HOST] = user_input[CONF_HOST]
         new_options[CONF_PASSWORD] = user_input[CONF_PASSWORD]
 
+        self._new_data = new_data
+        self._new_options = new_options
+        return await self.async_step_entities()
+
+    async def async_step_entities(self, user_input=None):
+        """Pick the sensors and attributes; only their fields are fetched."""
+        options = self._config_entry.options
+        # CMStatus ist der Sensor-Zustand und wird immer geholt
+        system_choices = [f for f in SYSTEM_FIELDS if f != "CMStatus"]
+        dhcp_choices = sorted({*DHCP_FIELDS, *(self._config_entry.data.get(DATA_DHCP_KEYS) or ())})
+
+        if user_input is None:
+            excluded = set(options.get(CONF_DHCP_EXCLUDED, ()))
+            current_dhcp = [k for k in dhcp_choices if k not in excluded]
+            current_system = [
+                f for f in options.get(CONF_SYSTEM_FIELDS, SYSTEM_FIELDS) if f in system_choices
+            ]
+            current_docsis = list(options.get(CONF_DOCSIS_TABLES, MODEM_FIELDS))
+            current_host_table = options.get(
+                CONF_HOST_TABLE_ATTRIBUTE, DEFAULT_HOST_TABLE_ATTRIBUTE
+            )
+
+            return self.async_show_form(
+                step_id="entities",
+                data_schema=vol.Schema(
+                    {
+                        vol.Optional(
+                            DHCP_SENSORS, default=current_dhcp
+                        ): cv.multi_select({k: k for k in dhcp_choices}),
+                        vol.Optional(
+                            CONF_SYSTEM_FIELDS, default=current_system
+                        ): cv.multi_select({f: f for f in system_choices}),
+                        vol.Required(
+                            CONF_HOST_TABLE_ATTRIBUTE, default=current_host_table
+                        ): bool,
+                        vol.Optional(
+                            CONF_DOCSIS_TABLES, default=current_docsis
+                        ): cv.multi_select({t: t for t in MODEM_FIELDS}),
+                    }
+                ),
+            )
+
+        new_options = self._new_options
+        # Formular zeigt die gewünschten DHCP-Keys, gespeichert wird die Blacklist
+        selected_dhcp = set(user_input.get(DHCP_SENSORS, ()))
+        new_options[CONF_DHCP_EXCLUDED] = [k for k in dhcp_choices if k not in selected_dhcp]
+        new_options[CONF_SYSTEM_FIELDS] = [
+            f for f in system_choices if f in user_input.get(CONF_SYSTEM_FIELDS, ())
+        ]
+        new_options[CONF_HOST_TABLE_ATTRIBUTE] = user_input[CONF_HOST_TABLE_ATTRIBUTE]
+        new_options[CONF_DOCSIS_TABLES] = [
+            t for t in MODEM_FIELDS if t in user_input.get(CONF_DOCSIS_TABLES, ())
+        ]
+
         self.hass.config_entries.async_update_entry(
             self._config_entry,
-            data=new_data,
+            data=self._new_data,
             options=new_options,
         )
 
@@ -2,3 +2,98 @@ from homeassistant.const import CONF_USERNAME, CONF_PASSWORD, CONF_HOST
 
 DOMAIN = "technicolor_cga"
 
+DEFAULT_SCAN_SECONDS = 300
+
+# Gateway-Endpunkte, die der Coordinator pro Zyklus einmal abholt
+ENDPOINT_SYSTEM = "system"
+ENDPOINT_DHCP = "dhcp"
+ENDPOINT_HOST = "host"
+ENDPOINT_MODEM = "modem"
+
+# Ohne registrierte Verbraucher (erster Refresh) werden diese geholt
+DEFAULT_ENDPOINTS = (ENDPOINT_SYSTEM, ENDPOINT_DHCP, ENDPOINT_HOST)
+
+# Eigenes Timeout pro Endpunkt (Sekunden), damit eine langsame Tabelle die anderen nicht aufhält
+DEFAULT_ENDPOINT_TIMEOUT = 15
+ENDPOINT_TIMEOUTS = {
+    ENDPOINT_SYSTEM: 10,
+    ENDPOINT_DHCP: 10,
+    ENDPOINT_HOST: 25,
+    ENDPOINT_MODEM: 20,
+}
+
+CONF_MAX_PARALLEL_REQUESTS = "max_parallel_requests"
+DEFAULT_MAX_PARALLEL_REQUESTS = 2
+
+# Eigenes Abfrageintervall pro Endpunkt; ohne Wert gilt CONF_SCAN_INTERVAL
+CONF_ENDPOINT_INTERVALS = {
+    ENDPOINT_SYSTEM: "scan_interval_system",
+    ENDPOINT_DHCP: "scan_interval_dhcp",
+    ENDPOINT_HOST: "scan_interval_host",
+    ENDPOINT_MODEM: "scan_interval_modem",
+}
+DEFAULT_ENDPOINT_INTERVALS = {
+    ENDPOINT_DHCP: 3600,
+}
+
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+DEFAULT_ADAPTIVE_POLLING = True
+
+# Im Config-Entry gecachte Gerätedaten (für device_info)
+DATA_IDENTITY = "identity"
+# Zuletzt bekannte DHCP-Keys -> DHCP-Sensoren ohne Warten auf den Router anlegen
+DATA_DHCP_KEYS = "dhcp_keys"
+
+# Bekannte Geräte, die so viele Tage nicht gesehen wurden, werden vergessen
+CONF_KNOWN_DEVICE_MAX_AGE = "known_device_max_age"
+DEFAULT_KNOWN_DEVICE_MAX_AGE = 30
+
+# Domain-weiter Manager aller Gateways (hass.data[DATA_MANAGER])
+DATA_MANAGER = f"{DOMAIN}_manager"
+# Gleichzeitige Requests über alle Gateways zusammen
+FLEET_MAX_PARALLEL_REQUESTS = 4
+# Ein Slot-Beginn näher als das (Sekunden) gilt als der aktuelle: Refresh kam etwas zu früh
+PHASE_TOLERANCE = 2.0
+
+# Events bei Host-Änderungen (einmal pro Poll aus dem Host-Diff)
+EVENT_HOST_JOINED = f"{DOMAIN}_host_joined"
+EVENT_HOST_LEFT = f"{DOMAIN}_host_left"
+EVENT_HOST_IP_CHANGED = f"{DOMAIN}_host_ip_changed"
+EVENT_HOST_INACTIVE = f"{DOMAIN}_host_inactive"
+# Neuer Zustand muss so viele Host-Abrufe in Folge bestehen (Entprellung)
+CONF_HOST_EVENT_CONFIRM_POLLS = "host_event_confirm_polls"
+DEFAULT_HOST_EVENT_CONFIRM_POLLS = 2
+
+# Auswahl der Sensoren/Attribute (zweiter Options-Schritt); nur Gewähltes wird abgefragt
+# DHCP als Blacklist, damit später auftauchende Keys automatisch Sensoren bekommen
+CONF_DHCP_EXCLUDED = "dhcp_excluded"
+# Ohne Wert: alle Felder bzw. Tabellen
+CONF_SYSTEM_FIELDS = "system_fields"
+CONF_DOCSIS_TABLES = "docsis_tables"
+CONF_HOST_TABLE_ATTRIBUTE = "host_table_attribute"
+DEFAULT_HOST_TABLE_ATTRIBUTE = True
+
+# Service: Anwesenheitsstatistik aus dem Presence-Log abfragen
+SERVICE_PRESENCE_STATISTICS = "presence_statistics"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_RESOLUTION = "resolution"
+ATTR_DAYS = "days"
+ATTR_MAC = "mac"
+
+# Neustart des Gateways: Service, Event und schneller Reconnect danach
+SERVICE_REBOOT = "reboot"
+EVENT_GATEWAY_REBOOTED = f"{DOMAIN}_gateway_rebooted"
+# Während des Reconnects alle paar Sekunden eine leichte Probe statt des normalen Takts
+RECONNECT_INTERVAL = 5
+# So lange wird schnell geprobt (Gateway plötzlich weg / Neustart per Service)
+RECONNECT_WINDOW = 300
+REBOOT_RECONNECT_WINDOW = 600
+# Nach einem erkannten Neustart alle Endpunkte noch einmal holen (Hosts melden sich erst nach und nach)
+REBOOT_SETTLE_SECONDS = 30
+
+# Profiling: Zeiten pro Stufe jedes Zyklus (Option) bzw. cProfile über N Zyklen (Service)
+CONF_PROFILING = "profiling"
+DEFAULT_PROFILING = False
+SERVICE_PROFILE = "profile"
+ATTR_CYCLES = "cycles"
+DEFAULT_PROFILE_CYCLES = 5
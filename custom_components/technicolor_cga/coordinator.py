@@ -0,0 +1,720 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_SCAN_INTERVAL
+import aiohttp
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util import dt as dt_util
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import (
+    DOMAIN,
+    DEFAULT_SCAN_SECONDS,
+    ENDPOINT_SYSTEM,
+    ENDPOINT_DHCP,
+    ENDPOINT_HOST,
+    ENDPOINT_MODEM,
+    DEFAULT_ENDPOINTS,
+    ENDPOINT_TIMEOUTS,
+    DEFAULT_ENDPOINT_TIMEOUT,
+    DEFAULT_MAX_PARALLEL_REQUESTS,
+    CONF_ENDPOINT_INTERVALS,
+    DEFAULT_ENDPOINT_INTERVALS,
+    DATA_IDENTITY,
+    DATA_DHCP_KEYS,
+    CONF_HOST_EVENT_CONFIRM_POLLS,
+    DEFAULT_HOST_EVENT_CONFIRM_POLLS,
+    EVENT_GATEWAY_REBOOTED,
+    RECONNECT_INTERVAL,
+    RECONNECT_WINDOW,
+    REBOOT_RECONNECT_WINDOW,
+    REBOOT_SETTLE_SECONDS,
+    CONF_PROFILING,
+    DEFAULT_PROFILING,
+)
+from .breaker import OPEN, CircuitBreaker
+from .docsis import DocsisTracker
+from .events import HostEventTracker
+from .hosts import HostDiff, HostTable
+from .planner import PlannedRequest, plan_requests
+from .profiler import CycleProfiler, write_profile
+from .schedule import HOST_MAX_BACKOFF_FACTOR, MAX_BACKOFF_FACTOR, EndpointSchedule
+from .store import KnownDeviceStore, PresenceStore
+from .technicolor_cga import (
+    AsyncTechnicolorCGA,
+    Payload,
+    SessionExpired,
+    IDENTITY_FIELDS,
+    SYSTEM_FIELDS,
+    DHCP_FIELDS,
+    HOST_FIELDS,
+    MODEM_FIELDS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Logischer Endpunkt -> (API-Ziel, Standard-Felder)
+ENDPOINT_REQUESTS = {
+    ENDPOINT_SYSTEM: ("system", SYSTEM_FIELDS),
+    ENDPOINT_DHCP: ("dhcp/v4/1", DHCP_FIELDS),
+    ENDPOINT_HOST: ("host", HOST_FIELDS),
+    ENDPOINT_MODEM: ("modem", MODEM_FIELDS),
+}
+# Felder, die der Coordinator selbst braucht (Reboot-Erkennung, Host-Tabelle), egal was gewählt ist
+REQUIRED_FIELDS = {
+    ENDPOINT_SYSTEM: ("UpTime",),
+    ENDPOINT_HOST: ("hostTbl",),
+}
+# Auch ohne Verbraucher abgefragt: UpTime für Reboot-Erkennung, Reconnect und DOCSIS-Zähler-Resets
+ALWAYS_FETCHED = (ENDPOINT_SYSTEM,)
+# Identity ist kein gepollter Endpunkt, wird aber bei Bedarf in den system-Request gemischt
+IDENTITY_REQUEST = ("identity", "system", IDENTITY_FIELDS)
+# Ziele mit bedingtem Abruf (unveränderte Antwort wird nicht erneut dekodiert)
+CONDITIONAL_TARGETS = {"host"}
+
+
+def endpoint_intervals(entry: ConfigEntry) -> dict[str, int]:
+    """Return the configured poll interval (seconds) of every endpoint."""
+    scan_seconds = int(
+        entry.options.get(
+            CONF_SCAN_INTERVAL,
+            entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_SECONDS),
+        )
+    )
+    return {
+        endpoint: int(
+            entry.options.get(option, DEFAULT_ENDPOINT_INTERVALS.get(endpoint, scan_seconds))
+        )
+        for endpoint, option in CONF_ENDPOINT_INTERVALS.items()
+    }
+
+
+def parse_uptime(value) -> int | None:
+    """Return the gateway UpTime in seconds, or None if it cannot be parsed."""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class TechnicolorCGACoordinator(DataUpdateCoordinator):
+    """Fetch each gateway endpoint once per cycle and share the snapshot.
+
+    Entities register the endpoints they read via ``async_add_consumer``.
+    Every consumer beyond the first one of an endpoint is a request that
+    would have been sent without the coordinator; those are counted in
+    ``stats["requests_saved"]``.
+
+    The endpoints of one cycle are fetched concurrently, limited to
+    ``max_parallel`` requests in flight (some firmware versions only cope
+    with one or two parallel sessions), each with its own timeout.
+
+    With a ``manager``, requests also draw from the fleet-wide budget and
+    the next refresh is shifted into the gateway's poll slot.
+
+    Consumers may ask for only some fields of an endpoint. The due
+    endpoints of a cycle go through the request planner, which merges all
+    field lists of one API target into a single call.
+
+    Every endpoint has its own ``EndpointSchedule``; the coordinator ticks
+    at the shortest interval and only fetches the endpoints that are due.
+    Endpoints whose payload did not change in a cycle keep their previous
+    snapshot object; ``changed_endpoints`` lists the ones that did change.
+    The host table is fetched conditionally: an unchanged response is not
+    decoded again, and a changed one is merged into ``hosts`` with the
+    resulting ``host_diff`` (added, removed, changed hosts) for consumers.
+    Every host fetch also feeds ``host_events``, which fires debounced
+    host joined/left/inactive/IP-changed events on the bus, and the
+    ``presence`` log (active MACs plus DHCP churn: new hosts and IP changes).
+
+    The immutable identity fields (serial number, versions, ...) are not
+    part of the poll: they are merged into the system request after the
+    first login and again after ``UpTime`` went backwards (gateway reboot),
+    and cached in the config entry together with the DHCP keys.
+    Login happens in the first update, so setup never waits for the gateway.
+
+    Failed cycles feed a ``CircuitBreaker``: while it is open no requests
+    are sent and the next refresh is scheduled for the probe, which is a
+    single light request before full polling resumes.
+
+    When a healthy gateway suddenly stops answering, or after
+    ``async_reboot``, the coordinator switches to reconnect mode instead:
+    a light probe every ``RECONNECT_INTERVAL`` seconds (the breaker is
+    bypassed) until the gateway answers again, then a fresh login and a
+    full poll of all endpoints. A detected reboot (``UpTime`` went
+    backwards) fires ``EVENT_GATEWAY_REBOOTED`` and refreshes all
+    endpoints once more after ``REBOOT_SETTLE_SECONDS``.
+
+    ``profiler`` times the stages of each cycle (fetch, parse, diff,
+    process, and the entity work in the listeners) when profiling is on,
+    and ``async_start_profile`` captures a cProfile over a few cycles into
+    the config directory.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        api: AsyncTechnicolorCGA,
+        intervals: dict[str, int],
+        max_parallel: int = DEFAULT_MAX_PARALLEL_REQUESTS,
+        adaptive: bool = True,
+        known_devices: KnownDeviceStore | None = None,
+        manager=None,
+        presence: PresenceStore | None = None,
+    ) -> None:
+        tick = min(intervals.values())
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name=f"{DOMAIN} {entry.entry_id}",
+            update_interval=timedelta(seconds=tick),
+        )
+        self._tick = tick
+        self._slack = min(5.0, tick * 0.1)
+        self.schedules = {
+            endpoint: EndpointSchedule(
+                interval,
+                adaptive,
+                HOST_MAX_BACKOFF_FACTOR if endpoint == ENDPOINT_HOST else MAX_BACKOFF_FACTOR,
+            )
+            for endpoint, interval in intervals.items()
+        }
+        self.changed_endpoints: set[str] = set()
+        self.api = api
+        self.manager = manager
+        self.known_devices = known_devices
+        self.presence = presence
+        self.hosts = HostTable()
+        self.host_diff = HostDiff()
+        self.host_events = HostEventTracker(
+            entry.options.get(CONF_HOST_EVENT_CONFIRM_POLLS, DEFAULT_HOST_EVENT_CONFIRM_POLLS)
+        )
+        self.docsis = DocsisTracker()
+        self.fetched_endpoints: set[str] = set()
+        self._semaphore = asyncio.Semaphore(max(1, int(max_parallel)))
+        self._consumers: Counter[str] = Counter()
+        # Endpunkt -> Felder, die die registrierten Verbraucher lesen (mit Anzahl)
+        self._consumer_fields: defaultdict[str, Counter[str]] = defaultdict(Counter)
+        self.last_plan: list[PlannedRequest] = []
+        self.stats = {
+            "cycles": 0,
+            "requests": 0,
+            "requests_saved": 0,
+            "requests_merged": 0,
+            "requests_deferred": 0,
+            "last_cycle_seconds": None,
+            "queue_wait_seconds": None,
+        }
+        self.endpoint_errors: dict[str, str] = {}
+        self.breaker = CircuitBreaker()
+        self.identity: dict = dict(entry.data.get(DATA_IDENTITY) or {})
+        self._identity_due = True
+        self.last_uptime: int | None = None
+        self.reboots_detected = 0
+        self.profiler = CycleProfiler(entry.options.get(CONF_PROFILING, DEFAULT_PROFILING))
+        self.last_profile: tuple[str, str] | None = None
+        # Reconnect-Modus: Ende des Fensters (monotonic) bzw. None
+        self._reconnect_until: float | None = None
+        self._reconnect_started = 0.0
+        # Neustart per Service angefordert, Gateway war aber noch nicht weg
+        self._awaiting_reboot = False
+        # Ausfall, für den schon ein Reconnect lief; bleibt bis zum nächsten erfolgreichen Zyklus
+        self._outage = False
+        self.reconnects = 0
+        self.last_reconnect_seconds: float | None = None
+        # Dauer des gerade beendeten Reconnects (nur für das Reboot-Event dieses Zyklus)
+        self._downtime: float | None = None
+
+    def _apply_identity(self, identity: dict) -> None:
+        self._identity_due = False
+        if identity == self.identity:
+            return
+
+        self.identity = identity
+        entry = self.config_entry
+        self.hass.config_entries.async_update_entry(
+            entry, data={**entry.data, DATA_IDENTITY: identity}
+        )
+
+        # Firmware kann sich nach einem Reboot geändert haben -> Device-Registry nachziehen
+        registry = dr.async_get(self.hass)
+        device = registry.async_get_device(identifiers={(DOMAIN, entry.entry_id)})
+        if device is not None:
+            registry.async_update_device(
+                device.id,
+                model=identity.get("ModelName") or device.model,
+                sw_version=identity.get("SoftwareVersion") or device.sw_version,
+            )
+
+    async def _async_ensure_session(self) -> None:
+        """Log in on the first update; setup does not wait for the gateway."""
+        if not self.api.logged:
+            try:
+                async with self._fleet_slot():
+                    await self.api.login()
+            except Exception as err:
+                raise UpdateFailed(f"Login to {self.api.server} failed: {err}") from err
+
+    def _cache_dhcp_keys(self, dhcp_data: dict) -> None:
+        entry = self.config_entry
+        cached = entry.data.get(DATA_DHCP_KEYS) or []
+        # Vereinigung: ein auf die gewählten Keys beschränkter Abruf liefert nicht alle
+        keys = sorted({*cached, *dhcp_data})
+        if keys and keys != cached:
+            self.hass.config_entries.async_update_entry(
+                entry, data={**entry.data, DATA_DHCP_KEYS: keys}
+            )
+
+    def endpoint_fingerprint(self, endpoint: str) -> str | None:
+        """Fingerprint of the endpoint's current payload, computed once per fetch."""
+        schedule = self.schedules.get(endpoint)
+        return schedule.fingerprint if schedule is not None else None
+
+    def _detect_reboot(self, system_data: dict) -> bool:
+        uptime = parse_uptime(system_data.get("UpTime"))
+        if uptime is None:
+            return False
+        rebooted = self.last_uptime is not None and uptime < self.last_uptime
+        self.last_uptime = uptime
+        return rebooted
+
+    @callback
+    def async_add_consumer(self, endpoint: str, fields=None):
+        """Register interest in an endpoint (all or only some fields); returns a remover."""
+        fields = tuple(ENDPOINT_REQUESTS[endpoint][1] if fields is None else fields)
+        self._consumers[endpoint] += 1
+        self._consumer_fields[endpoint].update(fields)
+
+        @callback
+        def _remove() -> None:
+            self._consumers[endpoint] -= 1
+            if self._consumers[endpoint] <= 0:
+                del self._consumers[endpoint]
+            wanted = self._consumer_fields[endpoint]
+            wanted.subtract(fields)
+            self._consumer_fields[endpoint] = +wanted
+
+        return _remove
+
+    def _fields_for(self, endpoint: str) -> list[str]:
+        defaults = ENDPOINT_REQUESTS[endpoint][1]
+        wanted = self._consumer_fields.get(endpoint)
+        if not wanted:
+            if self._consumers and endpoint in ALWAYS_FETCHED:
+                # Kein Verbraucher (z.B. System-Sensor abgewählt) -> nur, was der Coordinator braucht
+                return list(REQUIRED_FIELDS[endpoint])
+            return list(defaults)
+        wanted = {*wanted, *REQUIRED_FIELDS.get(endpoint, ())}
+        # Standard-Reihenfolge beibehalten -> stabile URL (Cache-Schlüssel des bedingten Abrufs)
+        return [f for f in defaults if f in wanted] + sorted(wanted.difference(defaults))
+
+    def plan(self, endpoints) -> list[PlannedRequest]:
+        """Return the minimal HTTP calls for the given endpoints (plus a due identity)."""
+        needs = [(ep, ENDPOINT_REQUESTS[ep][0], self._fields_for(ep)) for ep in endpoints]
+        if self._identity_due:
+            needs.append(IDENTITY_REQUEST)
+        return plan_requests(needs)
+
+    def _endpoints_to_fetch(self, now: float) -> list[str]:
+        # Vor der Registrierung der Entities (Initial-Refresh) die Standard-Endpunkte holen
+        if not self._consumers:
+            return list(DEFAULT_ENDPOINTS)
+        return [
+            ep
+            for ep in ENDPOINT_REQUESTS
+            if (self._consumers.get(ep) or ep in ALWAYS_FETCHED)
+            and self.schedules[ep].is_due(now, self._slack)
+        ]
+
+    async def _fetch_request(self, request: PlannedRequest):
+        queued = time.monotonic()
+        async with self._semaphore, self._fleet_slot():
+            # Wartezeit auf einen freien Slot (Parallelitäts-Limit), getrennt von der Gateway-Latenz
+            self.stats["queue_wait_seconds"] = max(
+                self.stats["queue_wait_seconds"] or 0.0, round(time.monotonic() - queued, 3)
+            )
+            timeout = max(
+                ENDPOINT_TIMEOUTS.get(ep, DEFAULT_ENDPOINT_TIMEOUT) for ep in request.endpoints
+            )
+            async with asyncio.timeout(timeout):
+                return await self.api.fetch(
+                    request.target,
+                    request.fields,
+                    conditional=request.target in CONDITIONAL_TARGETS,
+                )
+
+    def _fleet_slot(self):
+        # Gemeinsames Request-Budget aller Gateways (falls vom Manager verwaltet)
+        return self.manager.semaphore if self.manager is not None else contextlib.nullcontext()
+
+    def _apply_phase_shift(self) -> None:
+        delay = None
+        if self.manager is not None:
+            delay = self.manager.next_poll_delay(
+                self.config_entry.entry_id, self._tick, time.monotonic()
+            )
+        if delay is None:
+            delay = self._tick
+        else:
+            _LOGGER.debug("Next refresh in %.1fs at the start of the poll slot", delay)
+        # Wird nach dem Update von DataUpdateCoordinator für die nächste Planung gelesen
+        self.update_interval = timedelta(seconds=delay)
+
+    async def _async_probe(self) -> None:
+        """Send one lightweight request before resuming full polling."""
+        try:
+            async with self._semaphore, self._fleet_slot():
+                await self.api.probe()
+        except Exception as err:
+            raise UpdateFailed(f"Gateway probe failed: {err}") from err
+        finally:
+            self.stats["requests"] += 1
+
+    @property
+    def reconnecting(self) -> bool:
+        return self._reconnect_until is not None
+
+    def _start_reconnect(self, window: float, awaiting_reboot: bool = False) -> None:
+        now = time.monotonic()
+        self._reconnect_until = now + window
+        self._reconnect_started = now
+        self._awaiting_reboot = awaiting_reboot
+        self._outage = True
+        self.update_interval = timedelta(seconds=RECONNECT_INTERVAL)
+
+    async def async_reboot(self) -> None:
+        """Restart the gateway and reconnect as soon as it answers again."""
+        if self.reconnecting:
+            raise HomeAssistantError(f"Gateway {self.api.server} is already restarting")
+        try:
+            await self._async_ensure_session()
+            async with self._semaphore, self._fleet_slot():
+                accepted = await self.api.reboot()
+        except (UpdateFailed, aiohttp.ClientError, TimeoutError, ValueError) as err:
+            raise HomeAssistantError(f"Reboot request to {self.api.server} failed: {err}") from err
+        except SessionExpired as err:
+            raise HomeAssistantError(
+                f"Gateway {self.api.server} rejected the session for the reboot request: {err}"
+            ) from err
+        except (RuntimeError, KeyError) as err:
+            # Erneuter Login im Client gescheitert: falsche Zugangsdaten oder unerwartete Antwort
+            raise HomeAssistantError(
+                f"Login to {self.api.server} for the reboot request failed: {err!r}"
+            ) from err
+        finally:
+            self.stats["requests"] += 1
+        if not accepted:
+            raise HomeAssistantError(f"Gateway {self.api.server} rejected the reboot request")
+
+        _LOGGER.info("Rebooting gateway %s, reconnecting every %ss", self.api.server, RECONNECT_INTERVAL)
+        self._start_reconnect(REBOOT_RECONNECT_WINDOW, awaiting_reboot=True)
+        await self.async_request_refresh()
+
+    async def _async_reconnect(self) -> dict:
+        """One reconnect attempt: probe, and on success log in again and poll everything."""
+        self.update_interval = timedelta(seconds=RECONNECT_INTERVAL)
+        try:
+            await self._async_ensure_session()
+            async with self._semaphore, self._fleet_slot():
+                probe = await self.api.probe()
+        except Exception as err:
+            # Gateway ist weg -> ab jetzt zählt jede Antwort als "wieder da"
+            self._awaiting_reboot = False
+            raise UpdateFailed(f"Gateway {self.api.server} restarting: {err}") from err
+        finally:
+            self.stats["requests"] += 1
+
+        uptime = parse_uptime(probe.get("UpTime")) if isinstance(probe, dict) else None
+        if self._awaiting_reboot and not (
+            uptime is not None and self.last_uptime is not None and uptime < self.last_uptime
+        ):
+            # Neustart angefordert, das Gateway antwortet aber noch mit der alten Laufzeit
+            return self.data or {}
+
+        self.last_reconnect_seconds = round(time.monotonic() - self._reconnect_started, 1)
+        self._reconnect_until = None
+        self._awaiting_reboot = False
+        self.reconnects += 1
+        _LOGGER.info(
+            "Gateway %s answers again after %.0fs, restoring full data",
+            self.api.server,
+            self.last_reconnect_seconds,
+        )
+        # Die Probe hat sich bereits neu angemeldet; alle Endpunkte sofort, nicht erst zum regulären Termin
+        self._downtime = self.last_reconnect_seconds
+        for schedule in self.schedules.values():
+            schedule.force()
+        self.update_interval = timedelta(seconds=self._tick)
+        try:
+            data = await self._async_poll()
+        except UpdateFailed as err:
+            # Antwortet auf die Probe, schafft aber den vollen Abruf nicht: zählt für den Breaker
+            self._record_failure(err, time.monotonic())
+            raise
+        self._outage = False
+        self.breaker.record_success()
+        return data
+
+    async def async_start_profile(self, cycles: int) -> None:
+        """Capture a cProfile of the next ``cycles`` poll cycles (written to the config dir)."""
+        if self.profiler.capturing:
+            raise HomeAssistantError("A profile capture is already running")
+        # cProfile erlaubt nur einen aktiven Profiler pro Prozess -> eine Capture für die ganze Domain
+        if self.manager is not None:
+            for other in self.manager.coordinators.values():
+                if other is not self and other.profiler.capturing:
+                    raise HomeAssistantError(
+                        f"A profile capture of {other.api.server} is already running"
+                    )
+        try:
+            self.profiler.start_capture(cycles)
+        except ValueError as err:
+            raise HomeAssistantError(f"Cannot start the profiler: {err}") from err
+        _LOGGER.info("Profiling the next %s poll cycles of %s", cycles, self.api.server)
+        await self.async_request_refresh()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        super().async_update_listeners()
+        # Zyklus endet erst nach den Entities (Attribute, State-Writes)
+        self.profiler.end_cycle()
+        self._async_write_finished_profiles()
+
+    @callback
+    def _async_write_finished_profiles(self) -> None:
+        for profile, cycles in self.profiler.pop_finished():
+            self.config_entry.async_create_background_task(
+                self.hass,
+                self._async_write_profile(profile, cycles),
+                f"{DOMAIN} write profile {self.config_entry.entry_id}",
+            )
+
+    async def _async_write_profile(self, profile, cycles: list[dict]) -> None:
+        stamp = dt_util.now().strftime("%Y%m%d_%H%M%S")
+        path = self.hass.config.path(f"{DOMAIN}_profile_{self.config_entry.entry_id}_{stamp}")
+        self.last_profile = await self.hass.async_add_executor_job(
+            write_profile, profile, cycles, path
+        )
+        _LOGGER.info("Profile of %s cycles written to %s", len(cycles), ", ".join(self.last_profile))
+
+    async def _async_update_data(self) -> dict:
+        self.profiler.begin_cycle()
+        if self.profiler.aborted is not None:
+            _LOGGER.warning(
+                "Profile capture of %s aborted: %s", self.api.server, self.profiler.aborted
+            )
+            self.profiler.aborted = None
+        # Capture, deren letzter Zyklus ohne Listener-Lauf endete, hier schreiben
+        self._async_write_finished_profiles()
+        # Nach einem Fehler wieder im normalen Takt weiter
+        self.update_interval = timedelta(seconds=self._tick)
+        now = time.monotonic()
+        if self._reconnect_until is not None:
+            if now < self._reconnect_until:
+                return await self._async_reconnect()
+            _LOGGER.warning(
+                "Gateway %s did not come back within %.0fs, back to normal polling",
+                self.api.server,
+                now - self._reconnect_started,
+            )
+            self._reconnect_until = None
+            self._awaiting_reboot = False
+
+        if not self.breaker.allow(now):
+            # Offener Circuit: kein Request, nächster Refresh erst zur Probe
+            wait = self.breaker.seconds_until_retry(now)
+            self.update_interval = timedelta(seconds=max(wait, 1.0))
+            raise UpdateFailed(f"Gateway unreachable, next probe in {wait:.0f}s")
+
+        try:
+            if self.breaker.probing:
+                await self._async_probe()
+            data = await self._async_poll()
+        except UpdateFailed as err:
+            now = time.monotonic()
+            if not self._outage and isinstance(
+                err.__cause__, (aiohttp.ClientConnectionError, TimeoutError)
+            ):
+                # Eben noch erreichbar, jetzt keine Verbindung: vermutlich Neustart -> schnell nachfassen
+                _LOGGER.info(
+                    "Gateway %s stopped answering (%s), reconnecting every %ss",
+                    self.api.server,
+                    err,
+                    RECONNECT_INTERVAL,
+                )
+                self.breaker.record_failure(now)
+                self._start_reconnect(RECONNECT_WINDOW)
+                raise
+            self._record_failure(err, now)
+            raise
+
+        self._outage = False
+        if self.breaker.record_success():
+            _LOGGER.info("Gateway %s reachable again, resuming polls", self.api.server)
+        return data
+
+    def _record_failure(self, err: UpdateFailed, now: float) -> None:
+        if self.breaker.record_failure(now):
+            _LOGGER.warning(
+                "Gateway %s failed %s times in a row (%s), pausing polls for %.0fs",
+                self.api.server,
+                self.breaker.failures,
+                err,
+                self.breaker.seconds_until_retry(now),
+            )
+        if self.breaker.state == OPEN:
+            self.update_interval = timedelta(
+                seconds=max(self.breaker.seconds_until_retry(now), 1.0)
+            )
+
+    async def _async_poll(self) -> dict:
+        await self._async_ensure_session()
+        data = dict(self.data or {})
+        started = time.monotonic()
+        endpoints = self._endpoints_to_fetch(started)
+        self.changed_endpoints = set()
+        self.stats["queue_wait_seconds"] = None
+        # Verbrauchte, aber (noch) nicht fällige Endpunkte: durch den Zeitplan eingesparte Requests
+        self.stats["requests_deferred"] += sum(
+            1 for ep in self._consumers if ep not in endpoints
+        )
+
+        # Ein Request pro API-Ziel, Felder aller Verbraucher zusammengeführt
+        self.last_plan = planned = self.plan(endpoints)
+        decoded_before = self.api.stats.decode_seconds
+        results = await asyncio.gather(
+            *(self._fetch_request(request) for request in planned), return_exceptions=True
+        )
+        now = time.monotonic()
+        self.stats["last_cycle_seconds"] = round(now - started, 3)
+        parse = self.api.stats.decode_seconds - decoded_before
+        self.profiler.add("parse", parse)
+        self.profiler.add("fetch", now - started - parse)
+
+        failed = 0
+        last_error = None
+        fetched = set()
+        for request, result in zip(planned, results):
+            self.stats["requests"] += 1
+            self.stats["requests_merged"] += len(request.endpoints) - 1
+            if isinstance(result, Exception):
+                # Alte Daten des Endpunkts behalten, die anderen trotzdem übernehmen
+                message = "timeout" if isinstance(result, TimeoutError) else str(result)
+                last_error = result
+                for endpoint in request.endpoints:
+                    if endpoint == IDENTITY_REQUEST[0]:
+                        _LOGGER.debug("Identity fetch failed, using cached data: %s", message)
+                        continue
+                    failed += 1
+                    self.schedules[endpoint].record_failure(started)
+                    # Nur den ersten Fehler in Folge als Warnung, danach leise
+                    log = _LOGGER.debug if endpoint in self.endpoint_errors else _LOGGER.warning
+                    log("Error fetching %s: %s", endpoint, message)
+                    self.endpoint_errors[endpoint] = message
+                continue
+
+            fingerprint = None
+            if isinstance(result, Payload):
+                # Digest der Rohdaten statt erneuter Serialisierung; unverändert = altes Objekt
+                if len(request.endpoints) == 1:
+                    fingerprint = result.digest
+                result = result.data
+
+            for endpoint, part in request.split(result).items():
+                if endpoint == IDENTITY_REQUEST[0]:
+                    self._apply_identity(part)
+                    continue
+                self.endpoint_errors.pop(endpoint, None)
+                fetched.add(endpoint)
+                # Termin ab Zyklusbeginn: sonst verschiebt die Laufzeit ihn hinter den nächsten Slot
+                if self.schedules[endpoint].record(part, started, fingerprint) or endpoint not in data:
+                    data[endpoint] = part
+                    self.changed_endpoints.add(endpoint)
+                self.stats["requests_saved"] += max(self._consumers.get(endpoint, 0) - 1, 0)
+
+        if endpoints and failed == len(endpoints):
+            raise UpdateFailed(f"All gateway endpoints failed: {self.endpoint_errors}") from last_error
+
+        self.fetched_endpoints = fetched
+
+        with self.profiler.stage("diff"):
+            # Nur geänderte Host-Tabellen auswerten; Verbraucher bekommen das Diff statt der ganzen Tabelle
+            self.host_diff = HostDiff(self.hosts.version)
+            if ENDPOINT_HOST in self.changed_endpoints:
+                self.host_diff = self.hosts.update(data[ENDPOINT_HOST].get("hostTbl", []))
+
+            # Auch unveränderte Abrufe zählen für die Entprellung der Host-Events
+            if ENDPOINT_HOST in fetched:
+                for event_type, event_data in self.host_events.update(self.hosts, self.host_diff):
+                    self.hass.bus.async_fire(
+                        event_type, {**event_data, "entry_id": self.config_entry.entry_id}
+                    )
+
+        with self.profiler.stage("process"):
+            # Auch bei unveränderter Tabelle: last_seen der anwesenden Hosts fortschreiben
+            if ENDPOINT_HOST in fetched and self.known_devices is not None:
+                self.known_devices.async_update(data[ENDPOINT_HOST].get("hostTbl", []))
+
+            if ENDPOINT_HOST in fetched and self.presence is not None:
+                diff = self.host_diff
+                # Der erste Abruf nach dem Start meldet alle Hosts als neu -> kein Churn
+                churn = 0 if diff.version <= 1 else len(diff.added) + sum(
+                    1 for old, new in diff.changed if old.ip != new.ip
+                )
+                self.presence.async_record(
+                    [mac for mac, record in self.hosts.by_mac.items() if record.active], churn
+                )
+
+            # Fehlerraten brauchen jeden Fetch (auch unveränderte Zähler = 0 Fehler im Intervall)
+            if ENDPOINT_MODEM in fetched:
+                self.docsis.update(data[ENDPOINT_MODEM], now)
+
+            if ENDPOINT_DHCP in self.changed_endpoints:
+                self._cache_dhcp_keys(data[ENDPOINT_DHCP])
+
+            rebooted = ENDPOINT_SYSTEM in self.changed_endpoints and self._detect_reboot(
+                data[ENDPOINT_SYSTEM]
+            )
+            if rebooted:
+                self.reboots_detected += 1
+                _LOGGER.info("Gateway reboot detected (UpTime went backwards), refreshing all data")
+                # Im nächsten Zyklus zusammen mit den anderen system-Feldern
+                self._identity_due = True
+                for schedule in self.schedules.values():
+                    schedule.force()
+                self.hass.bus.async_fire(
+                    EVENT_GATEWAY_REBOOTED,
+                    {
+                        "entry_id": self.config_entry.entry_id,
+                        "uptime": self.last_uptime,
+                        "downtime_seconds": self._downtime,
+                    },
+                )
+
+        self._downtime = None
+        self._apply_phase_shift()
+        if rebooted:
+            self.update_interval = min(
+                self.update_interval, timedelta(seconds=REBOOT_SETTLE_SECONDS)
+            )
+        self.stats["cycles"] += 1
+        _LOGGER.debug(
+            "Cycle %s done in %ss: fetched %s, changed %s, %s requests total, %s saved",
+            self.stats["cycles"],
+            self.stats["last_cycle_seconds"],
+            endpoints,
+            sorted(self.changed_endpoints),
+            self.stats["requests"],
+            self.stats["requests_saved"],
+        )
+        return data
@@ -0,0 +1,170 @@
+import logging
+
+from homeassistant.components.device_tracker import ScannerEntity, SourceType
+from homeassistant.core import callback
+
+from .const import DOMAIN, ENDPOINT_HOST
+from .hosts import HostRecord
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(hass, config_entry, async_add_entities):
+    """Set up one presence entity per MAC seen in the gateway's host table.
+
+    All trackers are fed by a single coordinator listener: it runs once per
+    changed host table, walks only the coordinator's host diff, creates
+    entities for new MACs on the fly and writes state only for the entities
+    whose presence or IP changed.
+    """
+    entry_store = hass.data.get(DOMAIN, {}).get(config_entry.entry_id, {})
+    coordinator = entry_store.get("coordinator")
+
+    if coordinator is None:
+        _LOGGER.error("No coordinator found in hass.data for entry %s", config_entry.entry_id)
+        return
+
+    hosts = coordinator.hosts
+    trackers: dict[str, TechnicolorCGAHostTracker] = {}
+    last = {"version": None, "available": None}
+
+    @callback
+    def _async_update_trackers() -> None:
+        with coordinator.profiler.stage("trackers"):
+            _async_apply_host_table()
+
+    @callback
+    def _async_apply_host_table() -> None:
+        available = coordinator.last_update_success
+        availability_changed = available != last["available"]
+        if hosts.version == last["version"] and not availability_changed:
+            return
+
+        # Diff des letzten Zyklus reicht, wenn genau eine Tabellenversion dazwischen liegt
+        diff = coordinator.host_diff
+        incremental = (
+            not availability_changed
+            and last["version"] is not None
+            and diff.version == hosts.version == last["version"] + 1
+        )
+        last["version"] = hosts.version
+        last["available"] = available
+
+        if incremental:
+            present = [*diff.added, *(new for _, new in diff.changed)]
+            gone = [old.mac for old in diff.removed]
+        else:
+            present = list(hosts.by_mac.values())
+            gone = [mac for mac in trackers if mac not in hosts]
+
+        new_entities = []
+        for record in present:
+            tracker = trackers.get(record.mac)
+            if tracker is None:
+                tracker = trackers[record.mac] = TechnicolorCGAHostTracker(
+                    config_entry.entry_id, record.mac, record
+                )
+                new_entities.append(tracker)
+            elif tracker.async_set_record(record, available) or availability_changed:
+                tracker.async_write_if_added()
+
+        for mac in gone:
+            tracker = trackers.get(mac)
+            if tracker is not None and (
+                tracker.async_set_record(None, available) or availability_changed
+            ):
+                tracker.async_write_if_added()
+
+        if new_entities:
+            _LOGGER.debug("Adding %s new host trackers", len(new_entities))
+            async_add_entities(new_entities)
+
+    # Bekannte Geräte (persistenter Store) sofort anlegen, damit sie nach einem Neustart nicht "unavailable" sind
+    known_devices = coordinator.known_devices
+    if known_devices is not None:
+        for mac, details in known_devices.devices.items():
+            if mac not in hosts:
+                trackers[mac] = TechnicolorCGAHostTracker(
+                    config_entry.entry_id,
+                    mac,
+                    HostRecord(mac, details["last_ip"], details["hostname"], False),
+                )
+
+    if trackers:
+        async_add_entities(list(trackers.values()))
+
+    # Tracker lesen nur die Hosttabelle
+    config_entry.async_on_unload(coordinator.async_add_consumer(ENDPOINT_HOST, ("hostTbl",)))
+    config_entry.async_on_unload(coordinator.async_add_listener(_async_update_trackers))
+    _async_update_trackers()
+
+
+class TechnicolorCGAHostTracker(ScannerEntity):
+    """Presence of one LAN host as reported by the gateway's hostTbl."""
+
+    _attr_should_poll = False
+
+    def __init__(self, config_entry_id, mac, record: HostRecord):
+        self._mac = mac
+        self._ip = record.ip
+        self._hostname = record.hostname
+        self._connected = record.active
+        self._available = True
+        self._added = False
+        self._attr_unique_id = f"{config_entry_id}_tracker_{mac.lower().replace(':', '')}"
+        self._attr_name = record.hostname if record.hostname not in ("", "Unknown") else mac
+
+    @callback
+    def async_set_record(self, record: HostRecord | None, available: bool) -> bool:
+        """Apply the current host record (None = not in hostTbl); returns True if changed."""
+        connected = record is not None and record.active
+        ip = record.ip if record is not None else self._ip
+        hostname = record.hostname if record is not None else self._hostname
+
+        changed = (
+            connected != self._connected
+            or ip != self._ip
+            or hostname != self._hostname
+            or available != self._available
+        )
+        self._connected = connected
+        self._ip = ip
+        self._hostname = hostname
+        self._available = available
+        return changed
+
+    @callback
+    def async_write_if_added(self) -> None:
+        # Deaktivierte Entities werden nie zu hass hinzugefügt
+        if self._added:
+            self.async_write_ha_state()
+
+    async def async_added_to_hass(self):
+        self._added = True
+
+    async def async_will_remove_from_hass(self):
+        self._added = False
+
+    @property
+    def available(self):
+        return self._available
+
+    @property
+    def source_type(self):
+        return SourceType.ROUTER
+
+    @property
+    def is_connected(self):
+        return self._connected
+
+    @property
+    def ip_address(self):
+        return self._ip
+
+    @property
+    def mac_address(self):
+        return self._mac
+
+    @property
+    def hostname(self):
+        return self._hostname
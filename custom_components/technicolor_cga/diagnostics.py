@@ -0,0 +1,67 @@
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+# Zugangsdaten und gerätebezogene Kennungen nicht in den Download übernehmen
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME, "SerialNumber", "CMMACAddress", "MACAddressRT"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Return diagnostics for a config entry."""
+    entry_store = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+    coordinator = entry_store.get("coordinator")
+    api = entry_store.get("api")
+
+    diagnostics = {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+    }
+    if api is not None:
+        stats = api.stats
+        diagnostics["client"] = {
+            "logins": stats.logins,
+            "relogins": stats.relogins,
+            "last_success": stats.last_success,
+            "errors_by_type": dict(stats.errors_by_type),
+            "endpoints": {target: s.as_dict() for target, s in stats.endpoints.items()},
+        }
+    if coordinator is not None:
+        diagnostics["coordinator"] = {
+            "last_update_success": coordinator.last_update_success,
+            "stats": dict(coordinator.stats),
+            "endpoint_errors": dict(coordinator.endpoint_errors),
+            "circuit_breaker": coordinator.breaker.as_dict(),
+            "endpoint_intervals": {
+                endpoint: {
+                    "base": schedule.base_interval,
+                    "current": schedule.interval,
+                }
+                for endpoint, schedule in coordinator.schedules.items()
+            },
+            "fetch_plan": {r.target: r.fields for r in coordinator.last_plan},
+            "profiling": {
+                **coordinator.profiler.summary(),
+                "last_profile": coordinator.last_profile,
+            },
+            "reboots_detected": coordinator.reboots_detected,
+            "reconnect": {
+                "active": coordinator.reconnecting,
+                "count": coordinator.reconnects,
+                "last_seconds": coordinator.last_reconnect_seconds,
+            },
+            "identity": async_redact_data(dict(coordinator.identity), TO_REDACT),
+            "hosts": len(coordinator.hosts),
+            "docsis": coordinator.docsis.summary,
+            "presence_log": {
+                "hosts": len(coordinator.presence.log.macs),
+                "size_bytes": coordinator.presence.log.size_bytes,
+            }
+            if coordinator.presence is not None
+            else None,
+        }
+    return diagnostics
@@ -0,0 +1,206 @@
+import re
+
+from .history import ChannelRingBuffer
+
+# Feldnamen variieren je nach Firmware -> jeweils die erste vorhandene Variante nehmen
+CHANNEL_ID_KEYS = ("ChannelID", "channelid", "ChannelId", "__id")
+POWER_KEYS = ("PowerLevel", "powerLevel", "Power", "RxPower", "TxPower")
+SNR_KEYS = ("SNRLevel", "SNR", "SignalNoise", "MER")
+FREQUENCY_KEYS = ("Frequency", "CentralFrequency", "frequency")
+MODULATION_KEYS = ("Modulation", "FFT", "modulation")
+LOCK_KEYS = ("LockStatus", "Lock", "lockstatus")
+CORRECTABLE_KEYS = ("Correctable", "CorrectableCodewords", "Corrected", "correctable")
+UNCORRECTABLE_KEYS = ("Uncorrectable", "UncorrectableCodewords", "Uncorrected", "uncorrectable")
+
+DOWNSTREAM = "downstream"
+UPSTREAM = "upstream"
+
+# levels()-Tabelle -> Richtung
+CHANNEL_TABLES = {
+    "DSTbl": DOWNSTREAM,
+    "exDSTbl": DOWNSTREAM,
+    "USTbl": UPSTREAM,
+    "exUSTbl": UPSTREAM,
+}
+ERROR_TABLE = "ErrTbl"
+
+_NUMBER = re.compile(r"[-+]?\d+(?:\.\d+)?")
+
+
+def parse_number(value) -> float | None:
+    """Parse the leading number of a gateway value such as ``"3.4 dBmV"``."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = _NUMBER.search(value)
+    return float(match.group()) if match else None
+
+
+def _first(entry: dict, keys: tuple[str, ...]):
+    for key in keys:
+        if key in entry:
+            return entry[key]
+    return None
+
+
+class DocsisChannel:
+    """One up- or downstream channel from a levels() table."""
+
+    __slots__ = (
+        "key",
+        "table",
+        "direction",
+        "channel_id",
+        "power",
+        "snr",
+        "frequency",
+        "modulation",
+        "lock_status",
+        "correctable",
+        "uncorrectable",
+    )
+
+    def __init__(self, table: str, entry: dict) -> None:
+        self.table = table
+        self.direction = CHANNEL_TABLES[table]
+        self.channel_id = str(_first(entry, CHANNEL_ID_KEYS))
+        self.key = f"{table.lower()}_{self.channel_id}"
+        self.power = parse_number(_first(entry, POWER_KEYS))
+        self.snr = parse_number(_first(entry, SNR_KEYS))
+        self.frequency = _first(entry, FREQUENCY_KEYS)
+        self.modulation = _first(entry, MODULATION_KEYS)
+        self.lock_status = _first(entry, LOCK_KEYS)
+        self.correctable = parse_number(_first(entry, CORRECTABLE_KEYS))
+        self.uncorrectable = parse_number(_first(entry, UNCORRECTABLE_KEYS))
+
+    @property
+    def label(self) -> str:
+        prefix = "DS" if self.direction == DOWNSTREAM else "US"
+        if self.table.startswith("ex"):
+            prefix += " OFDM"
+        return f"{prefix} {self.channel_id}"
+
+
+def _counter_delta(current: float, previous: float) -> float:
+    # Zähler-Reset (z.B. Modem-Neustart): aktueller Wert ist der Zuwachs seit dem Reset
+    if current < previous:
+        return current
+    return current - previous
+
+
+def _stats(values: list[float]) -> tuple[float | None, float | None, float | None]:
+    if not values:
+        return None, None, None
+    return min(values), max(values), round(sum(values) / len(values), 2)
+
+
+class DocsisTracker:
+    """Parse levels() once per fetch into channels and aggregate values.
+
+    Codeword error rates are computed from the counter deltas between two
+    fetches, per channel, with counter resets treated as a restart from zero.
+    ``version`` changes when the set of channels changes.
+
+    Every fetch is also pushed into a ``ChannelRingBuffer``; ``analysis``
+    holds its rolling rates and z-score anomaly flags.
+    """
+
+    def __init__(self) -> None:
+        self.channels: dict[str, DocsisChannel] = {}
+        self.summary: dict = {}
+        self.version = 0
+        self._previous_counters: dict[str, tuple[float, float]] = {}
+        self._previous_time: float | None = None
+        self._deltas: dict[str, tuple[float, float]] = {}
+        self.history = ChannelRingBuffer()
+        self.analysis: dict = {}
+
+    def update(self, levels: dict, now: float) -> None:
+        channels: dict[str, DocsisChannel] = {}
+        for table in CHANNEL_TABLES:
+            for entry in levels.get(table) or []:
+                channel = DocsisChannel(table, entry)
+                channels[channel.key] = channel
+
+        # ErrTbl den Downstream-Kanälen über die ChannelID zuordnen
+        by_id = {
+            ch.channel_id: ch
+            for ch in channels.values()
+            if ch.direction == DOWNSTREAM and not ch.table.startswith("ex")
+        }
+        for entry in levels.get(ERROR_TABLE) or []:
+            channel = by_id.get(str(_first(entry, CHANNEL_ID_KEYS)))
+            if channel is None:
+                continue
+            channel.correctable = parse_number(_first(entry, CORRECTABLE_KEYS))
+            channel.uncorrectable = parse_number(_first(entry, UNCORRECTABLE_KEYS))
+
+        if channels.keys() != self.channels.keys():
+            self.version += 1
+        self.channels = channels
+        self.summary = self._summarize(now)
+
+        self.history.push(
+            now,
+            {
+                key: (ch.power, ch.snr, *self._deltas.get(key, (None, None)))
+                for key, ch in channels.items()
+            },
+        )
+        self.analysis = self.history.analyze()
+
+    def _summarize(self, now: float) -> dict:
+        ds = [ch for ch in self.channels.values() if ch.direction == DOWNSTREAM]
+        us = [ch for ch in self.channels.values() if ch.direction == UPSTREAM]
+
+        ds_min, ds_max, ds_mean = _stats([ch.power for ch in ds if ch.power is not None])
+        us_min, us_max, us_mean = _stats([ch.power for ch in us if ch.power is not None])
+        snr_min, _, snr_mean = _stats([ch.snr for ch in ds if ch.snr is not None])
+
+        total_corr = 0.0
+        total_uncorr = 0.0
+        delta_corr = 0.0
+        delta_uncorr = 0.0
+        counters = {}
+        deltas = {}
+        for ch in ds:
+            if ch.correctable is None or ch.uncorrectable is None:
+                continue
+            total_corr += ch.correctable
+            total_uncorr += ch.uncorrectable
+            previous = self._previous_counters.get(ch.key)
+            counters[ch.key] = (ch.correctable, ch.uncorrectable)
+            if previous is None:
+                continue
+            deltas[ch.key] = (
+                _counter_delta(ch.correctable, previous[0]),
+                _counter_delta(ch.uncorrectable, previous[1]),
+            )
+            delta_corr += deltas[ch.key][0]
+            delta_uncorr += deltas[ch.key][1]
+
+        interval = None if self._previous_time is None else round(now - self._previous_time, 1)
+        has_baseline = bool(self._previous_counters)
+        self._previous_counters = counters
+        self._previous_time = now
+        self._deltas = deltas
+
+        return {
+            "ds_channels": len(ds),
+            "us_channels": len(us),
+            "ds_power_min": ds_min,
+            "ds_power_max": ds_max,
+            "ds_power_mean": ds_mean,
+            "us_power_min": us_min,
+            "us_power_max": us_max,
+            "us_power_mean": us_mean,
+            "ds_snr_min": snr_min,
+            "ds_snr_mean": snr_mean,
+            "correctable_total": int(total_corr) if counters else None,
+            "uncorrectable_total": int(total_uncorr) if counters else None,
+            # Fehler im letzten Intervall (erst ab dem zweiten Fetch)
+            "correctable_interval": int(delta_corr) if has_baseline else None,
+            "uncorrectable_interval": int(delta_uncorr) if has_baseline else None,
+            "interval_seconds": interval,
+        }
@@ -0,0 +1,93 @@
+from .const import (
+    EVENT_HOST_INACTIVE,
+    EVENT_HOST_IP_CHANGED,
+    EVENT_HOST_JOINED,
+    EVENT_HOST_LEFT,
+)
+from .hosts import HostDiff, HostRecord, HostTable
+
+ACTIVE = "active"
+INACTIVE = "inactive"
+ABSENT = "absent"
+
+
+def _state(record: HostRecord) -> str:
+    return ACTIVE if record.active else INACTIVE
+
+
+def _event_data(record: HostRecord, previous: str | None) -> dict:
+    return {
+        "mac": record.mac,
+        "ip": record.ip,
+        "hostname": record.hostname,
+        "previous_state": previous,
+    }
+
+
+class HostEventTracker:
+    """Turn host table diffs into join/leave/inactive/IP-change events.
+
+    Presence changes are debounced: a new state has to be seen in
+    ``confirm_polls`` consecutive host fetches before its event fires, so a
+    device flapping between active and inactive stays quiet. A change back
+    to the confirmed state cancels the pending one. IP changes of active
+    hosts fire right away. The first table only seeds the states.
+    """
+
+    def __init__(self, confirm_polls: int = 2) -> None:
+        self.confirm_polls = max(1, int(confirm_polls))
+        # MAC -> bestätigter Zustand (ACTIVE/INACTIVE); abwesende Hosts werden vergessen
+        self._confirmed: dict[str, str] = {}
+        # MAC -> [beobachteter Zustand, Record, Anzahl Polls]
+        self._pending: dict[str, list] = {}
+        self._seeded = False
+
+    def _observe(self, mac: str, state: str, record: HostRecord) -> None:
+        if state == self._confirmed.get(mac, ABSENT):
+            self._pending.pop(mac, None)
+            return
+        pending = self._pending.get(mac)
+        if pending is None or pending[0] != state:
+            self._pending[mac] = [state, record, 0]
+        else:
+            pending[1] = record
+
+    def update(self, hosts: HostTable, diff: HostDiff) -> list[tuple[str, dict]]:
+        """Process one host fetch; returns ``(event_type, event_data)`` pairs to fire."""
+        if not self._seeded:
+            self._confirmed = {mac: _state(r) for mac, r in hosts.by_mac.items()}
+            self._seeded = True
+            return []
+
+        events = []
+        for record in diff.added:
+            self._observe(record.mac, _state(record), record)
+        for old, new in diff.changed:
+            if old.ip != new.ip and new.active:
+                events.append(
+                    (EVENT_HOST_IP_CHANGED, {**_event_data(new, _state(old)), "previous_ip": old.ip})
+                )
+            self._observe(new.mac, _state(new), new)
+        for old in diff.removed:
+            self._observe(old.mac, ABSENT, old)
+
+        # Auch Polls ohne Änderung zählen: der Zustand hat einen weiteren Poll gehalten
+        for mac, pending in list(self._pending.items()):
+            pending[2] += 1
+            if pending[2] < self.confirm_polls:
+                continue
+            del self._pending[mac]
+            state, record = pending[0], pending[1]
+            previous = self._confirmed.get(mac)
+
+            if state == ABSENT:
+                self._confirmed.pop(mac, None)
+                events.append((EVENT_HOST_LEFT, _event_data(record, previous)))
+                continue
+            self._confirmed[mac] = state
+            if state == ACTIVE:
+                events.append((EVENT_HOST_JOINED, _event_data(record, previous)))
+            elif previous == ACTIVE:
+                # Neu aufgetauchte, aber inaktive Hosts sind kein "inactive"-Ereignis
+                events.append((EVENT_HOST_INACTIVE, _event_data(record, previous)))
+        return events
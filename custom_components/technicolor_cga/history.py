@@ -0,0 +1,148 @@
+import math
+from array import array
+
+NAN = math.nan
+
+# Reihenfolge der Metriken pro Kanal-Sample
+METRICS = ("power", "snr", "correctable", "uncorrectable")
+# Kleinste Standardabweichung je Metrik, damit ein ruhiger Kanal nicht bei jeder Kleinigkeit auffällt
+MIN_STD = {"power": 0.5, "snr": 0.5, "correctable": 1.0, "uncorrectable": 1.0}
+COUNTER_METRICS = ("correctable", "uncorrectable")
+
+DEFAULT_CAPACITY = 48
+DEFAULT_Z_THRESHOLD = 3.0
+DEFAULT_MIN_SAMPLES = 6
+
+
+class ChannelRingBuffer:
+    """Last ``capacity`` samples of all DOCSIS channels in flat numeric arrays.
+
+    Every metric is one ``array('d')`` of ``capacity * width`` values (one
+    row per sample, one column per channel, NaN where a channel had no
+    value). ``analyze`` walks the rows once per metric and keeps running
+    sums for all channels together, yielding moving averages, counter rates
+    and the z-score of the newest sample against the older ones.
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        z_threshold: float = DEFAULT_Z_THRESHOLD,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+    ) -> None:
+        self.capacity = capacity
+        self.z_threshold = z_threshold
+        self.min_samples = min_samples
+        self.columns: dict[str, int] = {}
+        self._width = 0
+        self._data = {metric: array("d") for metric in METRICS}
+        self._times = array("d", [NAN]) * capacity
+        self._head = 0
+        self.count = 0
+
+    def _grow(self, keys) -> None:
+        new_keys = [key for key in keys if key not in self.columns]
+        if not new_keys:
+            return
+        old_width = self._width
+        for key in new_keys:
+            self.columns[key] = len(self.columns)
+        self._width = len(self.columns)
+
+        # Selten (neuer Kanal): Arrays einmal mit neuer Breite umkopieren
+        pad = array("d", [NAN]) * (self._width - old_width)
+        for metric, old in self._data.items():
+            grown = array("d")
+            for row in range(self.capacity):
+                if old_width:
+                    grown.extend(old[row * old_width:(row + 1) * old_width])
+                grown.extend(pad)
+            self._data[metric] = grown
+
+    def push(self, now: float, samples: dict[str, tuple]) -> None:
+        """Append one sample row: ``{channel_key: (power, snr, corr_delta, uncorr_delta)}``."""
+        self._grow(samples)
+        width = self._width
+        start = self._head * width
+        for index, metric in enumerate(METRICS):
+            row = array("d", [NAN]) * width
+            for key, values in samples.items():
+                value = values[index]
+                if value is not None:
+                    row[self.columns[key]] = value
+            self._data[metric][start:start + width] = row
+        self._times[self._head] = now
+        self._head = (self._head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def _rows(self):
+        """Row indices from oldest to newest."""
+        first = (self._head - self.count) % self.capacity
+        return [(first + i) % self.capacity for i in range(self.count)]
+
+    def analyze(self) -> dict:
+        """Compute moving averages, rates and anomaly flags for all channels."""
+        if not self.count or not self._width:
+            return {"samples": 0, "anomalies": [], "max_z": None}
+
+        width = self._width
+        rows = self._rows()
+        newest, history = rows[-1], rows[:-1]
+        span = self._times[newest] - self._times[rows[0]]
+        keys = sorted(self.columns, key=self.columns.get)
+
+        anomalies = []
+        max_z = 0.0
+        result = {"samples": self.count}
+
+        for metric in METRICS:
+            buf = self._data[metric]
+            sums = [0.0] * width
+            squares = [0.0] * width
+            counts = [0] * width
+            for row in history:
+                for col, value in enumerate(buf[row * width:(row + 1) * width]):
+                    if value == value:  # NaN-Check ohne Funktionsaufruf
+                        sums[col] += value
+                        squares[col] += value * value
+                        counts[col] += 1
+
+            current = buf[newest * width:(newest + 1) * width]
+            moving = {}
+            total_sum = 0.0
+            for col, key in enumerate(keys):
+                value = current[col]
+                n = counts[col]
+                if value == value:
+                    moving[key] = round((sums[col] + value) / (n + 1), 2)
+                total_sum += sums[col] + (value if value == value else 0.0)
+
+                if n < self.min_samples or value != value:
+                    continue
+                mean = sums[col] / n
+                std = max(math.sqrt(max(squares[col] / n - mean * mean, 0.0)), MIN_STD[metric])
+                z = (value - mean) / std
+                max_z = max(max_z, abs(z))
+                if abs(z) >= self.z_threshold:
+                    anomalies.append(
+                        {
+                            "channel": key,
+                            "metric": metric,
+                            "value": value,
+                            "mean": round(mean, 2),
+                            "z": round(z, 2),
+                        }
+                    )
+
+            result[f"{metric}_moving_avg"] = moving
+            if metric in COUNTER_METRICS:
+                # Deltas im Fenster (ohne die älteste Zeile, deren Intervall vor dem Fenster liegt) -> pro Minute
+                oldest = buf[rows[0] * width:(rows[0] + 1) * width]
+                window_total = total_sum - sum(v for v in oldest if v == v)
+                result[f"{metric}_rate"] = (
+                    round(window_total / (span / 60), 2) if span > 0 else None
+                )
+
+        result["anomalies"] = anomalies
+        result["max_z"] = round(max_z, 2) if self.count > self.min_samples else None
+        return result
@@ -0,0 +1,131 @@
+import ipaddress
+
+# Ungültige/unbekannte Adressen ans Ende sortieren
+_INVALID_SORT_KEY = (99, 0)
+
+
+def ip_sort_key(ip) -> tuple[int, int]:
+    """Return a sort key for an IPv4/IPv6 address: IPv4 first, then IPv6, then invalid."""
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return _INVALID_SORT_KEY
+    return (addr.version, int(addr))
+
+
+class HostRecord:
+    """Compact record of one ``hostTbl`` entry."""
+
+    __slots__ = ("mac", "ip", "hostname", "active", "sort_key")
+
+    def __init__(self, mac: str, ip: str, hostname: str, active: bool) -> None:
+        self.mac = mac
+        self.ip = ip
+        self.hostname = hostname
+        self.active = active
+        self.sort_key = ip_sort_key(ip)
+
+    @classmethod
+    def from_host(cls, host: dict) -> "HostRecord":
+        return cls(
+            host["physaddress"],
+            host.get("ipaddress", "Unknown"),
+            host.get("hostname", "Unknown"),
+            host.get("active", "false") != "false",
+        )
+
+    def same_as(self, other: "HostRecord") -> bool:
+        return (
+            self.ip == other.ip
+            and self.hostname == other.hostname
+            and self.active == other.active
+        )
+
+
+class HostDiff:
+    """Hosts added, removed and changed by one ``HostTable.update``.
+
+    ``changed`` holds ``(old, new)`` record pairs; ``version`` is the table
+    version the diff leads to. An empty diff is falsy.
+    """
+
+    __slots__ = ("added", "removed", "changed", "version")
+
+    def __init__(self, version: int = 0) -> None:
+        self.added: list[HostRecord] = []
+        self.removed: list[HostRecord] = []
+        self.changed: list[tuple[HostRecord, HostRecord]] = []
+        self.version = version
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+
+class HostTable:
+    """Host table indexed by MAC and IP, maintained once per poll.
+
+    ``update`` merges a raw ``hostTbl`` in place, bumps ``version`` only
+    when a host was added, removed or changed and returns a ``HostDiff``
+    of those hosts; the sorted view is cached until the next change.
+    """
+
+    def __init__(self) -> None:
+        self.by_mac: dict[str, HostRecord] = {}
+        self.by_ip: dict[str, HostRecord] = {}
+        self.version = 0
+        self._sorted: list[HostRecord] | None = None
+
+    def __len__(self) -> int:
+        return len(self.by_mac)
+
+    def __contains__(self, mac: str) -> bool:
+        return mac in self.by_mac
+
+    def get(self, mac: str) -> HostRecord | None:
+        return self.by_mac.get(mac)
+
+    def get_by_ip(self, ip: str) -> HostRecord | None:
+        return self.by_ip.get(ip)
+
+    def update(self, host_tbl: list[dict]) -> HostDiff:
+        """Merge the current host table; returns the diff (falsy if nothing changed)."""
+        seen = set()
+        diff = HostDiff(self.version)
+
+        for host in host_tbl:
+            if not host.get("physaddress"):
+                continue
+            record = HostRecord.from_host(host)
+            seen.add(record.mac)
+            old = self.by_mac.get(record.mac)
+            if old is not None and old.same_as(record):
+                continue
+            if old is None:
+                diff.added.append(record)
+            else:
+                diff.changed.append((old, record))
+                if self.by_ip.get(old.ip) is old:
+                    del self.by_ip[old.ip]
+            self.by_mac[record.mac] = record
+            self.by_ip[record.ip] = record
+
+        for mac in [mac for mac in self.by_mac if mac not in seen]:
+            old = self.by_mac.pop(mac)
+            diff.removed.append(old)
+            if self.by_ip.get(old.ip) is old:
+                del self.by_ip[old.ip]
+
+        if diff:
+            self.version += 1
+            diff.version = self.version
+            self._sorted = None
+        return diff
+
+    def sorted(self) -> list[HostRecord]:
+        """Return all hosts sorted by IP (cached until the table changes)."""
+        if self._sorted is None:
+            self._sorted = sorted(self.by_mac.values(), key=lambda r: r.sort_key)
+        return self._sorted
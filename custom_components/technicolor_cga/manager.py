@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+
+from .const import DATA_MANAGER, FLEET_MAX_PARALLEL_REQUESTS, PHASE_TOLERANCE
+from .schedule import next_slot_delay, slot_offset
+from .technicolor_cga import AsyncTechnicolorCGA
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_get_manager(hass: HomeAssistant) -> "TechnicolorCGAManager":
+    """Return the domain-wide manager, creating it for the first gateway."""
+    manager = hass.data.get(DATA_MANAGER)
+    if manager is None:
+        manager = hass.data[DATA_MANAGER] = TechnicolorCGAManager(hass)
+    return manager
+
+
+class TechnicolorCGAManager:
+    """Owner of the clients and coordinators of all configured gateways.
+
+    All clients share one keep-alive ``aiohttp`` session (its cookie jar
+    keeps the ``auth`` cookies apart per gateway address) and one request
+    budget: at most ``FLEET_MAX_PARALLEL_REQUESTS`` requests are in flight
+    across the whole fleet, on top of each gateway's own limit.
+
+    Every gateway gets a fixed slot index when it is added (the lowest
+    free one); ``next_poll_delay`` tells its coordinator how long to wait
+    for the next start of that slot, anchored to the manager's epoch, so
+    gateways set up at the same moment do not poll in bursts.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.session: aiohttp.ClientSession | None = None
+        self.semaphore = asyncio.Semaphore(FLEET_MAX_PARALLEL_REQUESTS)
+        self.coordinators: dict = {}
+        self.fleet_owner: str | None = None
+        self._epoch = time.monotonic()
+        # entry_id -> feste Slot-Nummer (bleibt, solange der Entry verwaltet wird)
+        self._slots: dict[str, int] = {}
+        self._unsubscribers: dict = {}
+        self._listeners: list = []
+
+    def client(self, username: str, password: str, router: str) -> AsyncTechnicolorCGA:
+        """Return a gateway client on the shared session."""
+        if self.session is None or self.session.closed:
+            # ✅ Eine Session für alle Gateways, eigener Cookie-Jar (Gateways per IP adressiert)
+            self.session = async_create_clientsession(
+                self.hass, cookie_jar=aiohttp.CookieJar(unsafe=True)
+            )
+        return AsyncTechnicolorCGA(username, password, router, session=self.session)
+
+    @callback
+    def async_add_gateway(self, entry_id: str, coordinator) -> None:
+        self.coordinators[entry_id] = coordinator
+        if entry_id not in self._slots:
+            used = set(self._slots.values())
+            self._slots[entry_id] = next(i for i in range(len(used) + 1) if i not in used)
+        self._unsubscribers[entry_id] = coordinator.async_add_listener(self._async_notify)
+        _LOGGER.debug("Managing %s gateways", len(self.coordinators))
+        self._async_notify()
+
+    async def async_remove_gateway(self, entry_id: str) -> None:
+        """Forget a gateway; the last one closes the shared session."""
+        self.coordinators.pop(entry_id, None)
+        self._slots.pop(entry_id, None)
+        unsub = self._unsubscribers.pop(entry_id, None)
+        if unsub is not None:
+            unsub()
+
+        if entry_id == self.fleet_owner:
+            # Beim Reload legt derselbe Entry die Fleet-Sensoren wieder an
+            self.fleet_owner = None
+
+        if not self.coordinators:
+            if self.session is not None and not self.session.closed:
+                await self.session.close()
+            self.hass.data.pop(DATA_MANAGER, None)
+            return
+        self._async_notify()
+
+    @callback
+    def async_reassign_fleet_sensors(self) -> None:
+        """Let a remaining gateway create the fleet sensors after their owner was deleted."""
+        if self.fleet_owner is None and self.coordinators:
+            self.hass.config_entries.async_schedule_reload(next(iter(self.coordinators)))
+
+    def next_poll_delay(self, entry_id: str, interval: float, now: float) -> float | None:
+        """Seconds until the gateway's next poll slot, or None with a single gateway."""
+        if len(self.coordinators) < 2 or entry_id not in self._slots:
+            return None
+        offset = slot_offset(self._slots[entry_id], interval)
+        return next_slot_delay(offset, interval, now - self._epoch, PHASE_TOLERANCE)
+
+    @callback
+    def async_add_listener(self, update_callback):
+        """Call ``update_callback`` whenever any gateway updated; returns a remover."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def _remove() -> None:
+            self._listeners.remove(update_callback)
+
+        return _remove
+
+    @callback
+    def _async_notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def fleet_summary(self) -> dict:
+        """Aggregate host counts and error state over all gateways."""
+        gateways = {}
+        for coordinator in self.coordinators.values():
+            gateways[coordinator.api.server.removeprefix("http://")] = {
+                "hosts": len(coordinator.hosts),
+                "error": not coordinator.last_update_success
+                or bool(coordinator.endpoint_errors),
+            }
+        return {
+            "gateways": gateways,
+            "total_hosts": sum(g["hosts"] for g in gateways.values()),
+            "gateways_in_error": sum(1 for g in gateways.values() if g["error"]),
+        }
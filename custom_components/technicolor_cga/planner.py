@@ -0,0 +1,53 @@
+from collections.abc import Iterable
+
+
+class PlannedRequest:
+    """One HTTP call: a target with the merged fields of all endpoints reading it.
+
+    ``endpoints`` maps each logical endpoint to the fields it asked for, so
+    ``split`` can hand every consumer its own part of the response.
+    """
+
+    __slots__ = ("target", "fields", "endpoints")
+
+    def __init__(self, target: str) -> None:
+        self.target = target
+        self.fields: list[str] = []
+        self.endpoints: dict[str, list[str]] = {}
+
+    def add(self, endpoint: str, fields: Iterable[str]) -> None:
+        wanted = self.endpoints.setdefault(endpoint, [])
+        for field in fields:
+            if field not in wanted:
+                wanted.append(field)
+            if field not in self.fields:
+                self.fields.append(field)
+
+    def split(self, data: dict) -> dict[str, dict]:
+        """Return the response part of every endpoint (the whole response if there is one)."""
+        if len(self.endpoints) == 1:
+            return {endpoint: data for endpoint in self.endpoints}
+        return {
+            endpoint: {field: data[field] for field in fields if field in data}
+            for endpoint, fields in self.endpoints.items()
+        }
+
+    def __repr__(self) -> str:
+        return f"<PlannedRequest {self.target} {','.join(self.fields)} for {sorted(self.endpoints)}>"
+
+
+def plan_requests(needs: Iterable[tuple[str, str, Iterable[str]]]) -> list[PlannedRequest]:
+    """Merge ``(endpoint, target, fields)`` needs into the minimal list of calls.
+
+    The firmware batches fields within one target (``/api/v1/<target>/<f1,f2>``)
+    but not across targets, so the result has one request per target with
+    the union of all fields in first-seen order; duplicate needs of several
+    consumers collapse into the same request.
+    """
+    planned: dict[str, PlannedRequest] = {}
+    for endpoint, target, fields in needs:
+        request = planned.get(target)
+        if request is None:
+            request = planned[target] = PlannedRequest(target)
+        request.add(endpoint, fields)
+    return list(planned.values())
@@ -0,0 +1,348 @@
+import os
+import struct
+from array import array
+from datetime import datetime, timezone, tzinfo
+
+# Roh-Sample: Zeit, Anzahl MACs (Bits der Bitmap), DHCP-Churn; danach die Bitmap
+SAMPLE_HEADER = struct.Struct("<IHH")
+# Rollup: Beginn, Anzahl MACs, max. gleichzeitig aktiv, Churn; danach Online-Sekunden pro MAC
+ROLLUP_HEADER = struct.Struct("<IHHH")
+
+SAMPLES = "samples"
+HOURLY = "hourly"
+DAILY = "daily"
+
+FILES = {SAMPLES: "samples.bin", HOURLY: "hourly.bin", DAILY: "daily.bin"}
+MACS_FILE = "macs.txt"
+# Online-Sekunden: Stunde passt in uint16, Tag braucht uint32
+TYPECODES = {HOURLY: "H", DAILY: "I"}
+TYPECODE_MAX = {"H": 0xFFFF, "I": 0xFFFFFFFF}
+
+# Rohdaten und Stunden werden nach dieser Zeit verdichtet (Tage bleiben)
+RETENTION_DAYS = {SAMPLES: 7, HOURLY: 90}
+# Eine Lücke zwischen zwei Samples zählt höchstens so lange als online (HA aus, Gateway weg)
+DEFAULT_MAX_GAP = 600
+HOUR = 3600
+
+
+class Rollup:
+    """Open hourly or daily bucket: online seconds per MAC index, peak and churn."""
+
+    __slots__ = ("start", "online", "peak", "churn")
+
+    def __init__(self, start: int, width: int = 0) -> None:
+        self.start = start
+        self.online = array("I", [0]) * width
+        self.peak = 0
+        self.churn = 0
+
+    def grow(self, width: int) -> None:
+        if len(self.online) < width:
+            self.online.extend([0] * (width - len(self.online)))
+
+    def merge(self, other: "Rollup") -> None:
+        self.grow(len(other.online))
+        for index, seconds in enumerate(other.online):
+            if seconds:
+                self.online[index] += seconds
+        self.peak = max(self.peak, other.peak)
+        self.churn += other.churn
+
+    def pack(self, typecode: str) -> bytes:
+        limit = TYPECODE_MAX[typecode]
+        online = array(typecode, (min(s, limit) for s in self.online))
+        header = ROLLUP_HEADER.pack(self.start, len(online), self.peak, min(self.churn, 0xFFFF))
+        return header + online.tobytes()
+
+    @classmethod
+    def unpack(cls, start, width, peak, churn, payload: bytes, typecode: str) -> "Rollup":
+        rollup = cls(start)
+        rollup.online = array("I", array(typecode, payload))
+        rollup.peak = peak
+        rollup.churn = churn
+        return rollup
+
+
+def _records(data: bytes, header: struct.Struct, item_size: int | None):
+    """Yield ``(header_fields, payload)``; item_size None = bitmap. Stops at a torn tail."""
+    offset = 0
+    while offset + header.size <= len(data):
+        fields = header.unpack_from(data, offset)
+        width = fields[1]
+        length = (width + 7) // 8 if item_size is None else width * item_size
+        end = offset + header.size + length
+        if end > len(data):
+            break
+        yield fields, data[offset + header.size:end]
+        offset = end
+
+
+def _rollups(data: bytes, resolution: str):
+    typecode = TYPECODES[resolution]
+    for fields, payload in _records(data, ROLLUP_HEADER, array(typecode).itemsize):
+        yield Rollup.unpack(*fields, payload, typecode)
+
+
+def _bitmap_indices(bitmap: bytes) -> list[int]:
+    return [
+        byte_index * 8 + bit
+        for byte_index, byte in enumerate(bitmap)
+        if byte
+        for bit in range(8)
+        if byte >> bit & 1
+    ]
+
+
+class PresenceLog:
+    """Append-only host presence log of one gateway with hourly/daily rollups.
+
+    Every host fetch appends one fixed-layout sample: a small header and a
+    bitmap with one bit per MAC ever seen (index order in ``macs.txt``),
+    so the log grows with the number of hosts, not with the hostTbl
+    payload. The time from one sample to the next (at most ``max_gap``)
+    is credited to the MACs active in the first one, split at hour
+    boundaries, so no hour gets more than 3600 seconds; closed hours are
+    appended to ``hourly.bin`` and folded into the open day. The day is
+    closed (``daily.bin``) as soon as the first hour of the next one opens. Raw samples and hours older than ``RETENTION_DAYS``
+    are dropped by ``compact``; days are kept.
+
+    ``record`` only touches memory; ``take_pending``/``write`` move the
+    new bytes to disk in batches. ``load`` rebuilds the open buckets by
+    replaying the samples that are not rolled up yet.
+    """
+
+    def __init__(self, path: str, tz: tzinfo = timezone.utc, max_gap: float = DEFAULT_MAX_GAP) -> None:
+        self.path = path
+        self.tz = tz
+        self.max_gap = max_gap
+        self.macs: list[str] = []
+        self._index: dict[str, int] = {}
+        self._new_macs: list[str] = []
+        self._pending = {name: bytearray() for name in FILES}
+        self._last_time: int | None = None
+        self._last_active: list[int] = []
+        # Bis hierhin ist Online-Zeit bereits in (geschriebenen) Stunden verbucht
+        self._credited_until = 0
+        self.hour: Rollup | None = None
+        self.day: Rollup | None = None
+        self.last_day: Rollup | None = None
+        self.size_bytes = 0
+        self._compact_due = True
+
+    # Zeitraster in der lokalen Zeitzone (Tage beginnen um Mitternacht)
+    def _hour_start(self, ts: int) -> int:
+        moment = datetime.fromtimestamp(ts, self.tz)
+        return int(moment.replace(minute=0, second=0, microsecond=0).timestamp())
+
+    def _day_start(self, ts: int) -> int:
+        moment = datetime.fromtimestamp(ts, self.tz)
+        return int(moment.replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, FILES[name])
+
+    def _read(self, name: str) -> bytes:
+        try:
+            with open(self._file(name), "rb") as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return b""
+
+    def load(self) -> None:
+        """Read the MAC index and rebuild the open buckets (blocking I/O)."""
+        os.makedirs(self.path, exist_ok=True)
+        try:
+            with open(os.path.join(self.path, MACS_FILE), encoding="utf-8") as handle:
+                self.macs = [line.strip() for line in handle if line.strip()]
+        except FileNotFoundError:
+            self.macs = []
+        self._index = {mac: index for index, mac in enumerate(self.macs)}
+
+        days = list(_rollups(self._read(DAILY), DAILY))
+        self.last_day = days[-1] if days else None
+        rolled_day = self.last_day.start if self.last_day else -1
+
+        last_hour = -1
+        for hour in _rollups(self._read(HOURLY), HOURLY):
+            last_hour = hour.start
+            day_start = self._day_start(hour.start)
+            if day_start <= rolled_day:
+                continue
+            # Tag, der vor dem letzten Schreiben nicht mehr abgeschlossen wurde
+            if self.day is not None and self.day.start != day_start:
+                self._close_day()
+            if self.day is None:
+                self.day = Rollup(day_start)
+            self.day.merge(hour)
+
+        # Samples nach der letzten abgeschlossenen Stunde erneut einspielen (ohne sie neu zu schreiben);
+        # das letzte Sample davor liefert die aktiven MACs für den Rest der Lücke
+        if last_hour >= 0:
+            self._credited_until = last_hour + HOUR
+        for (ts, width, churn), bitmap in _records(self._read(SAMPLES), SAMPLE_HEADER, None):
+            if self._hour_start(ts) <= last_hour:
+                self._last_time, self._last_active = ts, _bitmap_indices(bitmap)
+                continue
+            self._add_sample(ts, _bitmap_indices(bitmap), churn)
+        self._update_size()
+
+    def _index_of(self, mac: str) -> int:
+        index = self._index.get(mac)
+        if index is None:
+            index = self._index[mac] = len(self.macs)
+            self.macs.append(mac)
+            self._new_macs.append(mac)
+        return index
+
+    def record(self, ts: int, active_macs, churn: int = 0) -> None:
+        """Add one host fetch: the MACs active now and the DHCP churn since the last one."""
+        indices = sorted(self._index_of(mac) for mac in active_macs)
+        width = len(self.macs)
+        bitmap = bytearray((width + 7) // 8)
+        for index in indices:
+            bitmap[index >> 3] |= 1 << (index & 7)
+        self._pending[SAMPLES] += SAMPLE_HEADER.pack(ts, width, min(churn, 0xFFFF)) + bitmap
+        self._add_sample(ts, indices, churn)
+
+    def _add_sample(self, ts: int, indices: list[int], churn: int) -> None:
+        if self._last_time is not None:
+            self._credit(self._last_time, min(ts, self._last_time + self.max_gap))
+        hour_start = self._hour_start(ts)
+        if self.hour is not None and self.hour.start != hour_start:
+            self._close_hour()
+        if self.hour is None:
+            self._open_hour(hour_start)
+        self.hour.peak = max(self.hour.peak, len(indices))
+        self.hour.churn += churn
+        self._last_time = ts
+        self._last_active = indices
+
+    def _credit(self, start: int, end: int) -> None:
+        """Credit ``start``..``end`` to the MACs of the last sample, hour by hour."""
+        start = max(start, self._credited_until)
+        while start < end:
+            hour_start = self._hour_start(start)
+            if self.hour is not None and self.hour.start != hour_start:
+                self._close_hour()
+            if self.hour is None:
+                # Stunde ohne eigenes Sample: die Hosts des letzten Samples waren darin online
+                self._open_hour(hour_start)
+                self.hour.peak = len(self._last_active)
+            chunk = min(end, hour_start + HOUR) - start
+            self.hour.grow(max(self._last_active, default=-1) + 1)
+            for index in self._last_active:
+                self.hour.online[index] += chunk
+            start += chunk
+        self._credited_until = max(self._credited_until, end)
+
+    def _open_hour(self, hour_start: int) -> None:
+        # Erste Stunde eines neuen Tages schließt den alten sofort ab, nicht erst mit dieser Stunde
+        if self.day is not None and self.day.start != self._day_start(hour_start):
+            self._close_day()
+        self.hour = Rollup(hour_start)
+
+    def _close_hour(self) -> None:
+        hour, self.hour = self.hour, None
+        self._pending[HOURLY] += hour.pack(TYPECODES[HOURLY])
+        if self.day is None:
+            self.day = Rollup(self._day_start(hour.start))
+        self.day.merge(hour)
+
+    def _close_day(self) -> None:
+        self._pending[DAILY] += self.day.pack(TYPECODES[DAILY])
+        self.last_day, self.day = self.day, None
+        self._compact_due = True
+
+    def today(self) -> Rollup:
+        """Open day including the open hour (what the statistics sensors show)."""
+        current = self.hour or self.day
+        today = Rollup(self._day_start(current.start if current else self._last_time or 0))
+        for bucket in (self.day, self.hour):
+            if bucket is not None and self._day_start(bucket.start) == today.start:
+                today.merge(bucket)
+        return today
+
+    def unique(self, rollup: Rollup) -> int:
+        return sum(1 for seconds in rollup.online if seconds)
+
+    def take_pending(self) -> tuple[list[str], dict[str, bytes]]:
+        """Hand over the bytes recorded since the last call (event loop side)."""
+        macs, self._new_macs = self._new_macs, []
+        pending = {name: bytes(data) for name, data in self._pending.items() if data}
+        for data in self._pending.values():
+            data.clear()
+        return macs, pending
+
+    def write(self, macs: list[str], pending: dict[str, bytes], now: int) -> None:
+        """Append pending records to the files and compact if due (blocking I/O)."""
+        os.makedirs(self.path, exist_ok=True)
+        # MACs zuerst, damit jede geschriebene Bitmap ihre Indizes kennt
+        if macs:
+            with open(os.path.join(self.path, MACS_FILE), "a", encoding="utf-8") as handle:
+                handle.write("".join(f"{mac}\n" for mac in macs))
+        for name, data in pending.items():
+            with open(self._file(name), "ab") as handle:
+                handle.write(data)
+        if self._compact_due:
+            self._compact_due = False
+            self.compact(now)
+        self._update_size()
+
+    def compact(self, now: int) -> None:
+        """Drop raw samples and hours older than their retention (rewrites the file)."""
+        for name, days in RETENTION_DAYS.items():
+            data = self._read(name)
+            if not data:
+                continue
+            cutoff = now - days * 86400
+            header = SAMPLE_HEADER if name == SAMPLES else ROLLUP_HEADER
+            item_size = None if name == SAMPLES else array(TYPECODES[name]).itemsize
+            kept = bytearray()
+            for fields, payload in _records(data, header, item_size):
+                if fields[0] >= cutoff:
+                    kept += header.pack(*fields) + payload
+            if len(kept) == len(data):
+                continue
+            temp = self._file(name) + ".tmp"
+            with open(temp, "wb") as handle:
+                handle.write(kept)
+            os.replace(temp, self._file(name))
+
+    def _update_size(self) -> None:
+        size = 0
+        for name in (*FILES.values(), MACS_FILE):
+            try:
+                size += os.path.getsize(os.path.join(self.path, name))
+            except FileNotFoundError:
+                pass
+        self.size_bytes = size
+
+    def read_rollups(self, resolution: str, since: int) -> list[Rollup]:
+        """Closed hourly or daily rollups starting at ``since`` or later (blocking I/O)."""
+        return [r for r in _rollups(self._read(resolution), resolution) if r.start >= since]
+
+    def open_rollups(self, resolution: str) -> list[Rollup]:
+        """Buckets not written yet: the open hour, or the open day including it."""
+        if resolution == HOURLY:
+            return [self.hour] if self.hour is not None else []
+        return [self.today()] if self._last_time is not None else []
+
+    def describe(self, rollup: Rollup, mac: str | None = None) -> dict:
+        """Plain dict of a rollup; with ``mac`` only that host's online time."""
+        row = {
+            "start": rollup.start,
+            "peak_clients": rollup.peak,
+            "unique_clients": self.unique(rollup),
+            "dhcp_churn": rollup.churn,
+        }
+        if mac is not None:
+            index = self._index.get(mac)
+            online = rollup.online
+            row["online_seconds"] = online[index] if index is not None and index < len(online) else 0
+        else:
+            row["online_seconds"] = {
+                self.macs[index]: seconds
+                for index, seconds in enumerate(rollup.online)
+                if seconds and index < len(self.macs)
+            }
+        return row
@@ -0,0 +1,187 @@
+import cProfile
+import io
+import json
+import pstats
+import time
+from collections import deque
+
+# Stufen eines Poll-Zyklus in Pipeline-Reihenfolge
+STAGES = ("fetch", "parse", "diff", "process", "attributes", "state_write", "trackers")
+# So viele Zyklen bleiben für Mittel-/Maximalwerte im Speicher
+HISTORY = 20
+# Zeilen der pstats-Auswertung in der Textdatei
+STATS_LINES = 40
+
+
+class _Stage:
+    __slots__ = ("_profiler", "_name", "_started")
+
+    def __init__(self, profiler: "CycleProfiler", name: str) -> None:
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self._profiler.add(self._name, time.perf_counter() - self._started)
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NO_STAGE = _NoStage()
+
+
+class CycleProfiler:
+    """Wall-clock time per pipeline stage of each poll cycle, plus optional cProfile.
+
+    Timing is off unless ``always`` is set (option) or a capture started by
+    ``start_capture`` is running; while off, ``active`` is False and every
+    hook costs one attribute check. A capture also runs ``cProfile`` from the
+    start of a cycle until its listeners are done, for the requested number
+    of cycles. A finished capture waits in ``finished`` until the owner takes
+    it with ``pop_finished``, also when it was closed by ``begin_cycle``
+    because the last cycle never reached its listeners. Python 3.12+ allows
+    only one active profiler per process: ``start_capture`` raises
+    ``ValueError`` if another one is running, and a capture that cannot
+    enable its profile later is dropped, with the reason in ``aborted``.
+
+    The fetch stage is the time until all responses are in minus the JSON
+    decoding (``parse``); entity stages are summed over all entities and
+    broken down by entity class in ``by_class``. cProfile sees everything
+    the event loop runs while a cycle is open, including other integrations.
+    """
+
+    def __init__(self, always: bool = False) -> None:
+        self.always = always
+        self.cycles: deque[dict] = deque(maxlen=HISTORY)
+        self.captured: list[dict] = []
+        self._current: dict | None = None
+        self._started = 0.0
+        self._profile: cProfile.Profile | None = None
+        self._capture_left = 0
+        self.finished: list[tuple[cProfile.Profile, list[dict]]] = []
+        self.aborted: str | None = None
+
+    @property
+    def active(self) -> bool:
+        return self._current is not None
+
+    @property
+    def capturing(self) -> bool:
+        return self._capture_left > 0
+
+    def begin_cycle(self) -> None:
+        if self._current is not None:
+            # Zyklus ohne Listener-Lauf (fehlgeschlagenes Update) trotzdem abschließen
+            self.end_cycle()
+        if not (self.always or self._capture_left):
+            return
+        self._current = {stage: 0.0 for stage in STAGES}
+        self._current["by_class"] = {}
+        self._started = time.perf_counter()
+        if self._profile is not None:
+            try:
+                self._profile.enable()
+            except ValueError as err:
+                # Anderer Profiler aktiv (z.B. HAs profiler.start): Capture verwerfen, Timing läuft weiter
+                self.aborted = str(err)
+                self._profile = None
+                self._capture_left = 0
+                self.captured = []
+
+    def stage(self, name: str):
+        """Context manager adding the elapsed time to ``name`` (no-op when inactive)."""
+        return _Stage(self, name) if self._current is not None else _NO_STAGE
+
+    def add(self, stage: str, seconds: float, entity_class: str | None = None) -> None:
+        current = self._current
+        if current is None:
+            return
+        current[stage] += seconds
+        if entity_class is not None:
+            by_class = current["by_class"].setdefault(entity_class, {})
+            by_class[stage] = by_class.get(stage, 0.0) + seconds
+
+    def end_cycle(self) -> None:
+        """Close the cycle; a complete capture moves to ``finished``."""
+        current, self._current = self._current, None
+        if current is None:
+            return
+        current["total"] = time.perf_counter() - self._started
+        cycle = _to_ms(current)
+        self.cycles.append(cycle)
+        if not self._capture_left:
+            return
+
+        self._profile.disable()
+        self.captured.append(cycle)
+        self._capture_left -= 1
+        if self._capture_left:
+            return
+        self.finished.append((self._profile, self.captured))
+        self._profile = None
+
+    def pop_finished(self) -> list[tuple[cProfile.Profile, list[dict]]]:
+        """Take the completed captures (profile and their cycle timings)."""
+        finished, self.finished = self.finished, []
+        return finished
+
+    def start_capture(self, cycles: int) -> None:
+        if self._capture_left:
+            raise RuntimeError("A profile capture is already running")
+        profile = cProfile.Profile()
+        # Wirft ValueError, solange ein anderer Profiler aktiv ist
+        profile.enable()
+        profile.disable()
+        self._profile = profile
+        self._capture_left = max(1, int(cycles))
+        self.captured = []
+
+    def summary(self) -> dict:
+        """Mean and max milliseconds per stage over the recent cycles, and the last cycle."""
+        if not self.cycles:
+            return {"cycles": 0}
+        stages = (*STAGES, "total")
+        return {
+            "cycles": len(self.cycles),
+            "mean_ms": {
+                stage: round(sum(c[stage] for c in self.cycles) / len(self.cycles), 2)
+                for stage in stages
+            },
+            "max_ms": {stage: max(c[stage] for c in self.cycles) for stage in stages},
+            "last": self.cycles[-1],
+        }
+
+
+def _to_ms(cycle: dict) -> dict:
+    result = {stage: round(seconds * 1000, 2) for stage, seconds in cycle.items() if stage != "by_class"}
+    result["by_class"] = {
+        name: {stage: round(seconds * 1000, 2) for stage, seconds in stages.items()}
+        for name, stages in cycle["by_class"].items()
+    }
+    return result
+
+
+def write_profile(profile: cProfile.Profile, cycles: list[dict], path: str) -> tuple[str, str]:
+    """Write ``<path>.prof`` (for snakeviz/pstats) and a text summary ``<path>.txt``."""
+    profile.dump_stats(f"{path}.prof")
+    stream = io.StringIO()
+    stats = pstats.Stats(profile, stream=stream)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(STATS_LINES)
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(STATS_LINES)
+    with open(f"{path}.txt", "w", encoding="utf-8") as handle:
+        handle.write("Stage timings per cycle (ms)\n")
+        for cycle in cycles:
+            handle.write(json.dumps(cycle, sort_keys=True) + "\n")
+        handle.write("\n")
+        handle.write(stream.getvalue())
+    return f"{path}.prof", f"{path}.txt"
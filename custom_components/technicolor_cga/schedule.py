@@ -0,0 +1,103 @@
+import hashlib
+import json
+import math
+
+# Nach so vielen identischen Antworten wird das Intervall verdoppelt
+UNCHANGED_THRESHOLD = 3
+# Obergrenze für den Back-off als Vielfaches des Basis-Intervalls
+MAX_BACKOFF_FACTOR = 8
+# Host-Tabelle speist Tracker und Anwesenheits-Log -> nur kurzer Back-off
+HOST_MAX_BACKOFF_FACTOR = 2
+
+
+def slot_offset(index: int, interval: float) -> float:
+    """Fixed start offset of poll slot ``index`` within ``interval``.
+
+    Slots follow the van der Corput sequence (0, 1/2, 1/4, 3/4, 1/8, ...),
+    so the offset of a gateway never depends on how many others exist and
+    any number of gateways stays roughly evenly spread.
+    """
+    fraction, denominator = 0.0, 1.0
+    while index:
+        denominator *= 2
+        index, bit = divmod(index, 2)
+        fraction += bit / denominator
+    return fraction * interval
+
+
+def next_slot_delay(offset: float, interval: float, now: float, tolerance: float = 0.0) -> float:
+    """Seconds from ``now`` to the next slot ``offset + k * interval``.
+
+    Slots are anchored to a fixed epoch, so the runtime of a cycle never
+    moves later slots. A slot closer than ``tolerance`` counts as the
+    current one (the refresh fired a little early) and is skipped.
+    """
+    next_slot = math.ceil((now - offset) / interval) * interval + offset
+    if next_slot - now < tolerance:
+        next_slot += interval
+    return next_slot - now
+
+
+def payload_fingerprint(payload) -> str:
+    """Return a cheap, order-independent fingerprint of a JSON payload."""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EndpointSchedule:
+    """Poll schedule of one gateway endpoint with adaptive back-off.
+
+    After ``UNCHANGED_THRESHOLD`` identical payloads in a row the interval
+    doubles (up to ``max_factor`` times the base interval); the first
+    changed payload resets it to the base interval.
+    """
+
+    def __init__(
+        self, interval: float, adaptive: bool = True, max_factor: int = MAX_BACKOFF_FACTOR
+    ) -> None:
+        self.base_interval = float(interval)
+        self.interval = float(interval)
+        self.adaptive = adaptive
+        self.max_factor = max_factor
+        self.next_due = 0.0
+        self.unchanged = 0
+        self.fingerprint = None
+
+    def is_due(self, now: float, slack: float = 0.0) -> bool:
+        return now + slack >= self.next_due
+
+    def record(self, payload, now: float, fingerprint: str | None = None) -> bool:
+        """Record a successful fetch; returns True if the payload changed.
+
+        ``now`` is the start of the cycle, so the next due time lines up
+        with the next poll slot however long the fetch took.
+        """
+        if fingerprint is None:
+            fingerprint = payload_fingerprint(payload)
+        changed = fingerprint != self.fingerprint
+        self.fingerprint = fingerprint
+
+        if changed:
+            self.unchanged = 0
+            self.interval = self.base_interval
+        else:
+            self.unchanged += 1
+            if self.adaptive and self.unchanged >= UNCHANGED_THRESHOLD:
+                self.unchanged = 0
+                self.interval = min(
+                    self.interval * 2, self.base_interval * self.max_factor
+                )
+
+        self.next_due = now + self.interval
+        return changed
+
+    def record_failure(self, now: float) -> None:
+        """Retry a failed endpoint after its base interval."""
+        self.interval = self.base_interval
+        self.next_due = now + self.base_interval
+
+    def force(self) -> None:
+        """Make the endpoint due on the next cycle, back at its base interval."""
+        self.interval = self.base_interval
+        self.unchanged = 0
+        self.next_due = 0.0
@@ -1,74 +1,298 @@
 import logging
-from datetime import timedelta
+import time
 
-from homeassistant.const import CONF_USERNAME, CONF_PASSWORD, CONF_HOST, CONF_SCAN_INTERVAL
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.const import CONF_HOST, SIGNAL_STRENGTH_DECIBELS
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
+from homeassistant.core import callback
 
-from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import EntityCategory
-
-from .const import DOMAIN
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    DATA_DHCP_KEYS,
+    ENDPOINT_SYSTEM,
+    ENDPOINT_DHCP,
+    ENDPOINT_HOST,
+    ENDPOINT_MODEM,
+    CONF_DHCP_EXCLUDED,
+    CONF_SYSTEM_FIELDS,
+    CONF_DOCSIS_TABLES,
+    CONF_HOST_TABLE_ATTRIBUTE,
+    DEFAULT_HOST_TABLE_ATTRIBUTE,
+)
+from .docsis import CHANNEL_TABLES, DOWNSTREAM, ERROR_TABLE, UPSTREAM
+from .schedule import payload_fingerprint
+from .technicolor_cga import DHCP_FIELDS, MODEM_FIELDS, SYSTEM_FIELDS
 
 _LOGGER = logging.getLogger(__name__)
-DEFAULT_SCAN_SECONDS = 300
+
+
+UNIT_DBMV = "dBmV"
+
+# (Summary-Key, Name, Einheit, StateClass)
+DOCSIS_SUMMARY_SENSORS = (
+    ("ds_power_min", "DOCSIS DS Power Min", UNIT_DBMV, SensorStateClass.MEASUREMENT),
+    ("ds_power_max", "DOCSIS DS Power Max", UNIT_DBMV, SensorStateClass.MEASUREMENT),
+    ("ds_power_mean", "DOCSIS DS Power Mean", UNIT_DBMV, SensorStateClass.MEASUREMENT),
+    ("us_power_min", "DOCSIS US Power Min", UNIT_DBMV, SensorStateClass.MEASUREMENT),
+    ("us_power_max", "DOCSIS US Power Max", UNIT_DBMV, SensorStateClass.MEASUREMENT),
+    ("us_power_mean", "DOCSIS US Power Mean", UNIT_DBMV, SensorStateClass.MEASUREMENT),
+    ("ds_snr_min", "DOCSIS DS SNR Min", SIGNAL_STRENGTH_DECIBELS, SensorStateClass.MEASUREMENT),
+    ("correctable_total", "DOCSIS Correctable Codewords", None, SensorStateClass.TOTAL_INCREASING),
+    ("uncorrectable_total", "DOCSIS Uncorrectable Codewords", None, SensorStateClass.TOTAL_INCREASING),
+    ("correctable_interval", "DOCSIS Correctable Codewords per Interval", None, SensorStateClass.MEASUREMENT),
+    ("uncorrectable_interval", "DOCSIS Uncorrectable Codewords per Interval", None, SensorStateClass.MEASUREMENT),
+)
+
+# Auswertung des Ringpuffers: wenige Summen-Sensoren statt tausender Recorder-Zeilen
+DOCSIS_ANALYSIS_SENSORS = (
+    ("anomalies", "DOCSIS Line Anomalies", None),
+    ("max_z", "DOCSIS Max Z-Score", None),
+    ("uncorrectable_rate", "DOCSIS Uncorrectable Error Rate", "1/min"),
+)
+
+
+# Tageswerte aus dem Presence-Log (Key, Name, StateClass)
+PRESENCE_SENSORS = (
+    ("peak_clients", "Peak Clients Today", SensorStateClass.MEASUREMENT),
+    ("unique_clients", "Unique Clients Today", SensorStateClass.MEASUREMENT),
+    ("dhcp_churn", "DHCP Churn Today", SensorStateClass.TOTAL_INCREASING),
+)
+
+
+# (fleet_summary-Key, Name)
+FLEET_SENSORS = (
+    ("total_hosts", "Total Hosts"),
+    ("gateways_in_error", "Gateways in Error"),
+)
+
+
+DS_TABLES = frozenset(t for t, direction in CHANNEL_TABLES.items() if direction == DOWNSTREAM)
+US_TABLES = frozenset(t for t, direction in CHANNEL_TABLES.items() if direction == UPSTREAM)
+
+
+def _timestamp(epoch):
+    return dt_util.utc_from_timestamp(epoch).isoformat() if epoch else None
+
+
+def _docsis_available(key: str, tables: frozenset[str]) -> bool:
+    """Return True if the selected modem tables can feed the DOCSIS sensor ``key``."""
+    if "correctable" in key:
+        # ErrTbl wird über die ChannelID den DSTbl-Kanälen zugeordnet
+        return ERROR_TABLE in tables and "DSTbl" in tables
+    if key.startswith("ds_"):
+        return not tables.isdisjoint(DS_TABLES)
+    if key.startswith("us_"):
+        return not tables.isdisjoint(US_TABLES)
+    return not tables.isdisjoint(CHANNEL_TABLES)
+
+
+@callback
+def _async_remove_deselected(hass, config_entry, unique_suffixes) -> None:
+    """Drop registry entries of sensors the user deselected in the options."""
+    registry = er.async_get(hass)
+    for suffix in unique_suffixes:
+        entity_id = registry.async_get_entity_id("sensor", DOMAIN, f"{config_entry.entry_id}_{suffix}")
+        if entity_id is not None:
+            registry.async_remove(entity_id)
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up Technicolor CGA sensors from a config entry."""
 
-    username = config_entry.data[CONF_USERNAME]
-
-    # ✅ Host/Password aus options (fallback data)
+    # ✅ Host aus options (fallback data)
     host = config_entry.options.get(CONF_HOST, config_entry.data.get(CONF_HOST, "192.168.0.1"))
-    password = config_entry.options.get(CONF_PASSWORD, config_entry.data.get(CONF_PASSWORD, ""))
-
-    # ✅ ScanInterval aus options (fallback data / default)
-    scan_seconds = config_entry.options.get(
-        CONF_SCAN_INTERVAL,
-        config_entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_SECONDS),
-    )
-    scan_interval = timedelta(seconds=int(scan_seconds))
 
     entry_store = hass.data.get(DOMAIN, {}).get(config_entry.entry_id, {})
-    technicolor = entry_store.get("api")
-    
+    coordinator = entry_store.get("coordinator")
 
-    if technicolor is None:
-        _LOGGER.error("No API object found in hass.data for entry %s", config_entry.entry_id)
+    if coordinator is None:
+        _LOGGER.error("No coordinator found in hass.data for entry %s", config_entry.entry_id)
         return
 
-
-    # ✅ Initialdaten für SystemSensor (weil dein ctor system_data erwartet)
-    try:
-        system_data = await hass.async_add_executor_job(technicolor.system)
-    except Exception as err:
-        _LOGGER.warning("Initial system fetch failed, continuing: %s", err)
-        system_data = {}
+    # Auswahl aus dem Options-Schritt "entities": nur diese Felder/Tabellen werden abgefragt
+    options = config_entry.options
+    system_fields = options.get(CONF_SYSTEM_FIELDS, SYSTEM_FIELDS)
+    docsis_tables = frozenset(options.get(CONF_DOCSIS_TABLES, MODEM_FIELDS))
+    host_table_attribute = options.get(CONF_HOST_TABLE_ATTRIBUTE, DEFAULT_HOST_TABLE_ATTRIBUTE)
 
     sensors = [
-        TechnicolorCGASystemSensor(technicolor, hass, config_entry.entry_id, host, "System", system_data,
+        TechnicolorCGASystemSensor(coordinator, config_entry.entry_id, host, "System", system_fields,
           unique_suffix="system", suggested_object_id="technicolor_system"),
 
-        TechnicolorCGAHostSensor(technicolor, hass, config_entry.entry_id, host, "Hosts",
+        TechnicolorCGAHostSensor(coordinator, config_entry.entry_id, host, "Hosts", host_table_attribute,
           unique_suffix="hosts", suggested_object_id="technicolor_hosts"),
-          
-        TechnicolorCGAHostDeltaSensor(technicolor, hass, config_entry.entry_id, host, "Missing/Inactive Hosts",
+
+        TechnicolorCGAHostDeltaSensor(coordinator, config_entry.entry_id, host, "Missing/Inactive Hosts",
           unique_suffix="missing_inactive_hosts", suggested_object_id="technicolor_missing_inactive_hosts"),
-    ]
 
-    # DHCP dynamisch (Blacklist-Ansatz)
-    notwanted: set[str] = set()  # erst mal leer lassen
+        TechnicolorCGARequestStatsSensor(coordinator, config_entry.entry_id, host, "Gateway Requests",
+          unique_suffix="gateway_requests", suggested_object_id="technicolor_gateway_requests"),
+
+        TechnicolorCGALatencySensor(coordinator, config_entry.entry_id, host, "Gateway Latency",
+          unique_suffix="gateway_latency", suggested_object_id="technicolor_gateway_latency"),
 
-    try:
-        dhcp_data = await hass.async_add_executor_job(technicolor.dhcp)
-        for key in sorted(dhcp_data.keys()):
-            if key in notwanted:
-                continue
+        TechnicolorCGAErrorSensor(coordinator, config_entry.entry_id, host, "Gateway Errors",
+          unique_suffix="gateway_errors", suggested_object_id="technicolor_gateway_errors"),
 
+        TechnicolorCGALastSuccessSensor(coordinator, config_entry.entry_id, host, "Last Successful Fetch",
+          unique_suffix="last_successful_fetch", suggested_object_id="technicolor_last_successful_fetch"),
+    ]
+
+    if coordinator.presence is not None:
+        for key, name, state_class in PRESENCE_SENSORS:
             sensors.append(
+                TechnicolorCGAPresenceSensor(
+                    coordinator,
+                    config_entry.entry_id,
+                    host,
+                    name,
+                    key,
+                    state_class,
+                    unique_suffix=f"presence_{key}",
+                    suggested_object_id=f"technicolor_{key}_today",
+                )
+            )
+        sensors.append(
+            TechnicolorCGAPresenceLogSensor(coordinator, config_entry.entry_id, host, "Presence Log Size",
+              unique_suffix="presence_log_size", suggested_object_id="technicolor_presence_log_size")
+        )
+
+    # DOCSIS-Aggregate aus einem levels()-Aufruf pro Zyklus, soweit die gewählten Tabellen sie liefern
+    deselected = []
+    for key, name, unit, state_class in DOCSIS_SUMMARY_SENSORS:
+        if not _docsis_available(key, docsis_tables):
+            deselected.append(f"docsis_{key}")
+            continue
+        sensors.append(
+            TechnicolorCGADocsisSummarySensor(
+                coordinator,
+                config_entry.entry_id,
+                host,
+                name,
+                key,
+                unit,
+                state_class,
+                docsis_tables,
+                unique_suffix=f"docsis_{key}",
+                suggested_object_id=f"technicolor_docsis_{key}",
+            )
+        )
+
+    for key, name, unit in DOCSIS_ANALYSIS_SENSORS:
+        if not _docsis_available(key, docsis_tables):
+            deselected.append(f"docsis_{key}")
+            continue
+        sensors.append(
+            TechnicolorCGADocsisAnalysisSensor(
+                coordinator,
+                config_entry.entry_id,
+                host,
+                name,
+                key,
+                unit,
+                docsis_tables,
+                unique_suffix=f"docsis_{key}",
+                suggested_object_id=f"technicolor_docsis_{key}",
+            )
+        )
+
+    # Fleet-Sensoren (alle Gateways) nur einmal, vom ersten eingerichteten Entry
+    manager = coordinator.manager
+    if manager is not None and manager.fleet_owner in (None, config_entry.entry_id):
+        manager.fleet_owner = config_entry.entry_id
+        for key, name in FLEET_SENSORS:
+            sensors.append(TechnicolorCGAFleetSensor(manager, key, name))
+
+    # ✅ Kein eigener Timer mehr: der Coordinator pollt einmal für alle Sensoren
+    async_add_entities(sensors)
+
+    # Kanal-Sensoren erst anlegen, wenn levels() die Kanäle kennt (und neue Kanäle nachziehen)
+    docsis = coordinator.docsis
+    channel_keys: set[str] = set()
+
+    @callback
+    def _async_add_docsis_channels() -> None:
+        new_keys = docsis.channels.keys() - channel_keys
+        if not new_keys:
+            return
+        channel_keys.update(new_keys)
+
+        new_sensors = []
+        for key in sorted(new_keys):
+            channel = docsis.channels[key]
+            kinds = ("power", "snr") if channel.direction == DOWNSTREAM else ("power",)
+            for kind in kinds:
+                new_sensors.append(
+                    TechnicolorCGADocsisChannelSensor(
+                        coordinator,
+                        config_entry.entry_id,
+                        host,
+                        f"DOCSIS {channel.label} {kind.upper() if kind == 'snr' else 'Power'}",
+                        key,
+                        kind,
+                        docsis_tables,
+                        unique_suffix=f"docsis_{key}_{kind}",
+                        suggested_object_id=f"technicolor_docsis_{key}_{kind}",
+                    )
+                )
+        async_add_entities(new_sensors)
+
+    config_entry.async_on_unload(coordinator.async_add_listener(_async_add_docsis_channels))
+    _async_add_docsis_channels()
+
+    # DHCP dynamisch (Blacklist-Ansatz): sofort aus den gecachten Keys, neue Keys nach dem Abruf
+    notwanted = set(options.get(CONF_DHCP_EXCLUDED, ()))
+    deselected.extend(f"dhcp_{key.lower()}" for key in notwanted)
+    _async_remove_deselected(hass, config_entry, deselected)
+    dhcp_keys: set[str] = set()
+    registry = er.async_get(hass)
+    remove_discovery = None
+
+    def _dhcp_disabled(key: str) -> bool:
+        entity_id = registry.async_get_entity_id(
+            "sensor", DOMAIN, f"{config_entry.entry_id}_dhcp_{key.lower()}"
+        )
+        registry_entry = registry.async_get(entity_id) if entity_id is not None else None
+        return registry_entry is not None and registry_entry.disabled_by is not None
+
+    @callback
+    def _async_update_dhcp_discovery() -> None:
+        # Nur noch nicht bekannte Keys suchen; bekannte fragt ihr Sensor selbst an (wenn aktiviert)
+        nonlocal remove_discovery
+        if remove_discovery is not None:
+            remove_discovery()
+            remove_discovery = None
+        fields = tuple(
+            f
+            for f in DHCP_FIELDS
+            if f not in dhcp_keys and f not in notwanted and not _dhcp_disabled(f)
+        )
+        if fields:
+            remove_discovery = coordinator.async_add_consumer(ENDPOINT_DHCP, fields)
+
+    @callback
+    def _async_stop_dhcp_discovery() -> None:
+        if remove_discovery is not None:
+            remove_discovery()
+
+    @callback
+    def _async_add_dhcp_sensors() -> None:
+        available = set(config_entry.data.get(DATA_DHCP_KEYS) or ())
+        available.update(((coordinator.data or {}).get(ENDPOINT_DHCP) or {}).keys())
+        new_keys = available - dhcp_keys - notwanted
+        if not new_keys:
+            return
+        dhcp_keys.update(new_keys)
+        _async_update_dhcp_discovery()
+
+        async_add_entities(
+            [
                 TechnicolorCGADHCPSensor(
-                    technicolor,
-                    hass,
+                    coordinator,
                     config_entry.entry_id,
                     host,
                     f"CGA DHCP {key}",
@@ -76,39 +300,44 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
                     unique_suffix=f"dhcp_{key.lower()}",
                     suggested_object_id=f"technicolor_dhcp_{key.lower()}",
                 )
-            )
-    except Exception as err:
-        _LOGGER.warning("Failed to fetch DHCP data: %s", err)
-
+                for key in sorted(new_keys)
+            ]
+        )
 
-    async_add_entities(sensors, update_before_add=True)
+    _async_add_dhcp_sensors()
+    # Noch nicht gemeldete Felder weiter anfragen, damit später gemeldete Keys einen Sensor bekommen
+    _async_update_dhcp_discovery()
+    config_entry.async_on_unload(_async_stop_dhcp_discovery)
+    config_entry.async_on_unload(coordinator.async_add_listener(_async_add_dhcp_sensors))
 
-    # ✅ EIN Update-Loop für alle Sensoren (keine doppelten Timer)
-    async def _update_all(_now):
-        for s in sensors:
-            try:
-                await s.async_update()
-            finally:
-                s.async_write_ha_state()
 
 
-    # ✅ Timer starten und "unsubscribe" speichern (damit unload/reload sauber ist)
-    unsub = async_track_time_interval(hass, _update_all, scan_interval)
+class TechnicolorCGABaseSensor(CoordinatorEntity, SensorEntity):
+    """Base class for Technicolor CGA sensors with device_info.
 
-    # Wichtig: unsub im hass.data speichern, damit __init__.py es beim unload entfernen kann    
-    entry_store = hass.data.setdefault(DOMAIN, {}).setdefault(config_entry.entry_id, {})
-    if isinstance(entry_store, dict):
-        entry_store["unsub"] = unsub
+    Subclasses list the coordinator endpoints they read in ``_endpoints``
+    and turn the shared snapshot into state in ``_apply_data``.
 
+    State is only written when a fingerprint of availability, state and
+    attributes differs from the last written one, so unchanged sensors do
+    not produce state_changed events or recorder rows. Sensors with
+    ``_endpoints`` skip the fingerprint entirely when none of them changed
+    and availability is the same; sensors with large attributes override
+    ``_state_fingerprint`` with values the coordinator already computed.
+    Large attributes are listed in ``_unrecorded_attributes`` to keep them
+    out of the recorder.
 
+    ``_fields`` narrows the registered endpoints to the fields the sensor
+    actually reads (``None``: all), so the coordinator can leave the rest
+    out of the request.
+    """
 
-class TechnicolorCGABaseSensor(SensorEntity):
-    """Base class for Technicolor CGA sensors with device_info."""
+    _endpoints: tuple[str, ...] = ()
+    _fields: tuple[str, ...] | None = None
 
     def __init__(
         self,
-        technicolor_cga,
-        hass,
+        coordinator,
         config_entry_id,
         host,
         name,
@@ -117,8 +346,7 @@ class TechnicolorCGABaseSensor(SensorEntity):
         suggested_object_id: str | None = None,
     ):
         """Initialize the sensor."""
-        self.technicolor_cga = technicolor_cga
-        self.hass = hass
+        super().__init__(coordinator)
         self._config_entry_id = config_entry_id
         self._host = host
         self._attr_has_entity_name = True
@@ -129,12 +357,11 @@ class TechnicolorCGABaseSensor(SensorEntity):
             self._attr_suggested_object_id = suggested_object_id
         self._state = None
         self._attributes = {}
-        self._model = None
-        self._sw_version = None
-        self._attr_should_poll = False
+        self._written_fingerprint = None
+        self._written_available = None
         _LOGGER.debug("%s Sensor initialized (host: %s)", name, host)
 
-        
+
     @property
     def name(self):
         """Return the name of the sensor."""
@@ -156,7 +383,7 @@ class TechnicolorCGABaseSensor(SensorEntity):
 
         Keeping it simple: identifiers by (DOMAIN, host), a friendly name,
         manufacturer, and a configuration URL.
-        The system sensor may enrich model and sw_version after its first fetch.
+        Model and sw_version come from the cached identity data.
         """
         info = {
             "identifiers": {(DOMAIN, self._config_entry_id)},
@@ -164,153 +391,483 @@ class TechnicolorCGABaseSensor(SensorEntity):
             "manufacturer": "Technicolor",
             "configuration_url": f"http://{self._host}/",
         }
-        if self._model:
-            info["model"] = self._model
-        if self._sw_version:
-            info["sw_version"] = self._sw_version
+        identity = self.coordinator.identity
+        # Pick common keys for model / firmware if available
+        model = identity.get("ModelName") or identity.get("Model")
+        sw_version = (
+            identity.get("SoftwareVersion")
+            or identity.get("SWVersion")
+            or identity.get("FirmwareVersion")
+        )
+        if model:
+            info["model"] = model
+        if sw_version:
+            info["sw_version"] = sw_version
+        if identity.get("SerialNumber"):
+            info["serial_number"] = identity["SerialNumber"]
         return info
 
-    async def async_update(self):
-        """Fetch new state data for the sensor."""
-        raise NotImplementedError("Subclasses must implement async_update")
+    async def async_added_to_hass(self):
+        """Register the consumed endpoints and apply the current snapshot."""
+        await super().async_added_to_hass()
+        for endpoint in self._endpoints:
+            self.async_on_remove(self.coordinator.async_add_consumer(endpoint, self._fields))
+        if self.coordinator.data:
+            self._apply_data(self.coordinator.data)
+        # HA schreibt den Anfangszustand direkt nach dem Hinzufügen
+        self._written_fingerprint = self._state_fingerprint()
+        self._written_available = self.available
+
+    def _state_fingerprint(self):
+        return payload_fingerprint((self.available, self.state, self.extra_state_attributes))
+
+    def _endpoints_changed(self) -> bool:
+        if not self._endpoints:
+            return True
+        return not self.coordinator.changed_endpoints.isdisjoint(self._endpoints)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Apply the shared snapshot and write the state only if it changed."""
+        profiler = self.coordinator.profiler
+        # Nur mit aktivem Profiling messen (sonst kein perf_counter im Hot Path)
+        started = time.perf_counter() if profiler.active else None
+        if self.coordinator.data and self._endpoints_changed():
+            self._apply_data(self.coordinator.data)
+            fingerprint = self._state_fingerprint()
+        elif self._endpoints and self.available == self._written_available:
+            # Nichts Gelesenes geändert -> kein Fingerprint, kein Schreiben
+            fingerprint = self._written_fingerprint
+        else:
+            fingerprint = self._state_fingerprint()
+
+        if started is not None:
+            profiler.add("attributes", time.perf_counter() - started, type(self).__name__)
+        if fingerprint == self._written_fingerprint:
+            return
+        self._written_fingerprint = fingerprint
+        self._written_available = self.available
+        if started is None:
+            self.async_write_ha_state()
+            return
+        started = time.perf_counter()
+        self.async_write_ha_state()
+        profiler.add("state_write", time.perf_counter() - started, type(self).__name__)
+
+    def _apply_data(self, data: dict):
+        """Update state from the coordinator snapshot."""
+        raise NotImplementedError("Subclasses must implement _apply_data")
 
 
 class TechnicolorCGASystemSensor(TechnicolorCGABaseSensor):
     """System sensor for Technicolor CGA."""
 
-    def __init__(self, technicolor_cga, hass, config_entry_id, host, name, system_data, **kwargs):
-        super().__init__(technicolor_cga, hass, config_entry_id, host, name, **kwargs)
-        self._apply_system_data(system_data)
-        
+    _endpoints = (ENDPOINT_SYSTEM,)
+
+    def __init__(self, coordinator, config_entry_id, host, name, system_fields, **kwargs):
+        super().__init__(coordinator, config_entry_id, host, name, **kwargs)
+        self._fields = ("CMStatus", *system_fields)
+        self._apply_data(coordinator.data or {})
+
+
+    def _apply_data(self, data: dict):
+        self._apply_system_data(data.get(ENDPOINT_SYSTEM) or {})
 
     def _apply_system_data(self, system_data: dict):
         self._state = system_data.get("CMStatus", "Unknown")
-        # Pick common keys for model / firmware if available
-        self._model = system_data.get("ModelName") or system_data.get("Model")
-        self._sw_version = (
-            system_data.get("SoftwareVersion")
-            or system_data.get("SWVersion")
-            or system_data.get("FirmwareVersion")
-        )
-        self._attributes = {k: v for k, v in system_data.items() if k != "CMStatus"}
-
-    async def async_update(self):
-        try:
-            system_data = await self.hass.async_add_executor_job(self.technicolor_cga.system)
-            self._apply_system_data(system_data)
-        except Exception as e:
-            _LOGGER.error(f"Error updating {self.name}: {e}")
+        # Statische Identity-Felder + pro Poll geholte Werte
+        # (UpTime wird für die Reboot-Erkennung immer geholt, aber nur gewählt angezeigt)
+        polled = {k: v for k, v in system_data.items() if k in self._fields}
+        merged = {**self.coordinator.identity, **polled}
+        self._attributes = {k: v for k, v in merged.items() if k != "CMStatus"}
 
 
 class TechnicolorCGADHCPSensor(TechnicolorCGABaseSensor):
     """DHCP sensor for Technicolor CGA."""
 
+    _endpoints = (ENDPOINT_DHCP,)
 
-    def __init__(self, technicolor_cga, hass, config_entry_id, host, name, attribute, **kwargs):
-        super().__init__(technicolor_cga, hass, config_entry_id, host, name, **kwargs)
-        self._attribute = attribute        
-        self._attr_entity_category = EntityCategory.DIAGNOSTIC        
+    def __init__(self, coordinator, config_entry_id, host, name, attribute, **kwargs):
+        super().__init__(coordinator, config_entry_id, host, name, **kwargs)
+        self._attribute = attribute
+        self._fields = (attribute,)
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
 
-    async def async_update(self):
-        try:
-            dhcp_data = await self.hass.async_add_executor_job(self.technicolor_cga.dhcp)
-            self._state = dhcp_data.get(self._attribute, "Unknown")
-        except Exception as e:
-            _LOGGER.error(f"Error updating {self.name}: {e}")
+    def _apply_data(self, data: dict):
+        dhcp_data = data.get(ENDPOINT_DHCP) or {}
+        self._state = dhcp_data.get(self._attribute, "Unknown")
 
 
 class TechnicolorCGAHostSensor(TechnicolorCGABaseSensor):
     """Host sensor for Technicolor CGA."""
 
-    def __init__(self, technicolor_cga, hass, config_entry_id, host, name, **kwargs):
-        super().__init__(technicolor_cga, hass, config_entry_id, host, name, **kwargs)        
+    _endpoints = (ENDPOINT_HOST,)
+    # Komplette Hosttabelle nicht in die Recorder-DB schreiben
+    _unrecorded_attributes = frozenset({"hostTbl"})
+
+    def __init__(self, coordinator, config_entry_id, host, name, host_table_attribute=True, **kwargs):
+        super().__init__(coordinator, config_entry_id, host, name, **kwargs)
+        self._host_table_attribute = host_table_attribute
 
-    async def async_update(self):
-        try:
-            host_data = await self.hass.async_add_executor_job(self.technicolor_cga.aDev)
-            self._state = len(host_data.get("hostTbl", []))
+    def _apply_data(self, data: dict):
+        host_data = data.get(ENDPOINT_HOST) or {}
+        self._state = len(host_data.get("hostTbl", []))
+        if self._host_table_attribute:
             self._attributes = host_data
-        except Exception as e:
-            _LOGGER.error(f"Error updating {self.name}: {e}")
+        else:
+            self._attributes = {k: v for k, v in host_data.items() if k != "hostTbl"}
+
+    def _state_fingerprint(self):
+        if not self._host_table_attribute:
+            return super()._state_fingerprint()
+        # Zustand und Attribute sind die Host-Antwort -> deren Fingerprint aus dem Coordinator
+        return (self.available, self.coordinator.endpoint_fingerprint(ENDPOINT_HOST))
 
 
 class TechnicolorCGAHostDeltaSensor(TechnicolorCGABaseSensor):
-    """Sensor to calculate missing or inactive devices and track known devices."""
+    """Sensor to calculate missing or inactive devices and track known devices.
+
+    Known devices come from the persistent ``KnownDeviceStore`` (updated by
+    the coordinator on every host fetch), so devices missing right after a
+    restart are still reported. Current hosts are looked up in the
+    coordinator's indexed ``HostTable``; the attribute lists are built once
+    per change of either and served from the cache in between.
+    """
+
+    _endpoints = (ENDPOINT_HOST,)
+    _fields = ("hostTbl",)
+    _unrecorded_attributes = frozenset({"known_devices"})
+
+    def __init__(self, coordinator, config_entry_id, host, name, **kwargs):
+        super().__init__(coordinator, config_entry_id, host, name, **kwargs)
+        self._store = coordinator.known_devices
+        self._hosts = coordinator.hosts
+        self._built_versions = None
+        self._state = 0
+        self._attributes = {"missing_devices": [], "known_devices": []}
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def _versions(self):
+        return (self._hosts.version, self._store.version)
+
+    def _endpoints_changed(self) -> bool:
+        return self._versions() != self._built_versions
+
+    def _state_fingerprint(self):
+        # Listen sind eine Funktion der Versionen von Host-Tabelle und Store
+        return (self.available, self._built_versions)
+
+    def _apply_data(self, data: dict):
+        """Rebuild the missing/known device lists from the host table and store."""
+        _LOGGER.debug("Updating %s sensor", self._attr_name)
+        self._built_versions = self._versions()
+
+        missing = []
+        known = []
+        # sorted_devices() ist bereits nach IP sortiert -> beide Listen bleiben sortiert
+        for mac, details in self._store.sorted_devices():
+            known.append(
+                {
+                    "mac": mac,
+                    "last_ip": details["last_ip"],
+                    "hostname": details["hostname"],
+                    "first_seen": _timestamp(details["first_seen"]),
+                }
+            )
+            current = self._hosts.get(mac)
+            if current is None:
+                missing.append(
+                    {
+                        "mac": mac,
+                        "last_ip": details["last_ip"],
+                        "hostname": details["hostname"],
+                        "status": "missing",
+                        "last_seen": _timestamp(details["last_seen"]),
+                    }
+                )
+            elif not current.active:
+                missing.append(
+                    {
+                        "mac": mac,
+                        "last_ip": current.ip,
+                        "hostname": current.hostname,
+                        "status": "inactive",
+                    }
+                )
 
-    def __init__(self, technicolor_cga, hass, config_entry_id, host, name, **kwargs):
-        super().__init__(technicolor_cga, hass, config_entry_id, host, name, **kwargs)
-        self._missing_devices = []
-        self._known_devices = {}  # dynamically learned known devices
-        self._attr_entity_category = EntityCategory.DIAGNOSTIC          
+        self._state = len(missing)
+        self._attributes = {"missing_devices": missing, "known_devices": known}
+
+
+class TechnicolorCGARequestStatsSensor(TechnicolorCGABaseSensor):
+    """Diagnostic sensor counting gateway requests issued and saved by the coordinator."""
+
+    _unrecorded_attributes = frozenset({"endpoint_intervals", "endpoint_errors", "stage_ms"})
+
+    def __init__(self, coordinator, config_entry_id, host, name, **kwargs):
+        super().__init__(coordinator, config_entry_id, host, name, **kwargs)
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def _apply_data(self, data: dict):
+        stats = self.coordinator.stats
+        self._state = stats["requests"]
+        self._attributes = {
+            "requests_saved": stats["requests_saved"],
+            "requests_merged": stats["requests_merged"],
+            "requests_deferred": stats["requests_deferred"],
+            "endpoint_intervals": {
+                ep: schedule.interval for ep, schedule in self.coordinator.schedules.items()
+            },
+            "cycles": stats["cycles"],
+            "last_cycle_seconds": stats["last_cycle_seconds"],
+            "queue_wait_seconds": stats["queue_wait_seconds"],
+            "endpoint_errors": dict(self.coordinator.endpoint_errors),
+            "circuit": self.coordinator.breaker.state,
+            "circuit_opened": self.coordinator.breaker.times_opened,
+            "reconnecting": self.coordinator.reconnecting,
+            "last_reconnect_seconds": self.coordinator.last_reconnect_seconds,
+        }
+        if self.coordinator.profiler.always:
+            self._attributes["stage_ms"] = self.coordinator.profiler.summary().get("mean_ms")
+
+
+class TechnicolorCGALatencySensor(TechnicolorCGABaseSensor):
+    """Mean gateway round-trip time with per-endpoint latency histograms."""
+
+    _unrecorded_attributes = frozenset({"endpoints"})
+
+    def __init__(self, coordinator, config_entry_id, host, name, **kwargs):
+        super().__init__(coordinator, config_entry_id, host, name, **kwargs)
+        self._attr_native_unit_of_measurement = "ms"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def _apply_data(self, data: dict):
+        client_stats = self.coordinator.api.stats
+        endpoints = {t: s.as_dict() for t, s in client_stats.endpoints.items()}
+        requests = client_stats.total_requests
+        latency = sum(s.latency_sum for s in client_stats.endpoints.values())
+        self._state = round(latency / requests * 1000, 1) if requests else None
+        self._attributes = {
+            "endpoints": endpoints,
+            "payload_bytes": sum(s.bytes for s in client_stats.endpoints.values()),
+        }
 
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        return len(self._missing_devices)
+
+class TechnicolorCGAErrorSensor(TechnicolorCGABaseSensor):
+    """Gateway request errors by type, logins and re-logins."""
+
+    def __init__(self, coordinator, config_entry_id, host, name, **kwargs):
+        super().__init__(coordinator, config_entry_id, host, name, **kwargs)
+        self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def _apply_data(self, data: dict):
+        client_stats = self.coordinator.api.stats
+        self._state = client_stats.total_errors
+        self._attributes = {
+            "errors_by_type": dict(client_stats.errors_by_type),
+            "logins": client_stats.logins,
+            "relogins": client_stats.relogins,
+        }
+
+
+class TechnicolorCGALastSuccessSensor(TechnicolorCGABaseSensor):
+    """Time of the last successful gateway request."""
+
+    def __init__(self, coordinator, config_entry_id, host, name, **kwargs):
+        super().__init__(coordinator, config_entry_id, host, name, **kwargs)
+        self._attr_device_class = SensorDeviceClass.TIMESTAMP
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
 
     @property
-    def extra_state_attributes(self):
-        """Return the state attributes of the sensor."""
-        return {
-            "missing_devices": sorted(
-                self._missing_devices, key=lambda x: self._ip_sort_key(x["last_ip"])
-            ),
-            "known_devices": sorted(
-                [
-                    {"mac": mac, "last_ip": details["ip"], "hostname": details["hostname"]}
-                    for mac, details in self._known_devices.items()
-                ],
-                key=lambda x: self._ip_sort_key(x["last_ip"]),
-            ),
+    def available(self):
+        # Gerade bei Gateway-Ausfällen interessant -> nicht an den Coordinator-Status koppeln
+        return True
+
+    def _apply_data(self, data: dict):
+        self._state = _timestamp(self.coordinator.api.stats.last_success)
+
+
+class TechnicolorCGAPresenceSensor(TechnicolorCGABaseSensor):
+    """Today's value from the presence log (peak/unique clients, DHCP churn); yesterday as attribute."""
+
+    _endpoints = (ENDPOINT_HOST,)
+    _fields = ("hostTbl",)
+
+    def __init__(self, coordinator, config_entry_id, host, name, key, state_class, **kwargs):
+        super().__init__(coordinator, config_entry_id, host, name, **kwargs)
+        self._key = key
+        self._attr_state_class = state_class
+
+    def _endpoints_changed(self) -> bool:
+        # Jeder Host-Abruf ist ein Sample, auch bei unveränderter Tabelle
+        return ENDPOINT_HOST in self.coordinator.fetched_endpoints
+
+    def _value(self, log, rollup):
+        if self._key == "peak_clients":
+            return rollup.peak
+        if self._key == "unique_clients":
+            return log.unique(rollup)
+        return rollup.churn
+
+    def _apply_data(self, data: dict):
+        log = self.coordinator.presence.log
+        self._state = self._value(log, log.today())
+        self._attributes = {
+            "yesterday": self._value(log, log.last_day) if log.last_day is not None else None,
         }
 
-    def _ip_sort_key(self, ip):
-        """Convert an IP address into a tuple of integers for correct sorting."""
-        try:
-            return tuple(map(int, ip.split(".")))
-        except ValueError:
-            return (999, 999, 999, 999)
 
-    async def async_update(self):
-        """Fetch new state data for the sensor."""
-        _LOGGER.debug("Updating %s sensor", self._attr_name)
-        try:
-            host_data = await self.hass.async_add_executor_job(self.technicolor_cga.aDev)
-            current_devices = {
-                host["physaddress"]: {
-                    "ip": host.get("ipaddress", "Unknown"),
-                    "hostname": host.get("hostname", "Unknown"),
-                    "active": host.get("active", "false"),
-                }
-                for host in host_data.get("hostTbl", [])
+class TechnicolorCGAPresenceLogSensor(TechnicolorCGABaseSensor):
+    """Size of the on-disk presence log and the number of hosts it covers."""
+
+    def __init__(self, coordinator, config_entry_id, host, name, **kwargs):
+        super().__init__(coordinator, config_entry_id, host, name, **kwargs)
+        self._attr_native_unit_of_measurement = "B"
+        self._attr_device_class = SensorDeviceClass.DATA_SIZE
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def _apply_data(self, data: dict):
+        log = self.coordinator.presence.log
+        self._state = log.size_bytes
+        self._attributes = {"hosts": len(log.macs)}
+
+
+class TechnicolorCGADocsisBaseSensor(TechnicolorCGABaseSensor):
+    """Base for sensors parsed from the coordinator's levels() snapshot."""
+
+    _endpoints = (ENDPOINT_MODEM,)
+
+    def __init__(self, coordinator, config_entry_id, host, name, docsis_tables, **kwargs):
+        super().__init__(coordinator, config_entry_id, host, name, **kwargs)
+        self._fields = tuple(t for t in MODEM_FIELDS if t in docsis_tables)
+
+    def _endpoints_changed(self) -> bool:
+        # Intervall-Fehlerzähler ändern sich mit jedem Fetch, auch bei gleichem Payload
+        return ENDPOINT_MODEM in self.coordinator.fetched_endpoints
+
+
+class TechnicolorCGADocsisSummarySensor(TechnicolorCGADocsisBaseSensor):
+    """Aggregate DOCSIS value (min/max/mean power, codeword error counters)."""
+
+    def __init__(self, coordinator, config_entry_id, host, name, key, unit, state_class, docsis_tables, **kwargs):
+        super().__init__(coordinator, config_entry_id, host, name, docsis_tables, **kwargs)
+        self._key = key
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def _apply_data(self, data: dict):
+        summary = self.coordinator.docsis.summary
+        self._state = summary.get(self._key)
+        if self._key.endswith("_interval"):
+            self._attributes = {"interval_seconds": summary.get("interval_seconds")}
+        elif self._key.startswith(("ds_", "us_")):
+            prefix = self._key[:2]
+            self._attributes = {"channels": summary.get(f"{prefix}_channels")}
+
+
+class TechnicolorCGADocsisAnalysisSensor(TechnicolorCGADocsisBaseSensor):
+    """Summary of the channel ring buffer: anomaly count, max z-score, error rate."""
+
+    def __init__(self, coordinator, config_entry_id, host, name, key, unit, docsis_tables, **kwargs):
+        super().__init__(coordinator, config_entry_id, host, name, docsis_tables, **kwargs)
+        self._key = key
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def _apply_data(self, data: dict):
+        analysis = self.coordinator.docsis.analysis
+        if self._key == "anomalies":
+            anomalies = analysis.get("anomalies", [])
+            self._state = len(anomalies)
+            self._attributes = {"anomalies": anomalies, "samples": analysis.get("samples")}
+        elif self._key == "uncorrectable_rate":
+            self._state = analysis.get("uncorrectable_rate")
+            self._attributes = {"correctable_rate": analysis.get("correctable_rate")}
+        else:
+            self._state = analysis.get(self._key)
+
+
+class TechnicolorCGADocsisChannelSensor(TechnicolorCGADocsisBaseSensor):
+    """Power or SNR of a single DOCSIS channel (disabled by default)."""
+
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, config_entry_id, host, name, channel_key, kind, docsis_tables, **kwargs):
+        super().__init__(coordinator, config_entry_id, host, name, docsis_tables, **kwargs)
+        self._channel_key = channel_key
+        self._kind = kind
+        self._attr_native_unit_of_measurement = UNIT_DBMV if kind == "power" else SIGNAL_STRENGTH_DECIBELS
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def _apply_data(self, data: dict):
+        channel = self.coordinator.docsis.channels.get(self._channel_key)
+        if channel is None:
+            # Kanal ist (vorübergehend) aus der Tabelle verschwunden
+            self._state = None
+            self._attributes = {}
+            return
+
+        self._state = channel.power if self._kind == "power" else channel.snr
+        if self._kind == "power":
+            self._attributes = {
+                "channel_id": channel.channel_id,
+                "frequency": channel.frequency,
+                "modulation": channel.modulation,
+                "lock_status": channel.lock_status,
+                "correctable": channel.correctable,
+                "uncorrectable": channel.uncorrectable,
             }
 
-            for mac, details in current_devices.items():
-                self._known_devices[mac] = details
-
-            self._missing_devices = []
-            for mac, details in self._known_devices.items():
-                if mac not in current_devices:
-                    self._missing_devices.append(
-                        {
-                            "mac": mac,
-                            "last_ip": details["ip"],
-                            "hostname": details["hostname"],
-                            "status": "missing",
-                        }
-                    )
-                elif current_devices[mac]["active"] == "false":
-                    self._missing_devices.append(
-                        {
-                            "mac": mac,
-                            "last_ip": current_devices[mac]["ip"],
-                            "hostname": current_devices[mac]["hostname"],
-                            "status": "inactive",
-                        }
-                    )
-        except Exception as e:
-            _LOGGER.error("Error updating %s sensor: %s", self._attr_name, e)
 
+class TechnicolorCGAFleetSensor(SensorEntity):
+    """Aggregate over all configured gateways, fed by the domain manager."""
 
+    _attr_should_poll = False
+    _attr_has_entity_name = True
+    _attr_state_class = SensorStateClass.MEASUREMENT
 
+    def __init__(self, manager, key, name):
+        self._manager = manager
+        self._key = key
+        self._attr_name = name
+        self._attr_unique_id = f"{DOMAIN}_fleet_{key}"
+        self._attr_suggested_object_id = f"technicolor_fleet_{key}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, "fleet")},
+            "name": "Technicolor CGA Fleet",
+            "manufacturer": "Technicolor",
+        }
+        self._written_fingerprint = None
+
+    @property
+    def native_value(self):
+        return self._manager.fleet_summary()[self._key]
 
+    @property
+    def extra_state_attributes(self):
+        gateways = self._manager.fleet_summary()["gateways"]
+        if self._key == "gateways_in_error":
+            return {"gateways": sorted(g for g, details in gateways.items() if details["error"])}
+        return {"gateways": {g: details["hosts"] for g, details in gateways.items()}}
+
+    async def async_added_to_hass(self):
+        self.async_on_remove(self._manager.async_add_listener(self._handle_fleet_update))
+        self._written_fingerprint = self._state_fingerprint()
+
+    def _state_fingerprint(self) -> str:
+        return payload_fingerprint((self.native_value, self.extra_state_attributes))
+
+    @callback
+    def _handle_fleet_update(self) -> None:
+        # Jedes Gateway-Update meldet sich hier -> nur bei geändertem Wert schreiben
+        fingerprint = self._state_fingerprint()
+        if fingerprint == self._written_fingerprint:
+            return
+        self._written_fingerprint = fingerprint
+        self.async_write_ha_state()
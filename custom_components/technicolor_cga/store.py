@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import shutil
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .hosts import ip_sort_key
+from .presence import PresenceLog
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Höchstens ein Schreibvorgang auf den Flash pro SAVE_DELAY Sekunden
+SAVE_DELAY = 600
+
+
+class KnownDeviceStore:
+    """Known LAN devices by MAC, persisted with Home Assistant's storage helper.
+
+    Each entry holds ``first_seen``, ``last_seen`` (epoch seconds), ``last_ip``
+    and ``hostname``. ``async_update`` merges one ``hostTbl`` incrementally;
+    writes are batched to at most one per ``SAVE_DELAY`` and entries not seen
+    for ``max_age_days`` are evicted. ``version`` changes whenever an entry is
+    added, removed or gets a new IP/hostname, so views can be cached.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, max_age_days: int) -> None:
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.known_devices")
+        self._max_age = int(max_age_days) * 86400
+        self._save_pending = False
+        self.devices: dict[str, dict] = {}
+        self.version = 0
+        self._sorted: list[tuple[str, dict]] | None = None
+        self._sorted_version = None
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load() or {}
+        self.devices = data.get("devices", {})
+        self.version += 1
+        _LOGGER.debug("Loaded %s known devices", len(self.devices))
+
+    @callback
+    def async_update(self, host_tbl: list[dict]) -> bool:
+        """Merge the current host table; returns True if entries changed."""
+        now = int(dt_util.utcnow().timestamp())
+        changed = False
+
+        for host in host_tbl:
+            mac = host.get("physaddress")
+            if not mac:
+                continue
+            ip = host.get("ipaddress", "Unknown")
+            hostname = host.get("hostname", "Unknown")
+
+            entry = self.devices.get(mac)
+            if entry is None:
+                self.devices[mac] = {
+                    "first_seen": now,
+                    "last_seen": now,
+                    "last_ip": ip,
+                    "hostname": hostname,
+                }
+                changed = True
+                continue
+
+            if host.get("active", "false") != "false":
+                entry["last_seen"] = now
+            if entry["last_ip"] != ip or entry["hostname"] != hostname:
+                entry["last_ip"] = ip
+                entry["hostname"] = hostname
+                changed = True
+
+        expired = [
+            mac for mac, entry in self.devices.items() if now - entry["last_seen"] > self._max_age
+        ]
+        for mac in expired:
+            del self.devices[mac]
+        if expired:
+            _LOGGER.debug("Evicted %s known devices not seen for %ss", len(expired), self._max_age)
+            changed = True
+
+        if changed:
+            self.version += 1
+        self._schedule_save()
+        return changed
+
+    def sorted_devices(self) -> list[tuple[str, dict]]:
+        """Return ``(mac, entry)`` pairs sorted by last IP (cached per version)."""
+        if self._sorted is None or self._sorted_version != self.version:
+            self._sorted = sorted(
+                self.devices.items(), key=lambda item: ip_sort_key(item[1]["last_ip"])
+            )
+            self._sorted_version = self.version
+        return self._sorted
+
+    def _schedule_save(self) -> None:
+        # Kein erneutes async_delay_save, solange ein Schreiben aussteht (würde es sonst verschieben)
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        self._save_pending = False
+        return {"devices": self.devices}
+
+    async def async_flush(self) -> None:
+        """Write pending changes now (on unload)."""
+        if self._save_pending:
+            await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
+
+
+class PresenceStore:
+    """Host presence log of one gateway (``PresenceLog``) with batched writes.
+
+    Samples are recorded in memory on every host fetch and appended to the
+    log files in the executor at most once per ``SAVE_DELAY``, like the
+    known devices. Queries flush first so they see every sample.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, max_gap: float) -> None:
+        self._hass = hass
+        self.log = PresenceLog(
+            hass.config.path(".storage", f"{DOMAIN}.{entry_id}.presence"),
+            dt_util.get_default_time_zone(),
+            max_gap,
+        )
+        self._lock = asyncio.Lock()
+        self._cancel_flush = None
+
+    async def async_load(self) -> None:
+        await self._hass.async_add_executor_job(self.log.load)
+        _LOGGER.debug("Loaded presence log with %s hosts (%s bytes)", len(self.log.macs), self.log.size_bytes)
+
+    @callback
+    def async_record(self, active_macs, churn: int) -> None:
+        self.log.record(int(dt_util.utcnow().timestamp()), active_macs, churn)
+        if self._cancel_flush is None:
+            self._cancel_flush = async_call_later(self._hass, SAVE_DELAY, self._async_flush_later)
+
+    async def _async_flush_later(self, _now) -> None:
+        self._cancel_flush = None
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Append the recorded samples and rollups to disk now."""
+        if self._cancel_flush is not None:
+            self._cancel_flush()
+            self._cancel_flush = None
+        async with self._lock:
+            # Puffer im Event-Loop übernehmen, geschrieben wird im Executor
+            macs, pending = self.log.take_pending()
+            await self._hass.async_add_executor_job(
+                self.log.write, macs, pending, int(dt_util.utcnow().timestamp())
+            )
+
+    async def async_query(self, resolution: str, since: int, mac: str | None = None) -> list[dict]:
+        """Rollups from ``since`` on, oldest first, the open bucket last."""
+        await self.async_flush()
+        closed = await self._hass.async_add_executor_job(self.log.read_rollups, resolution, since)
+        return [self.log.describe(rollup, mac) for rollup in (*closed, *self.log.open_rollups(resolution))]
+
+    async def async_remove(self) -> None:
+        await self._hass.async_add_executor_job(shutil.rmtree, self.log.path, True)
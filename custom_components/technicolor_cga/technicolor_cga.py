@@ -1,138 +1,575 @@
-import requests
+import asyncio
+import bisect
 import hashlib
+import json
+import logging
 import time
 
-class TechnicolorCGA:
-    def __init__(self, username, password, router="192.168.0.1"):
+import aiohttp
+from yarl import URL
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/105.0.0.0 Safari/537.36"
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Unveränderliche Gerätedaten: einmal beim Setup und nach einem Reboot holen
+IDENTITY_FIELDS = [
+    "HardwareVersion",
+    "FirmwareName",
+    "CMMACAddress",
+    "MACAddressRT",
+    "ModelName",
+    "Manufacturer",
+    "SerialNumber",
+    "SoftwareVersion",
+    "BootloaderVersion",
+    "CoreVersion",
+    "FirmwareBuildTime",
+    "ProcessorSpeed",
+    "Hardware",
+    "MemTotal",
+]
+
+# Veränderliche Werte: bei jedem Poll
+SYSTEM_FIELDS = [
+    "UpTime",
+    "LocalTime",
+    "CMStatus",
+    "MemFree",
+    "LanMode",
+]
+
+MODEM_FIELDS = [
+    "exUSTbl",
+    "exDSTbl",
+    "USTbl",
+    "DSTbl",
+    "ErrTbl"
+]
+
+DHCP_FIELDS = [
+    "IPAddressRT",
+    "SubnetMaskRT",
+    "IPAddressGW",
+    "DNSTblRT",
+    "PoolEnable",
+    "WanAddressMode"
+]
+
+HOST_FIELDS = [ "hostTbl", "LanMode" , "MixedMode" , "LanPortMode" ]
+
+
+# Obergrenzen (Sekunden) der Latenz-Histogramm-Buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class SessionExpired(Exception):
+    """The gateway no longer accepts the session (auth error, login page, no data)."""
+
+
+class EndpointStats:
+    """Request counters and latency histogram of one API target."""
+
+    __slots__ = ("requests", "errors", "unchanged", "bytes", "latency_sum", "latency_max", "buckets")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.unchanged = 0
+        self.bytes = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        # letzter Bucket: alles über LATENCY_BUCKETS[-1]
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def as_dict(self):
+        mean = self.latency_sum / self.requests if self.requests else None
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "unchanged": self.unchanged,
+            "bytes": self.bytes,
+            "latency_mean_ms": round(mean * 1000, 1) if mean is not None else None,
+            "latency_max_ms": round(self.latency_max * 1000, 1),
+            "histogram": {
+                **{f"le_{bound}s": count for bound, count in zip(LATENCY_BUCKETS, self.buckets)},
+                "gt_max": self.buckets[-1],
+            },
+        }
+
+
+class ClientStats:
+    """Instrumentation of all requests sent by one client."""
+
+    def __init__(self):
+        self.endpoints: dict[str, EndpointStats] = {}
+        self.errors_by_type: dict[str, int] = {}
+        self.logins = 0
+        self.relogins = 0
+        self.last_success: float | None = None
+        # CPU-Zeit für das JSON-Parsen (getrennt von der Netzwerk-Latenz)
+        self.decode_seconds = 0.0
+
+    def record(self, target, seconds, nbytes, error=None):
+        stats = self.endpoints.get(target)
+        if stats is None:
+            stats = self.endpoints[target] = EndpointStats()
+        stats.requests += 1
+        stats.bytes += nbytes
+        stats.latency_sum += seconds
+        stats.latency_max = max(stats.latency_max, seconds)
+        stats.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        if error is None:
+            self.last_success = time.time()
+        else:
+            self.record_error(target, error)
+
+    def record_unchanged(self, target):
+        stats = self.endpoints.get(target)
+        if stats is not None:
+            stats.unchanged += 1
+
+    def record_error(self, target, error):
+        stats = self.endpoints.get(target)
+        if stats is not None:
+            stats.errors += 1
+        name = type(error).__name__
+        self.errors_by_type[name] = self.errors_by_type.get(name, 0) + 1
+
+    @property
+    def total_requests(self):
+        return sum(s.requests for s in self.endpoints.values())
+
+    @property
+    def total_errors(self):
+        return sum(self.errors_by_type.values())
+
+    def as_dict(self):
+        return {
+            "endpoints": {target: s.as_dict() for target, s in self.endpoints.items()},
+            "errors_by_type": dict(self.errors_by_type),
+            "logins": self.logins,
+            "relogins": self.relogins,
+            "last_success": self.last_success,
+            "decode_seconds": round(self.decode_seconds, 3),
+        }
+
+
+class Payload:
+    """Decoded ``data`` of a response with its content digest.
+
+    ``changed`` is False when the gateway answered 304 or sent the same
+    bytes as last time; ``data`` is then the previously decoded object.
+    """
+
+    __slots__ = ("data", "digest", "changed", "etag", "last_modified")
+
+    def __init__(self, data, digest, changed, etag=None, last_modified=None):
+        self.data = data
+        self.digest = digest
+        self.changed = changed
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def unchanged(self):
+        return Payload(self.data, self.digest, False, self.etag, self.last_modified)
+
+
+class AsyncTechnicolorCGA:
+    """asyncio client for the Technicolor CGA web API.
+
+    Uses one pooled keep-alive ``aiohttp.ClientSession``. A session can be
+    passed in (e.g. from Home Assistant's helpers); it then needs its own
+    cookie jar with ``unsafe=True`` because the gateway is addressed by IP.
+
+    When the gateway expires the session, ``call()`` logs in again once and
+    retries. The derived PBKDF2 hash is cached per salt pair and sent
+    directly on re-login, so recovery costs one login round-trip instead of
+    the full salt handshake and key derivation.
+    """
+
+    def __init__(self, username, password, router="192.168.0.1", session=None):
         self.server = f"http://{router}"
         self.username = username
         self.password = password
 
         self.logged = False
+        self.stats = ClientStats()
+        self._targets = {}
+        # URL (ohne Cache-Buster) -> letzter Payload für bedingte Abrufe
+        self._payloads = {}
+
+        self._login_lock = asyncio.Lock()
+        self._login_generation = 0
+        # (salt, saltwebui, abgeleiteter Hash) -> PBKDF2 nur bei geänderten Salts
+        self._challenge_cache = None
+        self._fast_login = True
+
+        self._session = session
+        self._owns_session = session is None
+        self._headers = {
+            "User-Agent": USER_AGENT,
+            "X-Requested-With": "XMLHttpRequest",
+        }
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60),
+                cookie_jar=aiohttp.CookieJar(unsafe=True),
+            )
+            self._owns_session = True
+        return self._session
+
+    async def close(self):
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self.logged = False
 
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/105.0.0.0 Safari/537.36"})
-        self.session.headers.update({"X-Requested-With": "XMLHttpRequest"})
+    @property
+    def relogins(self):
+        return self.stats.relogins
 
     def endpoint(self, target, options):
         opts = ",".join(options)
         now = int(time.time())
 
         if len(options) == 0:
-            return f"{self.server}/api/v1/{target}?_={now}"
+            url = f"{self.server}/api/v1/{target}"
+        else:
+            url = f"{self.server}/api/v1/{target}/{opts}"
 
-        return f"{self.server}/api/v1/{target}/{opts}?_={now}"
+        # Für die Statistik: URL -> Ziel (ohne Feldliste)
+        self._targets[url] = target
+        return f"{url}?_={now}"
 
-    def call(self, endpoint):
-        request = self.session.get(endpoint)
-        response = request.json()
+    def _target(self, endpoint):
+        url = endpoint.split("?", 1)[0]
+        return self._targets.get(url, url)
+
+    async def _send(self, method, endpoint, data=None, headers=None):
+        """Send one request and record latency, payload size and errors.
+
+        Returns ``(status, response headers, body)``.
+        """
+        target = self._target(endpoint)
+        started = time.monotonic()
+        try:
+            async with self.session.request(
+                method,
+                endpoint,
+                data=data,
+                headers={**self._headers, **headers} if headers else self._headers,
+                timeout=DEFAULT_TIMEOUT,
+            ) as request:
+                if request.status in (401, 403):
+                    raise SessionExpired(f"HTTP {request.status}")
+                body = await request.read()
+        except (Exception, asyncio.CancelledError) as err:
+            # CancelledError = Abbruch durch das Endpunkt-Timeout des Aufrufers
+            self.stats.record(target, time.monotonic() - started, 0, err)
+            raise
+
+        self.stats.record(target, time.monotonic() - started, len(body))
+        return request.status, request.headers, body
+
+    async def _request(self, method, endpoint, data=None):
+        return (await self._send(method, endpoint, data))[2]
+
+    def _decode(self, endpoint, body):
+        """Return the ``data`` member of a JSON response."""
+        started = time.perf_counter()
+        try:
+            response = json.loads(body)
+        except ValueError as err:
+            # Abgelaufene Session: Gateway liefert die HTML-Loginseite statt JSON
+            self.stats.record_error(self._target(endpoint), err)
+            raise SessionExpired("non-JSON response (login page?)") from err
+        finally:
+            self.stats.decode_seconds += time.perf_counter() - started
+
+        if not isinstance(response, dict) or "data" not in response:
+            error = response.get("error") if isinstance(response, dict) else None
+            expired = SessionExpired(f"no data in response (error={error})")
+            self.stats.record_error(self._target(endpoint), expired)
+            raise expired
         return response["data"]
 
+    async def _post_json(self, endpoint, data):
+        body = await self._request("POST", endpoint, data)
+        return json.loads(body)
+
+    async def _call_once(self, endpoint):
+        return self._decode(endpoint, await self._request("GET", endpoint))
+
+    async def call(self, endpoint):
+        """GET an endpoint; on session expiry log in again once and retry."""
+        generation = self._login_generation
+        try:
+            return await self._call_once(endpoint)
+        except SessionExpired as err:
+            await self._relogin(generation, err)
+            return await self._call_once(endpoint)
+
+    async def _call_if_changed_once(self, endpoint):
+        url = endpoint.split("?", 1)[0]
+        cached = self._payloads.get(url)
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        status, response_headers, body = await self._send("GET", endpoint, headers=headers)
+        if status == 304 and cached is not None:
+            self.stats.record_unchanged(self._target(endpoint))
+            return cached.unchanged()
+
+        # Ohne Validatoren der Firmware: Hash der Rohdaten vor dem JSON-Parsen
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        if cached is not None and digest == cached.digest:
+            self.stats.record_unchanged(self._target(endpoint))
+            return cached.unchanged()
+
+        payload = Payload(
+            self._decode(endpoint, body),
+            digest,
+            True,
+            response_headers.get("ETag"),
+            response_headers.get("Last-Modified"),
+        )
+        self._payloads[url] = payload
+        return payload
+
+    async def call_if_changed(self, endpoint):
+        """GET an endpoint as ``Payload``; unchanged responses are not decoded again.
+
+        Uses ETag/Last-Modified when the firmware sends them, otherwise a
+        hash of the raw body. On session expiry logs in again once and retries.
+        """
+        generation = self._login_generation
+        try:
+            return await self._call_if_changed_once(endpoint)
+        except SessionExpired as err:
+            await self._relogin(generation, err)
+            return await self._call_if_changed_once(endpoint)
+
     def challenge(self, password, salt):
         bpass = password.encode('utf-8')
         bsalt = salt.encode('utf-8')
 
         return hashlib.pbkdf2_hmac('sha256', bpass, bsalt, 1000).hex()[:32]
 
-    def login(self):
+    async def login(self):
+        async with self._login_lock:
+            return await self._login()
+
+    async def _relogin(self, generation, reason):
+        async with self._login_lock:
+            # Parallele Requests laufen gleichzeitig ab -> nur einer loggt neu ein
+            if generation != self._login_generation:
+                return
+            _LOGGER.debug("Session expired (%s), logging in again", reason)
+            self.logged = False
+            self.stats.relogins += 1
+            await self._login()
+
+    async def _send_challenge(self, challenge):
         data = {
-            "username": self.username,
-            "password": "seeksalthash"
+            "username": "user",
+            "password": challenge
         }
 
         endpoint = self.endpoint("session", ["login"])
-        request = self.session.post(endpoint, data=data)
-        response = request.json()
+        response = await self._post_json(endpoint, data)
+        return response.get('error') == 'ok'
 
-        challenge = self.challenge(self.password, response['salt'])
-        challenge = self.challenge(challenge, response['saltwebui'])
+    async def _login(self):
+        # Salts unverändert seit dem letzten Login -> abgeleiteten Hash direkt senden.
+        # Firmware, die den seeksalthash-Schritt verlangt, fällt einmalig auf den vollen Handshake zurück.
+        rejected_salts = None
+        if self._challenge_cache is not None and self._fast_login:
+            try:
+                if await self._send_challenge(self._challenge_cache[2]):
+                    return await self._finish_login()
+                # Abgelehnt: meist neue Salts (z.B. nach einem Neustart), Kurzweg bleibt aktiv
+                _LOGGER.debug("Cached login hash rejected, using full handshake")
+                rejected_salts = self._challenge_cache[:2]
+            except (SessionExpired, ValueError) as err:
+                # 401/403 oder Loginseite statt JSON: Firmware akzeptiert den Kurzweg nicht
+                _LOGGER.debug("Login with cached hash not supported (%s), using full handshake", err)
+                self._fast_login = False
+            self._challenge_cache = None
 
         data = {
-            "username": "user",
-            "password": challenge
+            "username": self.username,
+            "password": "seeksalthash"
         }
 
         endpoint = self.endpoint("session", ["login"])
-        request = self.session.post(endpoint, data=data)
-        response = request.json()
+        response = await self._post_json(endpoint, data)
+
+        salts = (response['salt'], response['saltwebui'])
+        if rejected_salts == salts:
+            # Gleiche Salts und trotzdem abgelehnt: Firmware verlangt immer den vollen Handshake
+            self._fast_login = False
+        if self._challenge_cache is not None and self._challenge_cache[:2] == salts:
+            challenge = self._challenge_cache[2]
+        else:
+            challenge = self.challenge(self.password, salts[0])
+            challenge = self.challenge(challenge, salts[1])
 
-        if response['error'] == 'ok':
-            self.session.headers.update({'X-CSRF-TOKEN': self.session.cookies['auth']})
+        if await self._send_challenge(challenge):
+            self._challenge_cache = (*salts, challenge)
+            return await self._finish_login()
 
-            endpoint = self.endpoint("session", ["menu"])
-            self.session.get(endpoint)
+        self._challenge_cache = None
+        raise RuntimeError("invalid credentials")
 
-            self.logged = True
+    async def _finish_login(self):
+        auth = self.session.cookie_jar.filter_cookies(URL(self.server)).get("auth")
+        if auth is not None:
+            self._headers['X-CSRF-TOKEN'] = auth.value
 
-            return True
+        endpoint = self.endpoint("session", ["menu"])
+        await self._request("GET", endpoint)
 
-        raise RuntimeError("invalid credentials")
+        self.logged = True
+        self.stats.logins += 1
+        self._login_generation += 1
+
+        return True
+
+    async def probe(self):
+        """Cheapest authenticated request: one system field."""
+        endpoint = self.endpoint("system", ["UpTime"])
+        return await self.call(endpoint)
+
+    async def identity(self):
+        endpoint = self.endpoint("system", IDENTITY_FIELDS)
+        return await self.call(endpoint)
+
+    async def system(self):
+        endpoint = self.endpoint("system", SYSTEM_FIELDS)
+        return await self.call(endpoint)
+
+    async def levels(self):
+        endpoint = self.endpoint("modem", MODEM_FIELDS)
+        return await self.call(endpoint)
+
+    async def dhcp(self):
+        endpoint = self.endpoint("dhcp/v4/1", DHCP_FIELDS)
+        return await self.call(endpoint)
+
+    async def aDev(self):
+        endpoint = self.endpoint("host", HOST_FIELDS)
+        return await self.call(endpoint)
+
+    async def aDev_if_changed(self):
+        endpoint = self.endpoint("host", HOST_FIELDS)
+        return await self.call_if_changed(endpoint)
+
+    async def fetch(self, target, fields, conditional=False):
+        """GET any field list of one target (used by the request planner)."""
+        endpoint = self.endpoint(target, list(fields))
+        if conditional:
+            return await self.call_if_changed(endpoint)
+        return await self.call(endpoint)
+
+    async def reboot(self):
+        """Ask the gateway to restart; returns True if it accepted the request."""
+        endpoint = self.endpoint("reset", [])
+
+        data = {"reboot": "Router,Wifi,VoIP,Dect,MoCA"}
+        generation = self._login_generation
+        try:
+            response = await self._post_json(endpoint, data)
+        except (SessionExpired, ValueError) as err:
+            # Abgelaufene Session (401 oder Loginseite statt JSON) -> einmal neu anmelden
+            await self._relogin(generation, err)
+            response = await self._post_json(endpoint, data)
+
+        accepted = response.get('error') == 'ok'
+        if accepted:
+            # Die Session überlebt den Neustart nicht
+            self.logged = False
+        return accepted
+
+
+class TechnicolorCGA:
+    """Blocking wrapper around AsyncTechnicolorCGA for scripts.
+
+    Runs the async client on a private event loop; do not use it from
+    inside a running loop (Home Assistant uses AsyncTechnicolorCGA directly).
+    Call ``close()`` or use it as a context manager to release the loop and
+    the HTTP session.
+    """
+
+    def __init__(self, username, password, router="192.168.0.1"):
+        self._loop = asyncio.new_event_loop()
+        self._client = AsyncTechnicolorCGA(username, password, router)
+
+    def _run(self, coro):
+        return self._loop.run_until_complete(coro)
+
+    @property
+    def server(self):
+        return self._client.server
+
+    @property
+    def logged(self):
+        return self._client.logged
+
+    @property
+    def session(self):
+        """The client's ``aiohttp.ClientSession`` (formerly a ``requests.Session``)."""
+        return self._run(self._get_session())
+
+    async def _get_session(self):
+        # Session im eigenen Loop anlegen, nicht außerhalb eines laufenden Loops
+        return self._client.session
+
+    def endpoint(self, target, options):
+        return self._client.endpoint(target, options)
+
+    def call(self, endpoint):
+        return self._run(self._client.call(endpoint))
+
+    def challenge(self, password, salt):
+        return self._client.challenge(password, salt)
+
+    def login(self):
+        return self._run(self._client.login())
+
+    def identity(self):
+        return self._run(self._client.identity())
 
     def system(self):
-        options = [
-            "HardwareVersion",
-            "FirmwareName",
-            "CMMACAddress",
-            "MACAddressRT",
-            "UpTime",
-            "LocalTime",
-            "LanMode",
-            "ModelName",
-            "CMStatus",
-            "ModelName",
-            "Manufacturer",
-            "SerialNumber",
-            "SoftwareVersion",
-            "BootloaderVersion",
-            "CoreVersion",
-            "FirmwareBuildTime",
-            "ProcessorSpeed",
-            "CMMACAddress",
-            "Hardware",
-            "MemTotal",
-            "MemFree"
-        ]
-
-        endpoint = self.endpoint("system", options)
-        return self.call(endpoint)
+        return self._run(self._client.system())
 
     def levels(self):
-        options = [
-            "exUSTbl",
-            "exDSTbl",
-            "USTbl",
-            "DSTbl",
-            "ErrTbl"
-        ]
-
-        endpoint = self.endpoint("modem", options)
-        return self.call(endpoint)
+        return self._run(self._client.levels())
 
     def dhcp(self):
-        options = [
-            "IPAddressRT",
-            "SubnetMaskRT",
-            "IPAddressGW",
-            "DNSTblRT",
-            "PoolEnable",
-            "WanAddressMode"
-        ]
-
-        endpoint = self.endpoint("dhcp/v4/1", options)
-        return self.call(endpoint)
+        return self._run(self._client.dhcp())
 
     def aDev(self):
-        options = [ "hostTbl", "LanMode" , "MixedMode" , "LanPortMode" ]
-
-        endpoint = self.endpoint("host", options)
-        return self.call(endpoint)
+        return self._run(self._client.aDev())
 
     def reboot(self):
-        endpoint = self.endpoint("reset", [])
+        return self._run(self._client.reboot())
 
-        data = {"reboot": "Router,Wifi,VoIP,Dect,MoCA"}
-        request = self.session.post(endpoint, data=data)
-        response = request.json()
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self._run(self._client.close())
+        self._loop.close()
 
-        return response['error'] == 'ok'
+    def __enter__(self):
+        return self
 
+    def __exit__(self, *exc):
+        self.close()
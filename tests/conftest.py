@@ -0,0 +1,17 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+COMPONENT_DIR = ROOT / "custom_components" / "technicolor_cga"
+PACKAGE = "technicolor_cga"
+
+# Paket registrieren, ohne __init__ (braucht Home Assistant) auszuführen
+if PACKAGE not in sys.modules:
+    spec = importlib.util.spec_from_loader(PACKAGE, loader=None, is_package=True)
+    package = importlib.util.module_from_spec(spec)
+    package.__path__ = [str(COMPONENT_DIR)]
+    sys.modules[PACKAGE] = package
+
+# Mock-Gateway der Benchmarks für Tests gegen echte HTTP-Antworten
+sys.path.insert(0, str(ROOT / "benchmarks"))
@@ -0,0 +1,83 @@
+import random
+
+from technicolor_cga.breaker import CLOSED, HALF_OPEN, JITTER, OPEN, CircuitBreaker
+
+
+def make_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_threshold=3, base_delay=30.0, max_delay=120.0, rng=random.Random(1)
+    )
+
+
+def open_breaker(breaker: CircuitBreaker, now: float = 0.0) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure(now)
+
+
+def test_opens_after_threshold_and_blocks_until_retry():
+    breaker = make_breaker()
+    assert not breaker.record_failure(0.0)
+    assert not breaker.record_failure(0.0)
+    assert breaker.state == CLOSED
+    assert breaker.allow(0.0)
+
+    assert breaker.record_failure(0.0)
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 1
+    assert not breaker.allow(breaker.retry_at - 0.1)
+    assert breaker.seconds_until_retry(0.0) == breaker.retry_at
+
+
+def test_success_below_threshold_resets_the_count():
+    breaker = make_breaker()
+    breaker.record_failure(0.0)
+    breaker.record_failure(0.0)
+    assert not breaker.record_success()
+    breaker.record_failure(0.0)
+    assert breaker.state == CLOSED
+
+
+def test_retry_delay_has_jitter_within_bounds():
+    delays = set()
+    for seed in range(20):
+        breaker = CircuitBreaker(base_delay=30.0, rng=random.Random(seed))
+        open_breaker(breaker, now=100.0)
+        delay = breaker.retry_at - 100.0
+        assert 30.0 * (1 - JITTER) <= delay <= 30.0 * (1 + JITTER)
+        delays.add(round(delay, 3))
+    # Mehrere Gateways proben nicht im Gleichschritt
+    assert len(delays) > 1
+
+
+def test_failed_probe_doubles_the_delay_up_to_the_maximum():
+    breaker = make_breaker()
+    open_breaker(breaker)
+    now = 0.0
+    delays = []
+    for _ in range(4):
+        now = breaker.retry_at
+        assert breaker.allow(now)
+        assert breaker.state == HALF_OPEN and breaker.probing
+        # Erneut geöffnet, aber kein "gerade geöffnet"
+        assert not breaker.record_failure(now)
+        assert breaker.state == OPEN
+        delays.append(breaker.as_dict()["next_delay_seconds"])
+    assert delays == [60, 120, 120, 120]
+    assert breaker.times_opened == 1
+
+
+def test_successful_probe_closes_and_resets_the_delay():
+    breaker = make_breaker()
+    open_breaker(breaker)
+    breaker.allow(breaker.retry_at)
+    breaker.record_failure(breaker.retry_at)
+    breaker.allow(breaker.retry_at)
+
+    assert breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.as_dict() == {
+        "state": CLOSED,
+        "consecutive_failures": 0,
+        "times_opened": 1,
+        "next_delay_seconds": 30,
+    }
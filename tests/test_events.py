@@ -0,0 +1,88 @@
+import pytest
+
+# const.py (Event-Namen) importiert Home Assistant
+pytest.importorskip("homeassistant")
+
+from technicolor_cga.const import (  # noqa: E402
+    EVENT_HOST_INACTIVE,
+    EVENT_HOST_IP_CHANGED,
+    EVENT_HOST_JOINED,
+    EVENT_HOST_LEFT,
+)
+from technicolor_cga.events import HostEventTracker  # noqa: E402
+from technicolor_cga.hosts import HostTable  # noqa: E402
+
+
+def host(mac: str, ip: str, active: bool = True) -> dict:
+    return {
+        "physaddress": mac,
+        "ipaddress": ip,
+        "hostname": mac,
+        "active": "true" if active else "false",
+    }
+
+
+class Poller:
+    def __init__(self, confirm_polls: int) -> None:
+        self.table = HostTable()
+        self.tracker = HostEventTracker(confirm_polls)
+
+    def poll(self, *rows: dict) -> list[tuple[str, str]]:
+        diff = self.table.update(list(rows))
+        return [(event, data["mac"]) for event, data in self.tracker.update(self.table, diff)]
+
+
+def test_first_table_only_seeds_the_states():
+    poller = Poller(confirm_polls=1)
+
+    assert poller.poll(host("m1", "10.0.0.1"), host("m2", "10.0.0.2", active=False)) == []
+
+
+def test_join_and_leave_need_confirmation():
+    poller = Poller(confirm_polls=2)
+    poller.poll(host("m1", "10.0.0.1"))
+
+    assert poller.poll(host("m1", "10.0.0.1"), host("m2", "10.0.0.2")) == []
+    assert poller.poll(host("m1", "10.0.0.1"), host("m2", "10.0.0.2")) == [
+        (EVENT_HOST_JOINED, "m2")
+    ]
+    assert poller.poll(host("m1", "10.0.0.1")) == []
+    assert poller.poll(host("m1", "10.0.0.1")) == [(EVENT_HOST_LEFT, "m2")]
+
+
+def test_flapping_host_stays_quiet():
+    poller = Poller(confirm_polls=2)
+    poller.poll(host("m1", "10.0.0.1"))
+
+    for active in (False, True, False, True):
+        assert poller.poll(host("m1", "10.0.0.1", active=active)) == []
+
+
+def test_inactive_event_only_for_hosts_that_were_active():
+    poller = Poller(confirm_polls=1)
+    poller.poll(host("m1", "10.0.0.1"))
+
+    assert poller.poll(host("m1", "10.0.0.1", active=False)) == [(EVENT_HOST_INACTIVE, "m1")]
+    # Neu aufgetauchter, aber inaktiver Host: kein Ereignis
+    rows = (host("m1", "10.0.0.1", active=False), host("m2", "10.0.0.2", active=False))
+    assert poller.poll(*rows) == []
+
+
+def test_ip_change_of_active_host_fires_immediately():
+    poller = Poller(confirm_polls=3)
+    poller.poll(host("m1", "10.0.0.1"), host("m2", "10.0.0.2", active=False))
+    diff = poller.table.update([host("m1", "10.0.0.5"), host("m2", "10.0.0.6", active=False)])
+
+    events = poller.tracker.update(poller.table, diff)
+    assert events == [
+        (
+            EVENT_HOST_IP_CHANGED,
+            {
+                "mac": "m1",
+                "ip": "10.0.0.5",
+                "hostname": "m1",
+                "previous_state": "active",
+                "previous_ip": "10.0.0.1",
+            },
+        )
+    ]
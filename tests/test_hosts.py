@@ -0,0 +1,78 @@
+from technicolor_cga.hosts import HostTable, ip_sort_key
+
+
+def host(mac: str, ip: str, active: bool = True, hostname: str = "device") -> dict:
+    return {
+        "physaddress": mac,
+        "ipaddress": ip,
+        "hostname": hostname,
+        "active": "true" if active else "false",
+    }
+
+
+def test_diff_reports_added_changed_and_removed_hosts():
+    table = HostTable()
+    diff = table.update([host("m1", "10.0.0.1"), host("m2", "10.0.0.2")])
+    assert [r.mac for r in diff.added] == ["m1", "m2"]
+    assert diff.version == table.version == 1
+
+    diff = table.update([host("m1", "10.0.0.1", active=False), host("m3", "10.0.0.3")])
+    assert [r.mac for r in diff.added] == ["m3"]
+    assert [r.mac for r in diff.removed] == ["m2"]
+    assert [(old.active, new.active) for old, new in diff.changed] == [(True, False)]
+    assert len(diff) == 3
+    assert table.version == 2
+
+
+def test_unchanged_table_keeps_version_and_sorted_view():
+    table = HostTable()
+    rows = [host("m1", "10.0.0.2"), host("m2", "10.0.0.1")]
+    table.update(rows)
+    view = table.sorted()
+
+    diff = table.update([dict(row) for row in rows])
+    assert not diff
+    assert diff.version == table.version == 1
+    assert table.sorted() is view
+
+
+def test_ip_index_follows_ip_changes_and_swaps():
+    table = HostTable()
+    table.update([host("m1", "10.0.0.1"), host("m2", "10.0.0.2")])
+
+    # Zwei Hosts tauschen ihre Adressen
+    table.update([host("m1", "10.0.0.2"), host("m2", "10.0.0.1")])
+    assert table.get_by_ip("10.0.0.1").mac == "m2"
+    assert table.get_by_ip("10.0.0.2").mac == "m1"
+
+    table.update([host("m1", "10.0.0.9"), host("m2", "10.0.0.1")])
+    assert table.get_by_ip("10.0.0.2") is None
+    assert table.get_by_ip("10.0.0.9").mac == "m1"
+
+    table.update([host("m2", "10.0.0.1")])
+    assert table.get_by_ip("10.0.0.9") is None
+    assert "m1" not in table
+    assert len(table) == 1
+
+
+def test_entries_without_mac_are_ignored():
+    table = HostTable()
+    diff = table.update([{"ipaddress": "10.0.0.1"}, host("", "10.0.0.2"), host("m1", "10.0.0.3")])
+
+    assert [r.mac for r in diff.added] == ["m1"]
+    assert table.get_by_ip("10.0.0.1") is None
+
+
+def test_sorted_orders_ipv4_numerically_then_ipv6_then_invalid():
+    table = HostTable()
+    table.update(
+        [
+            host("m1", "Unknown"),
+            host("m2", "fe80::1"),
+            host("m3", "10.0.0.10"),
+            host("m4", "10.0.0.9"),
+        ]
+    )
+
+    assert [r.mac for r in table.sorted()] == ["m4", "m3", "m2", "m1"]
+    assert ip_sort_key("10.0.0.9") < ip_sort_key("10.0.0.10") < ip_sort_key("::1")
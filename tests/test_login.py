@@ -0,0 +1,113 @@
+import asyncio
+
+from aiohttp import web
+from mock_gateway import MockGateway
+
+from technicolor_cga.technicolor_cga import AsyncTechnicolorCGA
+
+LOGIN = "session/login"
+
+
+class HandshakeOnlyGateway(MockGateway):
+    """Firmware that rejects a login without a preceding seeksalthash request."""
+
+    def __init__(self) -> None:
+        super().__init__(hosts=1)
+        self._salt_sent = False
+
+    async def _login(self, request):
+        form = await request.post()
+        if form.get("password") == "seeksalthash":
+            self._salt_sent = True
+        elif not self._salt_sent:
+            return web.json_response({"error": "error", "message": "invalid password"})
+        else:
+            self._salt_sent = False
+        return await super()._login(request)
+
+
+class UnauthorizedShortcutGateway(MockGateway):
+    """Firmware that answers a login without seeksalthash with HTTP 401."""
+
+    def __init__(self) -> None:
+        super().__init__(hosts=1)
+        self.deny_shortcut = False
+        self._salt_sent = False
+
+    async def _login(self, request):
+        form = await request.post()
+        if form.get("password") == "seeksalthash":
+            self._salt_sent = True
+        elif self.deny_shortcut and not self._salt_sent:
+            return web.Response(status=401)
+        else:
+            self._salt_sent = False
+        return await super()._login(request)
+
+
+async def _run(gateway: MockGateway, scenario) -> None:
+    runner, address = await gateway.start()
+    client = AsyncTechnicolorCGA(gateway.username, gateway.password, address)
+    try:
+        await scenario(client)
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+async def _login_posts(gateway: MockGateway, client: AsyncTechnicolorCGA) -> int:
+    before = gateway.requests_by_target.get(LOGIN, 0)
+    client.logged = False
+    assert await client.login()
+    return gateway.requests_by_target[LOGIN] - before
+
+
+def test_relogin_uses_the_cached_hash():
+    gateway = MockGateway(hosts=1)
+
+    async def scenario(client):
+        assert await _login_posts(gateway, client) == 2
+        assert await _login_posts(gateway, client) == 1
+
+    asyncio.run(_run(gateway, scenario))
+
+
+def test_new_salts_fall_back_once_and_keep_the_shortcut():
+    gateway = MockGateway(hosts=1)
+
+    async def scenario(client):
+        await _login_posts(gateway, client)
+        gateway.rotate_salts()
+        # Veralteter Hash abgelehnt -> voller Handshake, danach wieder der Kurzweg
+        assert await _login_posts(gateway, client) == 3
+        assert await _login_posts(gateway, client) == 1
+        gateway.rotate_salts()
+        assert await _login_posts(gateway, client) == 3
+        assert gateway.logins == 4
+
+    asyncio.run(_run(gateway, scenario))
+
+
+def test_firmware_without_the_shortcut_disables_it():
+    gateway = HandshakeOnlyGateway()
+
+    async def scenario(client):
+        await _login_posts(gateway, client)
+        # Gleiche Salts und trotzdem abgelehnt: ab jetzt nur noch der volle Handshake
+        assert await _login_posts(gateway, client) == 3
+        assert await _login_posts(gateway, client) == 2
+
+    asyncio.run(_run(gateway, scenario))
+
+
+def test_auth_error_on_the_shortcut_disables_it():
+    gateway = UnauthorizedShortcutGateway()
+
+    async def scenario(client):
+        await _login_posts(gateway, client)
+        gateway.deny_shortcut = True
+        # 401 auf den Kurzweg: Firmware unterstützt ihn nicht
+        assert await _login_posts(gateway, client) == 3
+        assert await _login_posts(gateway, client) == 2
+
+    asyncio.run(_run(gateway, scenario))
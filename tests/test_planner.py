@@ -0,0 +1,49 @@
+from technicolor_cga.planner import plan_requests
+
+
+def test_one_request_per_target_with_merged_fields():
+    planned = plan_requests(
+        [
+            ("system", "system", ["UpTime", "CMStatus"]),
+            ("identity", "system", ["ModelName", "UpTime"]),
+            ("host", "host", ["hostTbl"]),
+            ("system", "system", ["CMStatus", "MemFree"]),
+        ]
+    )
+
+    assert [request.target for request in planned] == ["system", "host"]
+    system = planned[0]
+    # Vereinigung in Reihenfolge des ersten Auftretens, ohne Duplikate
+    assert system.fields == ["UpTime", "CMStatus", "ModelName", "MemFree"]
+    assert system.endpoints == {
+        "system": ["UpTime", "CMStatus", "MemFree"],
+        "identity": ["ModelName", "UpTime"],
+    }
+
+
+def test_split_hands_every_endpoint_its_fields():
+    [request] = plan_requests(
+        [
+            ("system", "system", ["UpTime", "CMStatus"]),
+            ("identity", "system", ["ModelName", "UpTime"]),
+        ]
+    )
+    parts = request.split({"UpTime": "10", "CMStatus": "OPERATIONAL", "ModelName": "CGA"})
+
+    assert parts == {
+        "system": {"UpTime": "10", "CMStatus": "OPERATIONAL"},
+        "identity": {"ModelName": "CGA", "UpTime": "10"},
+    }
+
+
+def test_split_leaves_out_missing_fields():
+    [request] = plan_requests([("a", "t", ["x", "y"]), ("b", "t", ["z"])])
+
+    assert request.split({"x": 1}) == {"a": {"x": 1}, "b": {}}
+
+
+def test_single_endpoint_gets_the_whole_response():
+    [request] = plan_requests([("host", "host", ["hostTbl"])])
+    data = {"hostTbl": [], "LanMode": "router"}
+
+    assert request.split(data)["host"] is data
@@ -0,0 +1,108 @@
+from datetime import datetime, timezone
+
+from technicolor_cga.presence import DAILY, HOURLY, PresenceLog, _rollups
+
+A, B, C = "aa:aa:aa:aa:aa:01", "aa:aa:aa:aa:aa:02", "aa:aa:aa:aa:aa:03"
+
+
+def ts(day: int, hour: int, minute: int = 0) -> int:
+    return int(datetime(2026, 3, day, hour, minute, tzinfo=timezone.utc).timestamp())
+
+
+def flush(log: PresenceLog, now: int) -> None:
+    macs, pending = log.take_pending()
+    log.write(macs, pending, now)
+
+
+def online(log: PresenceLog, rollup, mac: str) -> int:
+    return log.describe(rollup, mac)["online_seconds"]
+
+
+def test_day_rolls_over_with_the_first_sample_after_midnight(tmp_path):
+    log = PresenceLog(str(tmp_path), max_gap=600)
+    log.record(ts(1, 23, 40), [A, B])
+    log.record(ts(1, 23, 50), [A, B])
+    log.record(ts(2, 0, 50), [C], churn=10)
+    log.record(ts(2, 0, 55), [C])
+
+    # Vor dem Ende der ersten Stunde des neuen Tages: heute ist schon der neue Tag
+    today = log.today()
+    assert today.start == ts(2, 0)
+    assert today.churn == 10
+    assert today.peak == 1
+    assert log.unique(today) == 1
+    assert online(log, today, C) == 300
+
+    assert log.last_day.start == ts(1, 0)
+    assert log.last_day.peak == 2
+    assert online(log, log.last_day, A) == 1200
+
+    flush(log, ts(2, 0, 55))
+    days = list(_rollups(log._read(DAILY), DAILY))
+    assert [day.start for day in days] == [ts(1, 0)]
+
+
+def test_credit_is_split_at_hour_boundaries(tmp_path):
+    log = PresenceLog(str(tmp_path), max_gap=3600)
+    log.record(ts(1, 10, 50), [A])
+    log.record(ts(1, 11, 10), [A])
+
+    hours = list(_rollups(bytes(log._pending[HOURLY]), HOURLY))
+    assert [hour.start for hour in hours] == [ts(1, 10)]
+    assert online(log, hours[0], A) == 600
+    assert log.hour.start == ts(1, 11)
+    assert online(log, log.hour, A) == 600
+
+
+def test_hours_without_samples_get_at_most_an_hour(tmp_path):
+    log = PresenceLog(str(tmp_path), max_gap=3 * 3600)
+    log.record(ts(1, 10, 30), [A])
+    log.record(ts(1, 13, 30), [A])
+
+    hours = list(_rollups(bytes(log._pending[HOURLY]), HOURLY))
+    assert [hour.start for hour in hours] == [ts(1, 10), ts(1, 11), ts(1, 12)]
+    assert [online(log, hour, A) for hour in hours] == [1800, 3600, 3600]
+    # Stunde ohne eigenes Sample: die Hosts des letzten Samples zählen als gleichzeitig online
+    assert hours[1].peak == 1
+
+
+def test_gap_is_capped_at_max_gap(tmp_path):
+    log = PresenceLog(str(tmp_path), max_gap=600)
+    log.record(ts(1, 10, 0), [A])
+    log.record(ts(1, 10, 50), [A, B])
+    log.record(ts(1, 10, 55), [A])
+
+    assert online(log, log.hour, A) == 600 + 300
+    assert online(log, log.hour, B) == 300
+
+
+def test_load_rebuilds_the_open_buckets(tmp_path):
+    samples = [
+        (ts(1, 22, 40), [A, B], 0),
+        (ts(1, 23, 10), [A], 2),
+        (ts(1, 23, 50), [A, C], 1),
+        (ts(2, 0, 20), [C], 3),
+        (ts(2, 1, 5), [B, C], 0),
+        (ts(2, 1, 30), [B], 1),
+    ]
+    log = PresenceLog(str(tmp_path), max_gap=1800)
+    for moment, macs, churn in samples[:-1]:
+        log.record(moment, macs, churn)
+    flush(log, samples[-2][0])
+
+    reloaded = PresenceLog(str(tmp_path), max_gap=1800)
+    reloaded.load()
+    for current in (log, reloaded):
+        current.record(*samples[-1])
+
+    for resolution in (HOURLY, DAILY):
+        assert [log.describe(r) for r in log.open_rollups(resolution)] == [
+            reloaded.describe(r) for r in reloaded.open_rollups(resolution)
+        ]
+    assert log.describe(log.last_day) == reloaded.describe(reloaded.last_day)
+
+    # Nach dem Neuladen keine Stunde doppelt geschrieben
+    flush(reloaded, samples[-1][0])
+    hours = [hour.start for hour in _rollups(reloaded._read(HOURLY), HOURLY)]
+    assert hours == sorted(set(hours))
+    assert hours[-1] == ts(2, 0)
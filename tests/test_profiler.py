@@ -0,0 +1,78 @@
+import cProfile
+import sys
+
+import pytest
+
+from technicolor_cga.profiler import CycleProfiler
+
+needs_single_profiler = pytest.mark.skipif(
+    sys.version_info < (3, 12), reason="only one active profiler since Python 3.12"
+)
+
+
+def test_capture_closed_by_the_next_cycle_is_kept():
+    profiler = CycleProfiler()
+    profiler.start_capture(1)
+    profiler.begin_cycle()
+    # Update fehlgeschlagen, keine Listener: der nächste Zyklus schließt die Capture
+    profiler.begin_cycle()
+    profiler.end_cycle()
+
+    finished = profiler.pop_finished()
+    assert len(finished) == 1
+    assert len(finished[0][1]) == 1
+    assert profiler.pop_finished() == []
+
+
+def test_capture_covers_the_requested_cycles():
+    profiler = CycleProfiler()
+    profiler.start_capture(2)
+    for _ in range(2):
+        profiler.begin_cycle()
+        profiler.add("fetch", 0.01)
+        profiler.end_cycle()
+
+    [(profile, cycles)] = profiler.pop_finished()
+    assert isinstance(profile, cProfile.Profile)
+    assert [cycle["fetch"] for cycle in cycles] == [10.0, 10.0]
+    assert not profiler.capturing
+    assert not profiler.active
+
+
+def test_running_capture_is_not_replaced():
+    profiler = CycleProfiler()
+    profiler.start_capture(3)
+    with pytest.raises(RuntimeError):
+        profiler.start_capture(1)
+
+
+@needs_single_profiler
+def test_start_fails_while_another_profiler_is_active():
+    profiler = CycleProfiler()
+    other = cProfile.Profile()
+    other.enable()
+    try:
+        with pytest.raises(ValueError):
+            profiler.start_capture(1)
+    finally:
+        other.disable()
+    assert not profiler.capturing
+
+
+@needs_single_profiler
+def test_capture_is_dropped_when_another_profiler_starts():
+    profiler = CycleProfiler()
+    profiler.start_capture(2)
+    other = cProfile.Profile()
+    other.enable()
+    try:
+        profiler.begin_cycle()
+    finally:
+        other.disable()
+    profiler.end_cycle()
+
+    assert profiler.aborted
+    assert not profiler.capturing
+    assert profiler.pop_finished() == []
+    # Stage-Timing des Zyklus bleibt erhalten
+    assert len(profiler.cycles) == 1
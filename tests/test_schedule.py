@@ -0,0 +1,64 @@
+from technicolor_cga.schedule import EndpointSchedule, next_slot_delay, slot_offset
+
+INTERVAL = 300.0
+TOLERANCE = 2.0
+
+
+def simulate(gateways: int, runtime: float, cycles: int) -> list[list[float]]:
+    """Start times of each gateway when every cycle takes ``runtime`` seconds."""
+    starts = []
+    for index in range(gateways):
+        offset = slot_offset(index, INTERVAL)
+        # Setup zu einem beliebigen Zeitpunkt, erster Poll sofort
+        now = 17.0
+        gateway_starts = []
+        for _ in range(cycles):
+            gateway_starts.append(now)
+            end = now + runtime
+            now = end + next_slot_delay(offset, INTERVAL, end, TOLERANCE)
+        starts.append(gateway_starts)
+    return starts
+
+
+def test_slot_offsets_are_fixed_and_spread():
+    assert [slot_offset(i, INTERVAL) for i in range(4)] == [0.0, 150.0, 75.0, 225.0]
+
+
+def test_two_gateways_keep_the_poll_rate_with_slow_cycles():
+    first, second = simulate(gateways=2, runtime=3.0, cycles=6)
+
+    # Nach dem ersten (sofortigen) Poll genau ein Poll pro Intervall, kein übersprungener Tick
+    for starts in (first, second):
+        gaps = [b - a for a, b in zip(starts[1:], starts[2:])]
+        assert gaps == [INTERVAL] * len(gaps)
+
+    assert [t % INTERVAL for t in first[1:]] == [0.0] * 5
+    assert [t % INTERVAL for t in second[1:]] == [150.0] * 5
+
+
+def test_early_refresh_does_not_poll_twice():
+    # Refresh kam 0.8 s vor dem Slot: der Slot gilt als erreicht, nächster eine Periode später
+    assert next_slot_delay(150.0, INTERVAL, 449.2, TOLERANCE) == 300.8
+    # Zyklus endet 3 s nach dem Slot: bis zum nächsten Slot, nicht Intervall + Versatz
+    assert next_slot_delay(150.0, INTERVAL, 453.0, TOLERANCE) == 297.0
+
+
+def test_endpoints_stay_due_on_every_slot_with_cycles_longer_than_the_slack():
+    slack = 5.0
+    runtime = 8.0
+    for index in range(2):
+        offset = slot_offset(index, INTERVAL)
+        schedule = EndpointSchedule(INTERVAL, adaptive=False)
+        now = 17.0
+        fetches = []
+        for cycle in range(8):
+            if schedule.is_due(now, slack):
+                fetches.append(now)
+                schedule.record({"cycle": cycle}, now)
+            end = now + runtime
+            now = end + next_slot_delay(offset, INTERVAL, end, TOLERANCE)
+
+        # Nach dem ersten Poll (Setup, zwischen zwei Slots) wird jeder Slot abgerufen
+        gaps = [b - a for a, b in zip(fetches[1:], fetches[2:])]
+        assert gaps == [INTERVAL] * len(gaps)
+        assert len(fetches) >= 7